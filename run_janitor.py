@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Entry point for expiring idle games and archiving finished ones
+"""
+
+import sys
+import os
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+if __name__ == "__main__":
+    from src.utils.game_janitor import main
+    main()
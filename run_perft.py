@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Entry point for running the perft move generator test and benchmark
+"""
+
+import sys
+import os
+
+# Add src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+if __name__ == "__main__":
+    from src.utils.perft import main
+    main()
@@ -14,6 +14,7 @@ import queue
 SERVER_HOST = '127.0.0.1'  # Server IP
 SERVER_PORT = 5555        # Server port
 BUFFER_SIZE = 4096        # Socket buffer size
+MESSAGE_DELIMITER = b"\n"  # Messages are newline-delimited JSON
 
 class ChessClient:
     """Client for connecting to the chess server"""
@@ -24,7 +25,9 @@ class ChessClient:
         self.player_color = None
         self.player_name = None
         self.game_state = None
-        self.message_queue = queue.Queue()
+        self.opening_stats = None  # Latest opening explorer answer from the server
+        self.seat_tokens = {}  # Game ID -> token the server gave us for our seat, to take it back later
+        self.message_queue = queue.Queue()  # Messages from the server, drained by the UI with get_events()
         self.receive_thread = None
         self.callback = None
         self.chat_online = True  # Assume chat is online initially
@@ -66,8 +69,8 @@ class ChessClient:
         except Exception as e:
             print(f"Disconnect error: {e}")
     
-    def create_game(self, player_name):
-        """Create a new game"""
+    def create_game(self, player_name, bot_difficulty=None, game_id=None):
+        """Create a new game, optionally against a server-hosted bot or with a chosen ID"""
         if not self.connected:
             print("Not connected to server")
             return False
@@ -78,6 +81,12 @@ class ChessClient:
             'type': 'create_game',
             'player_name': player_name
         }
+        if bot_difficulty:
+            message['bot_difficulty'] = bot_difficulty
+        if game_id:
+            message['game_id'] = game_id
+            if game_id in self.seat_tokens:
+                message['seat_token'] = self.seat_tokens[game_id]
         
         return self._send_message(message)
     
@@ -94,6 +103,8 @@ class ChessClient:
             'game_id': game_id,
             'player_name': player_name
         }
+        if game_id in self.seat_tokens:
+            message['seat_token'] = self.seat_tokens[game_id]
         
         return self._send_message(message)
     
@@ -113,8 +124,22 @@ class ChessClient:
         
         return self._send_message(message)
     
-    def make_move(self, from_pos, to_pos):
-        """Make a move in the game"""
+    def leave_game(self):
+        """Leave the current game but stay connected for the next one"""
+        if not self.connected or not self.game_id:
+            return False
+        
+        self.game_id = None
+        self.player_color = None
+        self.game_state = None
+        self.opening_stats = None
+        # Messages about the old game must not reach the next one
+        self.get_events()
+        
+        return self._send_message({'type': 'leave_game'})
+    
+    def make_move(self, from_pos, to_pos, promotion=None):
+        """Make a move in the game (pawns promote to a queen unless promotion is given)"""
         if not self.connected or not self.game_id:
             print("Not connected to a game")
             return False
@@ -125,6 +150,21 @@ class ChessClient:
             'from_pos': from_pos,
             'to_pos': to_pos
         }
+        if promotion:
+            message['promotion'] = promotion
+        
+        return self._send_message(message)
+    
+    def reset_game(self):
+        """Ask the server to start a new game"""
+        if not self.connected or not self.game_id:
+            print("Not connected to a game")
+            return False
+        
+        message = {
+            'type': 'reset_game',
+            'game_id': self.game_id
+        }
         
         return self._send_message(message)
     
@@ -155,6 +195,20 @@ class ChessClient:
         
         return self._send_message(message)
     
+    def request_opening_stats(self, fen=None):
+        """Ask for opening explorer statistics of a position (the current game's by default)"""
+        if not self.connected:
+            print("Not connected to server")
+            return False
+        
+        message = {
+            'type': 'request_opening_stats'
+        }
+        if fen:
+            message['fen'] = fen
+        
+        return self._send_message(message)
+    
     def is_chat_online(self):
         """Check if chat is online"""
         return self.connected and self.chat_online
@@ -165,7 +219,7 @@ class ChessClient:
             return False
         
         try:
-            self.socket.sendall(json.dumps(message).encode('utf-8'))
+            self.socket.sendall(json.dumps(message).encode('utf-8') + MESSAGE_DELIMITER)
             return True
         except Exception as e:
             print(f"Send error: {e}")
@@ -175,20 +229,28 @@ class ChessClient:
     
     def _receive_messages(self):
         """Receive messages from the server"""
+        buffer = b""
         while self.connected:
             try:
                 data = self.socket.recv(BUFFER_SIZE)
                 if not data:
                     break
                 
-                # Parse the JSON message
-                try:
-                    message = json.loads(data.decode('utf-8'))
-                    self._handle_message(message)
-                except json.JSONDecodeError:
-                    print("Invalid JSON received")
-                except Exception as e:
-                    print(f"Error handling message: {e}")
+                # A read can hold part of a message or several messages
+                buffer += data
+                while MESSAGE_DELIMITER in buffer:
+                    line, buffer = buffer.split(MESSAGE_DELIMITER, 1)
+                    if not line.strip():
+                        continue
+
+                    # Parse the JSON message
+                    try:
+                        message = json.loads(line.decode('utf-8'))
+                        self._handle_message(message)
+                    except json.JSONDecodeError:
+                        print("Invalid JSON received")
+                    except Exception as e:
+                        print(f"Error handling message: {e}")
             
             except Exception as e:
                 print(f"Receive error: {e}")
@@ -196,7 +258,19 @@ class ChessClient:
                 self.chat_online = False
                 break
         
+        self.connected = False
+        self.chat_online = False
+        self.message_queue.put({'type': 'disconnected'})
         print("Receive thread ended")
+
+    def get_events(self):
+        """Return the messages received since the last call, oldest first"""
+        events = []
+        while True:
+            try:
+                events.append(self.message_queue.get_nowait())
+            except queue.Empty:
+                return events
     
     def _handle_message(self, message):
         """Process a message from the server"""
@@ -206,6 +280,7 @@ class ChessClient:
             self.game_id = message.get('game_id')
             self.player_color = message.get('player_color')
             self.game_state = message.get('game_state')
+            self.seat_tokens[self.game_id] = message.get('seat_token')
             
             print(f"Game created with ID: {self.game_id}")
             print(f"You are playing as: {self.player_color}")
@@ -214,6 +289,7 @@ class ChessClient:
             self.game_id = message.get('game_id')
             self.player_color = message.get('player_color')
             self.game_state = message.get('game_state')
+            self.seat_tokens[self.game_id] = message.get('seat_token')
             
             print(f"Joined game with ID: {self.game_id}")
             print(f"You are playing as: {self.player_color}")
@@ -240,10 +316,16 @@ class ChessClient:
             
             print(f"Opponent ({opponent_color}) left the game")
         
+        elif message_type == 'opening_stats':
+            self.opening_stats = message
+        
         elif message_type == 'error':
             error_message = message.get('message')
             print(f"Error: {error_message}")
         
+        # Hand the message to the UI thread
+        self.message_queue.put(message)
+
         # Call the callback function if provided
         if self.callback:
             self.callback(message_type, self.game_state)
@@ -6,9 +6,9 @@ import pygame
 import sys
 import os
 import json
-import time
 import uuid
 import math
+import numpy as np
 from ..utils.chess_assets import (
     draw_chess_button,
     draw_chess_panel,
@@ -17,6 +17,11 @@ from ..utils.chess_assets import (
     draw_chess_icon,
     draw_chess_board_pattern
 )
+from ..utils.font_cache import get_font, render_text, SCALED_FONT_STEP
+from ..utils.frame_pacer import FramePacer
+from ..utils.game_store import GameStore
+from .chess_client import get_client
+from .two_player_chess import run_game
 
 # Initialize pygame
 pygame.init()
@@ -32,8 +37,8 @@ icon = pygame.Surface((32, 32), pygame.SRCALPHA)
 # The draw_chess_icon function will use the updated colors
 draw_chess_icon(icon, "king", "white", (16, 16), 30)
 pygame.display.set_icon(icon)
-clock = pygame.time.Clock()
 FPS = 60
+pacer = FramePacer(FPS)  # Full rate while the user interacts, a low idle rate otherwise
 
 # Colors - Classic black-and-white chess theme
 WHITE = (255, 255, 255)
@@ -59,21 +64,21 @@ ACCENT_COLOR = (150, 150, 150)   # Gray accent
 
 # Fonts - Try to use nicer fonts if available
 try:
-    title_font = pygame.font.Font(None, 64)  # Default font, larger size
-    header_font = pygame.font.Font(None, 48)
-    font = pygame.font.Font(None, 32)
-    small_font = pygame.font.Font(None, 24)
+    title_font = get_font(None, 64)  # Default font, larger size
+    header_font = get_font(None, 48)
+    font = get_font(None, 32)
+    small_font = get_font(None, 24)
 except:
     # Fallback to SysFont if custom font fails
-    title_font = pygame.font.SysFont('Arial', 48, bold=True)
-    header_font = pygame.font.SysFont('Arial', 32, bold=True)
-    font = pygame.font.SysFont('Arial', 24)
-    small_font = pygame.font.SysFont('Arial', 18)
+    title_font = get_font('Arial', 48, bold=True)
+    header_font = get_font('Arial', 32, bold=True)
+    font = get_font('Arial', 24)
+    small_font = get_font('Arial', 18)
 
 # No video background - using static background instead
 
-# File for storing game list
-GAMES_LIST_FILE = "../../data/chess_games_list.json"
+# Old JSON game list, copied into the game store the first time the lobby runs
+GAMES_LIST_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "chess_games_list.json")
 
 # Enhanced Button class with beautiful animations and effects
 class Button:
@@ -161,10 +166,10 @@ class Button:
         pygame.draw.rect(screen, (255, 255, 255, 20), highlight_rect, 1, border_radius=6)
 
         # Draw text with shadow and scaling
-        text_font = pygame.font.SysFont('Arial', int(22 * self.hover_scale), bold=True)
+        text_font = get_font('Arial', 22 * self.hover_scale, bold=True, step=SCALED_FONT_STEP)
 
         # Text shadow
-        text_shadow = text_font.render(self.text, True, (0, 0, 0))
+        text_shadow = render_text(text_font, self.text, (0, 0, 0))
         shadow_rect = text_shadow.get_rect(center=(scaled_rect.centerx + 1, scaled_rect.centery + 1))
         screen.blit(text_shadow, shadow_rect)
 
@@ -173,7 +178,7 @@ class Button:
         if self.is_hovered:
             text_color = (min(255, text_color[0] + 30), min(255, text_color[1] + 30), min(255, text_color[2] + 30))
 
-        text_surf = text_font.render(self.text, True, text_color)
+        text_surf = render_text(text_font, self.text, text_color)
         text_rect = text_surf.get_rect(center=scaled_rect.center)
         screen.blit(text_surf, text_rect)
 
@@ -202,7 +207,7 @@ class InputBox:
         self.text = text
         self.placeholder = placeholder
         self.active = False
-        self.rendered_text = font.render(text, True, BLACK)
+        self.rendered_text = render_text(font, text, BLACK)
         self.cursor_visible = True
         self.cursor_timer = 0
         self.focus_animation = 0.0  # Focus animation state
@@ -231,7 +236,7 @@ class InputBox:
                     self.text += event.unicode
                     self.typing_animation = 1.0  # Start typing animation
                 # Re-render the text
-                self.rendered_text = font.render(self.text, True, BLACK)
+                self.rendered_text = render_text(font, self.text, BLACK)
         return None
 
     def draw(self, screen):
@@ -295,7 +300,7 @@ class InputBox:
             if self.typing_animation > 0:
                 text_color = (20 + int(20 * self.typing_animation), 20 + int(20 * self.typing_animation), 20 + int(20 * self.typing_animation))
 
-            text_surf = font.render(self.text, True, text_color)
+            text_surf = render_text(font, self.text, text_color)
             text_rect = text_surf.get_rect(x=self.rect.x + padding, centery=self.rect.centery)
             screen.blit(text_surf, text_rect)
 
@@ -312,13 +317,13 @@ class InputBox:
         else:
             # Enhanced placeholder with fade animation
             placeholder_alpha = 120 - int(40 * self.focus_animation)
-            placeholder_font = pygame.font.SysFont('Arial', 20, italic=True)
-            placeholder_surf = placeholder_font.render(self.placeholder, True, (placeholder_alpha, placeholder_alpha, placeholder_alpha))
+            placeholder_font = get_font('Arial', 20, italic=True)
+            placeholder_surf = render_text(placeholder_font, self.placeholder, (placeholder_alpha, placeholder_alpha, placeholder_alpha))
             placeholder_rect = placeholder_surf.get_rect(x=self.rect.x + padding, centery=self.rect.centery)
             screen.blit(placeholder_surf, placeholder_rect)
 
         # Blink cursor with smoother timing
-        self.cursor_timer += 0.03
+        self.cursor_timer += 1.8 * pacer.frame_time
         if self.cursor_timer > 1:
             self.cursor_timer = 0
             self.cursor_visible = not self.cursor_visible
@@ -440,25 +445,25 @@ class GameListItem:
                     pygame.draw.rect(screen, (40, 40, 40), square_rect)
 
         # Draw game name with enhanced typography and shadow
-        font_large = pygame.font.SysFont('Arial', 30, bold=True)
+        font_large = get_font('Arial', 30, bold=True)
         text_x = board_x + board_size + 25
 
         # Text shadow
-        name_shadow = font_large.render(self.game_name, True, (10, 10, 10))
+        name_shadow = render_text(font_large, self.game_name, (10, 10, 10))
         screen.blit(name_shadow, (text_x + 1, self.rect.top + 16))
 
         # Main text with hover glow
         text_color = (255, 255, 255) if not self.is_hovered else (255, 255, 240)
-        name_text = font_large.render(self.game_name, True, text_color)
+        name_text = render_text(font_large, self.game_name, text_color)
         screen.blit(name_text, (text_x, self.rect.top + 15))
 
         # Draw host name with enhanced styling
-        font_small = pygame.font.SysFont('Arial', 22)
-        host_shadow = font_small.render(f"White: {self.host_name}", True, (10, 10, 10))
+        font_small = get_font('Arial', 22)
+        host_shadow = render_text(font_small, f"White: {self.host_name}", (10, 10, 10))
         screen.blit(host_shadow, (text_x + 1, self.rect.top + 56))
 
         host_color = (180, 180, 180) if not self.is_hovered else (200, 200, 200)
-        host_text = font_small.render(f"White: {self.host_name}", True, host_color)
+        host_text = render_text(font_small, f"White: {self.host_name}", host_color)
         screen.blit(host_text, (text_x, self.rect.top + 55))
 
         # Draw enhanced waiting badge with animation
@@ -480,8 +485,8 @@ class GameListItem:
             pygame.draw.ellipse(screen, (160, 160, 160), (badge_x, badge_y, badge_width, badge_height), 2)
 
             # Badge text with glow
-            badge_font = pygame.font.SysFont('Arial', 18, bold=True)
-            badge_text = badge_font.render("Waiting", True, (250, 250, 250))
+            badge_font = get_font('Arial', 18, bold=True)
+            badge_text = render_text(badge_font, "Waiting", (250, 250, 250))
             badge_rect = badge_text.get_rect(center=(badge_x + badge_width // 2, badge_y + badge_height // 2))
             screen.blit(badge_text, badge_rect)
 
@@ -515,74 +520,50 @@ class GameListItem:
 
 class LobbySystem:
     def __init__(self):
+        self.store = GameStore()
         self.games = []
+        self.import_games_list()
         self.load_games()
 
-    def load_games(self):
-        """Load games from file"""
+    def import_games_list(self):
+        """Copy games from the old JSON list into an empty store"""
         try:
-            if os.path.exists(GAMES_LIST_FILE):
+            if self.store.count_games() == 0 and os.path.exists(GAMES_LIST_FILE):
                 with open(GAMES_LIST_FILE, 'r') as f:
                     data = json.load(f)
-                    self.games = data.get('games', [])
+                self.store.import_games(data.get('games', []))
         except Exception as e:
-            print(f"Error loading games: {e}")
-            self.games = []
+            print(f"Error importing games list: {e}")
 
-    def save_games(self):
-        """Save games to file"""
+    def load_games(self):
+        """Load the active games from the store"""
         try:
-            with open(GAMES_LIST_FILE, 'w') as f:
-                json.dump({'games': self.games}, f)
+            self.games = self.store.list_games(['waiting', 'in_progress'])
         except Exception as e:
-            print(f"Error saving games: {e}")
+            print(f"Error loading games: {e}")
+            self.games = []
 
     def create_game(self, game_name, host_name):
         """Create a new game"""
         game_id = str(uuid.uuid4())
-        game = {
-            'game_id': game_id,
-            'game_name': game_name,
-            'host_name': host_name,
-            'guest_name': None,
-            'spectators': [],
-            'created_at': time.time(),
-            'status': 'waiting'
-        }
-        self.games.append(game)
-        self.save_games()
+        self.store.create_game(game_id, game_name, host_name)
+        self.load_games()
         return game_id
 
     def get_game(self, game_id):
         """Get a game by ID"""
-        for game in self.games:
-            if game['game_id'] == game_id:
-                return game
-        return None
+        return self.store.get_game(game_id)
 
     def join_game(self, game_id, player_name):
         """Join an existing game"""
-        game = self.get_game(game_id)
-        if game and game['status'] == 'waiting':
-            game['guest_name'] = player_name
-            game['status'] = 'in_progress'
-            self.save_games()
-            return True
-        return False
+        # The store only lets one player take the seat, even across lobby windows
+        joined = self.store.join_game(game_id, player_name)
+        self.load_games()
+        return joined
 
     def spectate_game(self, game_id, spectator_name):
         """Spectate an existing game"""
-        game = self.get_game(game_id)
-        if game:
-            if 'spectators' not in game:
-                game['spectators'] = []
-
-            # Add spectator if not already in the list
-            if spectator_name not in game['spectators']:
-                game['spectators'].append(spectator_name)
-                self.save_games()
-            return True
-        return False
+        return self.store.add_spectator(game_id, spectator_name)
 
     def get_active_games(self):
         """Get all active games (both waiting and in progress)"""
@@ -596,83 +577,135 @@ class LobbySystem:
         """Get games that are in progress"""
         return [game for game in self.games if game['status'] == 'in_progress']
 
-def draw_background(screen):
-    """Draw an enhanced animated background with chess pattern"""
-    current_time = pygame.time.get_ticks() / 1000.0
-
-    # Draw enhanced gradient background with subtle animation
-    for y in range(WINDOW_HEIGHT):
-        # Create a more sophisticated gradient with subtle wave animation
-        wave_offset = math.sin(current_time * 0.5 + y * 0.01) * 5
-        color_value = 25 + (y / WINDOW_HEIGHT * 25) + wave_offset
-        color_value = max(20, min(60, color_value))  # Clamp values
-        color = (color_value, color_value, color_value)
-        pygame.draw.line(screen, color, (0, y), (WINDOW_WIDTH, y))
-
-    # Draw floating chess pieces in background
-    piece_positions = [
-        (100, 150, "pawn", "white", 0.3),
-        (WINDOW_WIDTH - 150, 200, "knight", "black", 0.25),
-        (200, WINDOW_HEIGHT - 200, "bishop", "white", 0.2),
-        (WINDOW_WIDTH - 200, WINDOW_HEIGHT - 250, "rook", "black", 0.35),
-    ]
-
-    for x, y, piece, color, speed in piece_positions:
-        # Floating animation
-        float_y = y + math.sin(current_time * speed) * 15
-        float_x = x + math.cos(current_time * speed * 0.7) * 8
-
-        # Create semi-transparent piece
+# Floating pieces drawn faintly behind the menus: x, y, piece, color, speed
+BACKGROUND_PIECES = [
+    (100, 150, "pawn", "white", 0.3),
+    (WINDOW_WIDTH - 150, 200, "knight", "black", 0.25),
+    (200, WINDOW_HEIGHT - 200, "bishop", "white", 0.2),
+    (WINDOW_WIDTH - 200, WINDOW_HEIGHT - 250, "rook", "black", 0.35),
+]
+PATTERN_HEIGHT = 120       # Height of the chess pattern along the bottom
+PATTERN_SQUARE_SIZE = 30
+
+# Parts of the background that don't change between frames, built on first use
+background_layers = {}
+
+def background_layer(name, build):
+    """Cached background surface, built by build() the first time it is needed"""
+    layer = background_layers.get(name)
+    if layer is None:
+        layer = background_layers[name] = build()
+    return layer
+
+def build_vignette():
+    """Alpha surface darkening the window towards its corners"""
+    center_x, center_y = WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2
+    xs = np.arange(WINDOW_WIDTH) - center_x
+    ys = np.arange(WINDOW_HEIGHT) - center_y
+    distance = np.sqrt(xs[:, None] ** 2 + ys[None, :] ** 2)
+    strength = np.minimum(1.0, distance / math.sqrt(center_x ** 2 + center_y ** 2))
+
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    alpha[:] = (strength * 40).astype(np.uint8)
+    del alpha  # Releases the lock on the surface
+    return surface
+
+def build_pattern():
+    """One pixel per square of the bottom chess pattern; only its alpha is animated"""
+    columns = -(-WINDOW_WIDTH // PATTERN_SQUARE_SIZE)
+    rows = PATTERN_HEIGHT // PATTERN_SQUARE_SIZE
+    dark = (np.arange(columns)[:, None] + np.arange(rows)[None, :]) % 2 == 1
+
+    surface = pygame.Surface((columns, rows), pygame.SRCALPHA)
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[:] = np.where(dark[:, :, None], 0, 255).astype(np.uint8)
+    del pixels
+    return surface, dark
+
+def build_pattern_surface():
+    """Full-size chess pattern the one-pixel squares are stretched into each frame"""
+    columns = -(-WINDOW_WIDTH // PATTERN_SQUARE_SIZE)
+    return pygame.Surface((columns * PATTERN_SQUARE_SIZE, PATTERN_HEIGHT), pygame.SRCALPHA)
+
+def build_glow():
+    """Glow over the chess pattern at full intensity; pulsed with set_alpha"""
+    surface = pygame.Surface((WINDOW_WIDTH, PATTERN_HEIGHT), pygame.SRCALPHA)
+    for i in range(5):
+        glow_color = (100, 100, 150, int(20 / (i + 1)))
+        pygame.draw.rect(surface, glow_color, (0, i * 2, WINDOW_WIDTH, PATTERN_HEIGHT - i * 4))
+    return surface
+
+def build_pieces():
+    """Semi-transparent surfaces of the floating background pieces"""
+    surfaces = []
+    for _, _, piece, color, _ in BACKGROUND_PIECES:
         piece_surface = pygame.Surface((60, 60), pygame.SRCALPHA)
         draw_chess_icon(piece_surface, piece, color, (30, 30), 50)
         piece_surface.set_alpha(30)  # Very subtle
-        screen.blit(piece_surface, (float_x, float_y))
+        surfaces.append(piece_surface)
+    return surfaces
 
-    # Draw enhanced chess board pattern at the bottom
-    board_rect = (0, WINDOW_HEIGHT - 120, WINDOW_WIDTH, 120)
-    pattern_surface = pygame.Surface((WINDOW_WIDTH, 120), pygame.SRCALPHA)
-
-    # Animated chess pattern with wave effect
-    square_size = 30
-    for x in range(0, WINDOW_WIDTH, square_size):
-        for y in range(0, 120, square_size):
-            # Wave animation for the pattern
-            wave = math.sin(current_time * 2 + x * 0.02) * 0.3
-            if ((x // square_size) + (y // square_size)) % 2 == 1:
-                alpha = int(80 + 40 * wave)
-                color = (0, 0, 0, alpha)
-            else:
-                alpha = int(120 + 30 * wave)
-                color = (255, 255, 255, alpha)
-
-            square_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-            pygame.draw.rect(square_surface, color, (0, 0, square_size, square_size))
-            pattern_surface.blit(square_surface, (x, y))
-
-    # Add subtle glow effect to the pattern
-    glow_surface = pygame.Surface((WINDOW_WIDTH, 120), pygame.SRCALPHA)
-    glow_intensity = 0.5 + 0.3 * math.sin(current_time * 1.5)
-    for i in range(5):
-        glow_color = (100, 100, 150, int(20 * glow_intensity / (i + 1)))
-        pygame.draw.rect(glow_surface, glow_color, (0, i * 2, WINDOW_WIDTH, 120 - i * 4))
+def build_gradient_strip():
+    """One-pixel-wide column the animated gradient is drawn into, in the screen's format"""
+    return pygame.Surface((1, WINDOW_HEIGHT), 0, screen)
 
-    screen.blit(pattern_surface, board_rect)
-    screen.blit(glow_surface, board_rect)
+def draw_background(screen):
+    """Draw an enhanced animated background with chess pattern
 
-    # Draw subtle vignette effect
-    vignette_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-    center_x, center_y = WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2
-    max_distance = math.sqrt(center_x**2 + center_y**2)
+    Everything static is built once; each frame only computes the
+    animated gradient and pattern alpha as arrays and blits surfaces.
+    """
+    current_time = pygame.time.get_ticks() / 1000.0
 
-    for y in range(0, WINDOW_HEIGHT, 4):  # Sample every 4 pixels for performance
-        for x in range(0, WINDOW_WIDTH, 4):
-            distance = math.sqrt((x - center_x)**2 + (y - center_y)**2)
-            vignette_strength = min(1.0, distance / max_distance)
-            alpha = int(vignette_strength * 40)
-            if alpha > 0:
-                pygame.draw.rect(vignette_surface, (0, 0, 0, alpha), (x, y, 4, 4))
+    # Gradient with a subtle wave, computed for one column and stretched across
+    ys = np.arange(WINDOW_HEIGHT)
+    wave_offset = np.sin(current_time * 0.5 + ys * 0.01) * 5
+    color_values = np.clip(25 + ys / WINDOW_HEIGHT * 25 + wave_offset, 20, 60).astype(np.uint8)
+    strip = background_layer('gradient', build_gradient_strip)
+    pygame.surfarray.blit_array(strip, np.repeat(color_values[None, :, None], 3, axis=2))
+    pygame.transform.scale(strip, (WINDOW_WIDTH, WINDOW_HEIGHT), screen)
 
-    screen.blit(vignette_surface, (0, 0))
+    # Floating chess pieces
+    for (x, y, _, _, speed), piece_surface in zip(BACKGROUND_PIECES, background_layer('pieces', build_pieces)):
+        float_y = y + math.sin(current_time * speed) * 15
+        float_x = x + math.cos(current_time * speed * 0.7) * 8
+        screen.blit(piece_surface, (float_x, float_y))
+
+    # Chess pattern at the bottom, its alpha waving along the columns
+    pattern, dark = background_layer('pattern', build_pattern)
+    column_x = np.arange(pattern.get_width()) * PATTERN_SQUARE_SIZE
+    wave = (np.sin(current_time * 2 + column_x * 0.02) * 0.3)[:, None]
+    alpha = pygame.surfarray.pixels_alpha(pattern)
+    alpha[:] = np.where(dark, 80 + 40 * wave, 120 + 30 * wave).astype(np.uint8)
+    del alpha
+    pattern_surface = background_layer('pattern_surface', build_pattern_surface)
+    pygame.transform.scale(pattern, pattern_surface.get_size(), pattern_surface)
+    screen.blit(pattern_surface, (0, WINDOW_HEIGHT - PATTERN_HEIGHT))
+
+    # Subtle pulsing glow over the pattern
+    glow = background_layer('glow', build_glow)
+    glow.set_alpha(int(255 * (0.5 + 0.3 * math.sin(current_time * 1.5))))
+    screen.blit(glow, (0, WINDOW_HEIGHT - PATTERN_HEIGHT))
+
+    # Vignette, computed once
+    screen.blit(background_layer('vignette', build_vignette), (0, 0))
+
+def play_game(player_color, game_id, player_name, bot_difficulty=None, black_player_name=None):
+    """Switch this window to a game, and back to the lobby when the player leaves it
+
+    The game runs in the lobby's process, so it starts within a frame and
+    shares the display, fonts, piece sprites and server connection.
+    Returns False if the server couldn't start the game.
+    """
+    result = run_game(player_color, game_id, player_name, bot_difficulty,
+                      black_player_name=black_player_name)
+    if result == 'quit':
+        pygame.quit()
+        sys.exit()
+    pygame.display.set_caption("Chess Game Lobby")
+    return result is not None
 
 def main_menu():
     """Main menu screen"""
@@ -784,7 +817,7 @@ def main_menu():
 
     running = True
     while running:
-        time_passed += 1/FPS
+        time_passed += pacer.frame_time
 
         # Get mouse position for hover effects
         mouse_pos = pygame.mouse.get_pos()
@@ -796,7 +829,7 @@ def main_menu():
         exit_button.update(mouse_pos)
 
         # Handle events
-        for event in pygame.event.get():
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -883,7 +916,7 @@ def main_menu():
         screen.blit(pattern_surface, panel_rect)
 
         # Enhanced title animation
-        title_bounce += 0.02 * title_direction
+        title_bounce += 1.2 * pacer.frame_time * title_direction
         if title_bounce > 1:
             title_bounce = 1
             title_direction = -1
@@ -897,23 +930,23 @@ def main_menu():
 
         # Title glow layers
         for i in range(3):
-            glow_font = pygame.font.SysFont('Arial', int(48 * title_scale) + i*2, bold=True)
-            glow_text = glow_font.render("CHESS GAME LOBBY", True, (100, 100, 100, 80 - i*20))
+            glow_font = get_font('Arial', 48 * title_scale + i*2, bold=True, step=SCALED_FONT_STEP)
+            glow_text = render_text(glow_font, "CHESS GAME LOBBY", (100, 100, 100, 80 - i*20))
             glow_rect = glow_text.get_rect(center=(WINDOW_WIDTH // 2 + i, 80 + title_offset + i))
             screen.blit(glow_text, glow_rect)
 
         # Main title with enhanced styling
-        title_font_scaled = pygame.font.SysFont('Arial', int(48 * title_scale), bold=True)
+        title_font_scaled = get_font('Arial', 48 * title_scale, bold=True, step=SCALED_FONT_STEP)
 
         # Title shadow
-        title_shadow = title_font_scaled.render("CHESS GAME LOBBY", True, (20, 20, 20))
+        title_shadow = render_text(title_font_scaled, "CHESS GAME LOBBY", (20, 20, 20))
         shadow_rect = title_shadow.get_rect(center=(WINDOW_WIDTH // 2 + 3, 80 + 3 + title_offset))
         screen.blit(title_shadow, shadow_rect)
 
         # Main title text with subtle color animation
         title_brightness = 150 + int(50 * math.sin(time_passed * 1.2))
         title_color = (title_brightness, title_brightness, title_brightness)
-        title_text = title_font_scaled.render("CHESS GAME LOBBY", True, title_color)
+        title_text = render_text(title_font_scaled, "CHESS GAME LOBBY", title_color)
         title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 80 + title_offset))
         screen.blit(title_text, title_rect)
 
@@ -982,16 +1015,16 @@ def main_menu():
         pygame.draw.rect(screen, border_color, version_rect, 2, border_radius=8)
 
         # Version text with subtle animation
-        version_font = pygame.font.SysFont('Arial', 16, bold=True)
+        version_font = get_font('Arial', 16, bold=True)
         text_brightness = 180 + int(30 * math.sin(time_passed * 1.8))
         version_color = (text_brightness, text_brightness, text_brightness + 20)
-        version_text = version_font.render("v2.0.0", True, version_color)
+        version_text = render_text(version_font, "v2.0.0", version_color)
         version_text_rect = version_text.get_rect(center=version_rect.center)
         screen.blit(version_text, version_text_rect)
 
         # Update display
         pygame.display.flip()
-        clock.tick(FPS)
+        pacer.tick()
 
 def create_game_screen():
     """Create game screen"""
@@ -1057,8 +1090,8 @@ def create_game_screen():
 
     running = True
     while running:
-        time_passed += 1/FPS
-        piece_rotation += 0.5  # Rotate chess piece
+        time_passed += pacer.frame_time
+        piece_rotation += 30 * pacer.frame_time  # Rotate chess piece
 
         # Get mouse position for hover effects
         mouse_pos = pygame.mouse.get_pos()
@@ -1066,7 +1099,7 @@ def create_game_screen():
         back_button.update(mouse_pos)
 
         # Handle events
-        for event in pygame.event.get():
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -1089,9 +1122,9 @@ def create_game_screen():
                             game_id = lobby.create_game(game_name_input.text, player_name_input.text)
 
                             # Start the game as white player
-                            import subprocess
-                            subprocess.Popen(["python", "two_player_chess.py", "white", game_id, player_name_input.text])
-                            return
+                            if play_game("white", game_id, player_name_input.text):
+                                return
+                            error_message = "Could not reach the chess server"
 
                     action = back_button.check_click(mouse_pos)
                     if action == "back":
@@ -1125,8 +1158,8 @@ def create_game_screen():
 
         # Draw title with animation
         title_offset = int(math.sin(time_passed * 2) * 3)
-        title_shadow = header_font.render("Create New Game", True, (30, 30, 30))
-        title_text = header_font.render("Create New Game", True, TITLE_COLOR)
+        title_shadow = render_text(header_font, "Create New Game", (30, 30, 30))
+        title_text = render_text(header_font, "Create New Game", TITLE_COLOR)
 
         # Shadow
         shadow_rect = title_shadow.get_rect(center=(WINDOW_WIDTH // 2 + 2, panel_rect.y - 50 + 2 + title_offset))
@@ -1138,11 +1171,11 @@ def create_game_screen():
 
         # Draw labels with icons
         draw_chess_icon(screen, "rook", "white", (WINDOW_WIDTH // 2 - input_width // 2 - 30, WINDOW_HEIGHT // 2 - 80 + 25), 20)
-        game_name_label = font.render("Game Name:", True, WHITE)
+        game_name_label = render_text(font, "Game Name:", WHITE)
         screen.blit(game_name_label, (WINDOW_WIDTH // 2 - input_width // 2, WINDOW_HEIGHT // 2 - 110))
 
         draw_chess_icon(screen, "pawn", "white", (WINDOW_WIDTH // 2 - input_width // 2 - 30, WINDOW_HEIGHT // 2 + 20 + 25), 20)
-        player_name_label = font.render("Your Name:", True, WHITE)
+        player_name_label = render_text(font, "Your Name:", WHITE)
         screen.blit(player_name_label, (WINDOW_WIDTH // 2 - input_width // 2, WINDOW_HEIGHT // 2 - 10))
 
         # Draw input boxes
@@ -1160,13 +1193,13 @@ def create_game_screen():
             pygame.draw.rect(screen, (80, 0, 0), error_panel, border_radius=10)
             pygame.draw.rect(screen, RED, error_panel, 2, border_radius=10)
 
-            error_text = font.render(error_message, True, WHITE)
+            error_text = render_text(font, error_message, WHITE)
             error_rect = error_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 200))
             screen.blit(error_text, error_rect)
 
         # Update display
         pygame.display.flip()
-        clock.tick(FPS)
+        pacer.tick()
 
 def join_game_screen():
     """Join game screen"""
@@ -1297,7 +1330,7 @@ def join_game_screen():
             item.update(mouse_pos)
 
         # Handle events
-        for event in pygame.event.get():
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -1341,9 +1374,9 @@ def join_game_screen():
                                 # Join the game
                                 if lobby.join_game(game_id, player_name_input.text):
                                     # Start the game as black player
-                                    import subprocess
-                                    subprocess.Popen(["python", "two_player_chess.py", "black", game_id, player_name_input.text])
-                                    return
+                                    if play_game("black", game_id, player_name_input.text):
+                                        return
+                                    error_message = "Could not reach the chess server"
                                 else:
                                     error_message = "Failed to join game"
 
@@ -1360,8 +1393,8 @@ def join_game_screen():
         screen.blit(pattern_surface, board_rect)
 
         # Draw title - larger and centered
-        title_font = pygame.font.SysFont('Arial', 40, bold=True)
-        title_text = title_font.render("Available Games", True, WHITE)  # White text
+        title_font = get_font('Arial', 40, bold=True)
+        title_text = render_text(title_font, "Available Games", WHITE)  # White text
         title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 60))
         screen.blit(title_text, title_rect)
 
@@ -1370,7 +1403,7 @@ def join_game_screen():
         refresh_button.draw(screen)
 
         # Draw search box
-        search_label = font.render("Search:", True, WHITE)
+        search_label = render_text(font, "Search:", WHITE)
         # Position the label to align with the centered search box
         search_label_x = WINDOW_WIDTH // 2 - 275 - search_label.get_width() - 10
         screen.blit(search_label, (search_label_x, 110))  # Aligned with search box
@@ -1397,12 +1430,12 @@ def join_game_screen():
 
         # Draw game list
         if not filtered_games:
-            no_games_text = font.render("No games available. Try refreshing or create your own game.", True, WHITE)
+            no_games_text = render_text(font, "No games available. Try refreshing or create your own game.", WHITE)
             no_games_rect = no_games_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
             screen.blit(no_games_text, no_games_rect)
         else:
             # Show how many games are available
-            games_count_text = small_font.render(f"Showing {len(visible_games)} of {len(filtered_games)} games", True, LIGHT_GRAY)
+            games_count_text = render_text(small_font, f"Showing {len(visible_games)} of {len(filtered_games)} games", LIGHT_GRAY)
             # Position to align with the centered game list
             screen.blit(games_count_text, (WINDOW_WIDTH // 2 - 425, list_area_top - 30))  # Aligned with game list
 
@@ -1411,7 +1444,7 @@ def join_game_screen():
                 item.draw(screen)
 
         # Draw player name input with better positioning
-        player_name_label = font.render("Your Name:", True, WHITE)
+        player_name_label = render_text(font, "Your Name:", WHITE)
         # Position the label to align with the centered player name input
         name_label_x = WINDOW_WIDTH // 2 - 275 - player_name_label.get_width() - 10
         screen.blit(player_name_label, (name_label_x, WINDOW_HEIGHT - 110))  # Aligned with input box
@@ -1419,13 +1452,13 @@ def join_game_screen():
 
         # Draw error message if any
         if error_message:
-            error_text = font.render(error_message, True, RED)
+            error_text = render_text(font, error_message, RED)
             error_rect = error_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 40))
             screen.blit(error_text, error_rect)
 
         # Update display
         pygame.display.flip()
-        clock.tick(FPS)
+        pacer.tick()
 
 def spectate_game_screen():
     """Spectate game screen - shows in-progress games"""
@@ -1543,7 +1576,7 @@ def spectate_game_screen():
             item.update(mouse_pos)
 
         # Handle events
-        for event in pygame.event.get():
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -1586,9 +1619,9 @@ def spectate_game_screen():
                             # Spectate the game
                             if lobby.spectate_game(game_id, spectator_name):
                                 # Start the game as spectator
-                                import subprocess
-                                subprocess.Popen(["python", "two_player_chess.py", "spectator", game_id, spectator_name])
-                                return
+                                if play_game("spectator", game_id, spectator_name):
+                                    return
+                                error_message = "Could not reach the chess server"
                             else:
                                 error_message = "Failed to spectate game"
 
@@ -1596,7 +1629,7 @@ def spectate_game_screen():
         draw_background(screen)
 
         # Draw title at the top center of the screen
-        title_text = header_font.render("Spectate Games", True, TITLE_COLOR)
+        title_text = render_text(header_font, "Spectate Games", TITLE_COLOR)
         title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 25))
         screen.blit(title_text, title_rect)
 
@@ -1628,12 +1661,12 @@ def spectate_game_screen():
 
         # Draw game list
         if not filtered_games:
-            no_games_text = font.render("No games in progress. Try refreshing or check back later.", True, WHITE)
+            no_games_text = render_text(font, "No games in progress. Try refreshing or check back later.", WHITE)
             no_games_rect = no_games_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
             screen.blit(no_games_text, no_games_rect)
         else:
             # Show how many games are available
-            games_count_text = small_font.render(f"Showing {len(visible_games)} of {len(filtered_games)} games", True, LIGHT_GRAY)
+            games_count_text = render_text(small_font, f"Showing {len(visible_games)} of {len(filtered_games)} games", LIGHT_GRAY)
             # Position to align with the game list as shown in screenshot
             screen.blit(games_count_text, (WINDOW_WIDTH // 2 - 80, list_area_top - 30))
 
@@ -1662,13 +1695,13 @@ def spectate_game_screen():
 
         # Draw error message if any
         if error_message:
-            error_text = font.render(error_message, True, RED)
+            error_text = render_text(font, error_message, RED)
             error_rect = error_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 40))
             screen.blit(error_text, error_rect)
 
         # Update display
         pygame.display.flip()
-        clock.tick(FPS)
+        pacer.tick()
 
 def quick_match_screen():
     """Quick Match screen - allows setting up a two-player game quickly"""
@@ -1774,7 +1807,7 @@ def quick_match_screen():
 
     running = True
     while running:
-        time_passed += 1/FPS
+        time_passed += pacer.frame_time
 
         # Get mouse position for hover effects
         mouse_pos = pygame.mouse.get_pos()
@@ -1785,7 +1818,7 @@ def quick_match_screen():
         hard_button.update(mouse_pos)
 
         # Handle events
-        for event in pygame.event.get():
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -1825,39 +1858,15 @@ def quick_match_screen():
                             game_id = str(uuid.uuid4())
 
                             if play_against_bot:
-                                # Start a game against the bot
-                                import subprocess
-                                subprocess.Popen([
-                                    "python",
-                                    "two_player_chess.py",
-                                    "white",
-                                    game_id,
-                                    player1_name_input.text,
-                                    "--bot",
-                                    bot_difficulty
-                                ])
+                                # Start a game against the bot, which the server hosts
+                                if play_game("white", game_id, player1_name_input.text, bot_difficulty):
+                                    return
+                                error_message = "Could not reach the chess server"
                             else:
-                                # Start a regular two-player game
-                                import subprocess
-
-                                # Launch the white player window
-                                subprocess.Popen([
-                                    "python",
-                                    "two_player_chess.py",
-                                    "white",
-                                    game_id,
-                                    player1_name_input.text
-                                ])
-
-                                # Launch the black player window
-                                subprocess.Popen([
-                                    "python",
-                                    "two_player_chess.py",
-                                    "black",
-                                    game_id,
-                                    player2_name
-                                ])
-                            return
+                                # Start a two-player game, both players taking turns at this window
+                                play_game("white", game_id, player1_name_input.text,
+                                          black_player_name=player2_name)
+                                return
 
                     action = back_button.check_click(mouse_pos)
                     if action == "back":
@@ -1871,8 +1880,8 @@ def quick_match_screen():
 
         # Draw title with animation
         title_offset = int(math.sin(time_passed * 2) * 3)
-        title_shadow = header_font.render("Quick Match", True, (30, 30, 30))
-        title_text = header_font.render("Quick Match", True, TITLE_COLOR)
+        title_shadow = render_text(header_font, "Quick Match", (30, 30, 30))
+        title_text = render_text(header_font, "Quick Match", TITLE_COLOR)
 
         # Shadow
         shadow_rect = title_shadow.get_rect(center=(WINDOW_WIDTH // 2 + 2, panel_rect.y - 50 + 2 + title_offset))
@@ -1884,13 +1893,13 @@ def quick_match_screen():
 
         # Draw explanation text above the name input if bot is selected
         if play_against_bot:
-            explanation_text = font.render("Play against the computer - test your skills!", True, (255, 255, 150))
+            explanation_text = render_text(font, "Play against the computer - test your skills!", (255, 255, 150))
             explanation_rect = explanation_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 120))
             screen.blit(explanation_text, explanation_rect)
 
         # Draw labels with icons
         draw_chess_icon(screen, "king", "white", (WINDOW_WIDTH // 2 - input_width // 2 - 30, WINDOW_HEIGHT // 2 - 60 + 25), 20)
-        player1_label = font.render("Your Name:", True, WHITE)
+        player1_label = render_text(font, "Your Name:", WHITE)
         screen.blit(player1_label, (WINDOW_WIDTH // 2 - input_width // 2, WINDOW_HEIGHT // 2 - 90))
 
         # Draw input box
@@ -1908,7 +1917,7 @@ def quick_match_screen():
         pygame.draw.circle(screen, (100, 200, 100) if play_against_bot else (150, 150, 170), toggle_pos, toggle_radius)
 
         # Draw toggle text
-        toggle_text = font.render("Play against Bot", True, WHITE)
+        toggle_text = render_text(font, "Play against Bot", WHITE)
         toggle_text_rect = toggle_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10 + 15))
         screen.blit(toggle_text, toggle_text_rect)
 
@@ -1941,7 +1950,7 @@ def quick_match_screen():
                            (hard_button.rect.x + 20, hard_button.rect.y + hard_button.rect.height // 2), 20)
 
             # Add "SELECTED" indicator to the chosen difficulty
-            selected_text = small_font.render("SELECTED", True, (255, 255, 100))
+            selected_text = render_text(small_font, "SELECTED", (255, 255, 100))
 
             # Position the indicator below the selected button
             if bot_difficulty == "easy":
@@ -1970,7 +1979,7 @@ def quick_match_screen():
 
         # Draw explanation text for two-player mode
         if not play_against_bot:
-            explanation_text = small_font.render("This will open two game windows - one for each player", True, LIGHT_GRAY)
+            explanation_text = render_text(small_font, "This will open two game windows - one for each player", LIGHT_GRAY)
             explanation_rect = explanation_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 180))
             screen.blit(explanation_text, explanation_rect)
 
@@ -1981,13 +1990,13 @@ def quick_match_screen():
             pygame.draw.rect(screen, (80, 0, 0), error_panel, border_radius=10)
             pygame.draw.rect(screen, RED, error_panel, 2, border_radius=10)
 
-            error_text = font.render(error_message, True, WHITE)
+            error_text = render_text(font, error_message, WHITE)
             error_rect = error_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 230))
             screen.blit(error_text, error_rect)
 
         # Update display
         pygame.display.flip()
-        clock.tick(FPS)
+        pacer.tick()
 
 def local_game_screen():
     """Local two-player game screen - allows playing chess on the same computer"""
@@ -2050,7 +2059,7 @@ def local_game_screen():
 
     running = True
     while running:
-        time_passed += 1/FPS
+        time_passed += pacer.frame_time
 
         # Get mouse position for hover effects
         mouse_pos = pygame.mouse.get_pos()
@@ -2058,7 +2067,7 @@ def local_game_screen():
         back_button.update(mouse_pos)
 
         # Handle events
-        for event in pygame.event.get():
+        for event in pacer.events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -2077,29 +2086,12 @@ def local_game_screen():
                         elif not player2_name_input.text:
                             error_message = "Please enter Player 2's name"
                         else:
-                            # Start the game directly using two_player_chess.py
-                            import subprocess
-
                             # Generate a unique game ID
                             game_id = str(uuid.uuid4())
 
-                            # Launch the white player window
-                            subprocess.Popen([
-                                "python",
-                                "two_player_chess.py",
-                                "white",
-                                game_id,
-                                player1_name_input.text
-                            ])
-
-                            # Launch the black player window
-                            subprocess.Popen([
-                                "python",
-                                "two_player_chess.py",
-                                "black",
-                                game_id,
-                                player2_name_input.text
-                            ])
+                            # Both players take turns at this window
+                            play_game("white", game_id, player1_name_input.text,
+                                      black_player_name=player2_name_input.text)
                             return
 
                     action = back_button.check_click(mouse_pos)
@@ -2114,8 +2106,8 @@ def local_game_screen():
 
         # Draw title with animation
         title_offset = int(math.sin(time_passed * 2) * 3)
-        title_shadow = header_font.render("Local Two-Player Game", True, (30, 30, 30))
-        title_text = header_font.render("Local Two-Player Game", True, TITLE_COLOR)
+        title_shadow = render_text(header_font, "Local Two-Player Game", (30, 30, 30))
+        title_text = render_text(header_font, "Local Two-Player Game", TITLE_COLOR)
 
         # Shadow
         shadow_rect = title_shadow.get_rect(center=(WINDOW_WIDTH // 2 + 2, panel_rect.y - 50 + 2 + title_offset))
@@ -2127,11 +2119,11 @@ def local_game_screen():
 
         # Draw labels with icons
         draw_chess_icon(screen, "king", "white", (WINDOW_WIDTH // 2 - input_width // 2 - 30, WINDOW_HEIGHT // 2 - 80 + 25), 20)
-        player1_label = font.render("Player 1 (White):", True, WHITE)
+        player1_label = render_text(font, "Player 1 (White):", WHITE)
         screen.blit(player1_label, (WINDOW_WIDTH // 2 - input_width // 2, WINDOW_HEIGHT // 2 - 110))
 
         draw_chess_icon(screen, "king", "black", (WINDOW_WIDTH // 2 - input_width // 2 - 30, WINDOW_HEIGHT // 2 + 20 + 25), 20)
-        player2_label = font.render("Player 2 (Black):", True, WHITE)
+        player2_label = render_text(font, "Player 2 (Black):", WHITE)
         screen.blit(player2_label, (WINDOW_WIDTH // 2 - input_width // 2, WINDOW_HEIGHT // 2 - 10))
 
         # Draw input boxes
@@ -2143,7 +2135,7 @@ def local_game_screen():
         back_button.draw(screen)
 
         # Draw explanation text
-        explanation_text = small_font.render("Play chess with two players on the same computer", True, LIGHT_GRAY)
+        explanation_text = render_text(small_font, "Play chess with two players on the same computer", LIGHT_GRAY)
         explanation_rect = explanation_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 80))
         screen.blit(explanation_text, explanation_rect)
 
@@ -2154,13 +2146,13 @@ def local_game_screen():
             pygame.draw.rect(screen, (80, 0, 0), error_panel, border_radius=10)
             pygame.draw.rect(screen, RED, error_panel, 2, border_radius=10)
 
-            error_text = font.render(error_message, True, WHITE)
+            error_text = render_text(font, error_message, WHITE)
             error_rect = error_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 200))
             screen.blit(error_text, error_rect)
 
         # Update display
         pygame.display.flip()
-        clock.tick(FPS)
+        pacer.tick()
 
 def main():
     """Main function"""
@@ -2183,6 +2175,7 @@ def main():
                 running = False
     finally:
         # Clean up resources
+        get_client().disconnect()
         pygame.quit()
         sys.exit()
 
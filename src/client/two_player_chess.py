@@ -7,26 +7,36 @@ Usage:
 - python two_player_chess.py black [game_id] [player_name]      # Play as black
 - python two_player_chess.py spectator [game_id] [player_name]  # Spectate game
 - python two_player_chess.py white [game_id] [player_name] --bot [difficulty]  # Play vs AI
+- python two_player_chess.py white [game_id] [player_name] --offline  # Share state through a file
 
-If no arguments are provided, an interactive menu will be shown.
+Games are played through the chess server, which must be running unless
+--offline is given. If no arguments are provided, an interactive menu will be shown.
 """
 import pygame
 import sys
 import os
+import copy
 import json
 import time
 import math
-import uuid
 import argparse
+import threading
 from .chess_client import get_client
 from ..utils.chess_game_assets import (
     draw_enhanced_board,
     draw_enhanced_sidebar,
     draw_enhanced_highlight,
-    EnhancedButton
+    draw_sidebar_background,
+    draw_turn_indicator,
+    turn_indicator_rect,
+    EnhancedButton,
+    LayerCache
 )
-from ..utils.enhanced_chess_pieces import create_enhanced_piece_images
+from ..utils.piece_atlas import load_piece_images
 from ..utils.chess_bot import ChessBot
+from ..utils.chess_rules import ChessGame
+from ..utils.font_cache import get_font
+from ..utils.frame_pacer import FramePacer, wake
 
 # Initialize pygame
 pygame.init()
@@ -75,14 +85,22 @@ CREAM = (255, 253, 208)         # Cream color for text contrast
 PIECE_TYPES = ['pawn', 'rook', 'knight', 'bishop', 'queen', 'king']
 COLORS = ['white', 'black']
 
-# File for sharing game state
+# File for sharing game state in offline mode
 GAME_STATE_FILE_TEMPLATE = "../../data/game_states/chess_game_state_{}.json"
+loaded_signatures = {}  # File signature of each state file as last loaded or saved
+
+# Joining a game on the server
+JOIN_TIMEOUT = 10.0        # Seconds to wait for the server to set up the game
+JOIN_RETRY_INTERVAL = 0.5  # Seconds between join attempts while the game doesn't exist yet
+
+# Background, empty board and sidebar background, rendered once per window size
+static_layers = LayerCache()
 
 # Fonts
-title_font = pygame.font.SysFont('Arial', 28, bold=True)
-header_font = pygame.font.SysFont('Arial', 18, bold=True)
-font = pygame.font.SysFont('Arial', 16)
-small_font = pygame.font.SysFont('Arial', 14)
+title_font = get_font('Arial', 28, bold=True)
+header_font = get_font('Arial', 18, bold=True)
+font = get_font('Arial', 16)
+small_font = get_font('Arial', 14)
 
 # Button class for interactive UI elements
 class Button:
@@ -116,596 +134,147 @@ class Button:
             return self.action
         return None
 
-# Game state
-class ChessGame:
-    def __init__(self, game_id=None, player_name=None):
-        self.game_id = game_id if game_id else str(uuid.uuid4())
-        self.board = self.create_initial_board()
-        self.selected_piece = None
-        self.valid_moves = []  # Store valid moves for the selected piece
-        self.turn = 'white'
-        self.status = 'in_progress'
-        self.messages = []
-        self.chat_messages = []
-        self.last_update = time.time()
-        self.white_player_name = player_name if player_name else "White Player"
-        self.black_player_name = "Waiting for opponent..."
-        self.add_message("System", "Welcome to Chess!")
-        self.add_chat("System", "Chat enabled. Type messages below to communicate with your opponent.")
-
-    def reset_game(self):
-        """Reset the game to initial state"""
-        self.board = self.create_initial_board()
-        self.selected_piece = None
-        self.valid_moves = []
-        self.turn = 'white'
-        self.status = 'in_progress'
-        self.last_update = time.time()
-        self.add_message("System", "Game has been reset!")
-        self.add_chat("System", "New game started! Chat is enabled for this game.")
-
-    def clean_expired_messages(self):
-        """Remove chat messages that have expired"""
-        # Removed disappearing message expiration functionality
-        pass
-
-    def set_black_player(self, player_name):
-        """Set the black player name when they join"""
-        self.black_player_name = player_name
-        self.add_message("System", f"{player_name} has joined as Black!")
-        self.add_chat("System", f"{player_name} has joined the game.")
-
-    def create_initial_board(self):
-        """Create the initial chess board"""
-        board = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-
-        # Set up pawns
-        for col in range(BOARD_SIZE):
-            board[1][col] = {'type': 'pawn', 'color': 'black'}
-            board[6][col] = {'type': 'pawn', 'color': 'white'}
-
-        # Set up other pieces for black
-        board[0][0] = {'type': 'rook', 'color': 'black'}
-        board[0][1] = {'type': 'knight', 'color': 'black'}
-        board[0][2] = {'type': 'bishop', 'color': 'black'}
-        board[0][3] = {'type': 'queen', 'color': 'black'}
-        board[0][4] = {'type': 'king', 'color': 'black'}
-        board[0][5] = {'type': 'bishop', 'color': 'black'}
-        board[0][6] = {'type': 'knight', 'color': 'black'}
-        board[0][7] = {'type': 'rook', 'color': 'black'}
-
-        # Set up other pieces for white
-        board[7][0] = {'type': 'rook', 'color': 'white'}
-        board[7][1] = {'type': 'knight', 'color': 'white'}
-        board[7][2] = {'type': 'bishop', 'color': 'white'}
-        board[7][3] = {'type': 'queen', 'color': 'white'}
-        board[7][4] = {'type': 'king', 'color': 'white'}
-        board[7][5] = {'type': 'bishop', 'color': 'white'}
-        board[7][6] = {'type': 'knight', 'color': 'white'}
-        board[7][7] = {'type': 'rook', 'color': 'white'}
-
-        return board
-
-    def add_message(self, sender, text):
-        """Add a message to the game log"""
-        self.messages.append({'sender': sender, 'text': text})
-        if len(self.messages) > 10:
-            self.messages.pop(0)
-
-    def add_chat(self, sender, text):
-        """Add a message to the chat
-
-        Args:
-            sender: Name of the message sender
-            text: Content of the message
-        """
-        self.chat_messages.append({
-            'sender': sender,
-            'text': text,
-            'time': time.time()
-        })
-        if len(self.chat_messages) > 20:
-            self.chat_messages.pop(0)
-
-    def get_valid_moves(self, pos):
-        """Get all valid moves for a piece at the given position"""
-        row, col = pos
-        piece = self.board[row][col]
-
-        if not piece:
-            return []
-
-        valid_moves = []
-        piece_type = piece['type']
-        color = piece['color']
-
-        # Pawn movement
-        if piece_type == 'pawn':
-            # Direction depends on color
-            direction = -1 if color == 'white' else 1
-
-            # Forward move (1 square)
-            new_row = row + direction
-            if 0 <= new_row < BOARD_SIZE and not self.board[new_row][col]:
-                valid_moves.append((new_row, col))
-
-                # Initial two-square move
-                if (color == 'white' and row == 6) or (color == 'black' and row == 1):
-                    new_row = row + 2 * direction
-                    if 0 <= new_row < BOARD_SIZE and not self.board[new_row][col] and not self.board[row + direction][col]:
-                        valid_moves.append((new_row, col))
-
-            # Diagonal captures
-            for offset in [-1, 1]:
-                new_col = col + offset
-                new_row = row + direction
-                if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
-                    target = self.board[new_row][new_col]
-                    if target and target['color'] != color:
-                        valid_moves.append((new_row, new_col))
-
-        # Rook movement (horizontal and vertical)
-        elif piece_type == 'rook':
-            # Check in all four directions (up, right, down, left)
-            directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-            for dr, dc in directions:
-                for i in range(1, BOARD_SIZE):
-                    new_row, new_col = row + i * dr, col + i * dc
-
-                    # Check if position is on the board
-                    if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
-                        break
-
-                    target = self.board[new_row][new_col]
-                    if not target:
-                        valid_moves.append((new_row, new_col))
-                    elif target['color'] != color:
-                        valid_moves.append((new_row, new_col))
-                        break
-                    else:
-                        break
-
-        # Knight movement (L-shape)
-        elif piece_type == 'knight':
-            knight_moves = [
-                (-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                (1, -2), (1, 2), (2, -1), (2, 1)
-            ]
-
-            for dr, dc in knight_moves:
-                new_row, new_col = row + dr, col + dc
-
-                # Check if position is on the board
-                if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
-                    continue
-
-                target = self.board[new_row][new_col]
-                if not target or target['color'] != color:
-                    valid_moves.append((new_row, new_col))
-
-        # Bishop movement (diagonal)
-        elif piece_type == 'bishop':
-            # Check in all four diagonal directions
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-            for dr, dc in directions:
-                for i in range(1, BOARD_SIZE):
-                    new_row, new_col = row + i * dr, col + i * dc
-
-                    # Check if position is on the board
-                    if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
-                        break
-
-                    target = self.board[new_row][new_col]
-                    if not target:
-                        valid_moves.append((new_row, new_col))
-                    elif target['color'] != color:
-                        valid_moves.append((new_row, new_col))
-                        break
-                    else:
-                        break
-
-        # Queen movement (combination of rook and bishop)
-        elif piece_type == 'queen':
-            # Check in all eight directions
-            directions = [
-                (-1, 0), (0, 1), (1, 0), (0, -1),  # Horizontal and vertical
-                (-1, -1), (-1, 1), (1, -1), (1, 1)  # Diagonal
-            ]
-
-            for dr, dc in directions:
-                for i in range(1, BOARD_SIZE):
-                    new_row, new_col = row + i * dr, col + i * dc
-
-                    # Check if position is on the board
-                    if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
-                        break
-
-                    target = self.board[new_row][new_col]
-                    if not target:
-                        valid_moves.append((new_row, new_col))
-                    elif target['color'] != color:
-                        valid_moves.append((new_row, new_col))
-                        break
-                    else:
-                        break
-
-        # King movement (one square in any direction)
-        elif piece_type == 'king':
-            # Check all eight surrounding squares
-            directions = [
-                (-1, -1), (-1, 0), (-1, 1),
-                (0, -1),           (0, 1),
-                (1, -1),  (1, 0),  (1, 1)
-            ]
-
-            for dr, dc in directions:
-                new_row, new_col = row + dr, col + dc
-
-                # Check if position is on the board
-                if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
-                    continue
-
-                target = self.board[new_row][new_col]
-                if not target or target['color'] != color:
-                    valid_moves.append((new_row, new_col))
-
-        return valid_moves
-
-    def is_valid_move(self, from_pos, to_pos, player_color):
-        """Check if a move is valid"""
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-
-        # Check if positions are on the board
-        if not (0 <= from_row < BOARD_SIZE and 0 <= from_col < BOARD_SIZE and
-                0 <= to_row < BOARD_SIZE and 0 <= to_col < BOARD_SIZE):
-            return False
-
-        # Check if there's a piece at the from position
-        piece = self.board[from_row][from_col]
-        if not piece:
-            return False
-
-        # Check if it's the piece's turn and color
-        if piece['color'] != self.turn or piece['color'] != player_color:
-            return False
-
-        # Check if the destination has a piece of the same color
-        dest_piece = self.board[to_row][to_col]
-        if dest_piece and dest_piece['color'] == piece['color']:
-            return False
-
-        # Get valid moves for the piece and check if the destination is among them
-        valid_moves = self.get_valid_moves(from_pos)
-        return (to_row, to_col) in valid_moves
-
-    def find_king(self, color):
-        """Find the position of the king of the given color"""
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.board[row][col]
-                if piece and piece['type'] == 'king' and piece['color'] == color:
-                    return (row, col)
-        return None  # Should never happen in a valid chess game
-
-    def is_square_under_attack(self, pos, attacking_color):
-        """Check if a square is under attack by any piece of the given color"""
-        row, col = pos
-
-        # Check attacks from pawns
-        pawn_direction = 1 if attacking_color == 'white' else -1
-        for offset in [-1, 1]:
-            attack_row = row + pawn_direction
-            attack_col = col + offset
-            if 0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE:
-                piece = self.board[attack_row][attack_col]
-                if piece and piece['type'] == 'pawn' and piece['color'] == attacking_color:
-                    return True
-
-        # Check attacks from knights
-        knight_moves = [
-            (-2, -1), (-2, 1), (-1, -2), (-1, 2),
-            (1, -2), (1, 2), (2, -1), (2, 1)
-        ]
-        for dr, dc in knight_moves:
-            attack_row, attack_col = row + dr, col + dc
-            if 0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE:
-                piece = self.board[attack_row][attack_col]
-                if piece and piece['type'] == 'knight' and piece['color'] == attacking_color:
-                    return True
-
-        # Check attacks from kings (for adjacent squares)
-        king_moves = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),           (0, 1),
-            (1, -1),  (1, 0),  (1, 1)
-        ]
-        for dr, dc in king_moves:
-            attack_row, attack_col = row + dr, col + dc
-            if 0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE:
-                piece = self.board[attack_row][attack_col]
-                if piece and piece['type'] == 'king' and piece['color'] == attacking_color:
-                    return True
-
-        # Check attacks from rooks, bishops, and queens (along lines)
-        # Rook directions (horizontal and vertical)
-        rook_directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-        # Bishop directions (diagonal)
-        bishop_directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-
-        # Check all directions
-        for dr, dc in rook_directions + bishop_directions:
-            for i in range(1, BOARD_SIZE):
-                attack_row, attack_col = row + i * dr, col + i * dc
-
-                # Check if position is on the board
-                if not (0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE):
-                    break
-
-                piece = self.board[attack_row][attack_col]
-                if piece:
-                    if piece['color'] == attacking_color:
-                        # Check if this piece can attack along this direction
-                        can_attack = False
-                        if piece['type'] == 'queen':
-                            can_attack = True
-                        elif piece['type'] == 'rook' and (dr, dc) in rook_directions:
-                            can_attack = True
-                        elif piece['type'] == 'bishop' and (dr, dc) in bishop_directions:
-                            can_attack = True
-
-                        if can_attack:
-                            return True
-                    # If we hit any piece (even our own), we can't go further in this direction
-                    break
-
-        return False
-
-    def is_in_check(self, color):
-        """Check if the king of the given color is in check"""
-        king_pos = self.find_king(color)
-        if not king_pos:
-            return False  # Should never happen
-
-        # The opposing color
-        opposing_color = 'black' if color == 'white' else 'white'
-
-        # Check if the king's position is under attack
-        return self.is_square_under_attack(king_pos, opposing_color)
-
-    def would_move_cause_check(self, from_pos, to_pos, color):
-        """Check if making a move would put or leave the king in check"""
-        # Make a temporary move
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-
-        # Save the current state
-        original_piece = self.board[from_row][from_col]
-        captured_piece = self.board[to_row][to_col]
-
-        # Make the move temporarily
-        self.board[to_row][to_col] = original_piece
-        self.board[from_row][from_col] = None
-
-        # Check if the king is in check after the move
-        in_check = self.is_in_check(color)
-
-        # Restore the board
-        self.board[from_row][from_col] = original_piece
-        self.board[to_row][to_col] = captured_piece
-
-        return in_check
-
-    def get_all_valid_moves_for_color(self, color):
-        """Get all valid moves for all pieces of the given color"""
-        all_moves = []
-
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.board[row][col]
-                if piece and piece['color'] == color:
-                    from_pos = (row, col)
-                    # Get all potential moves for this piece
-                    potential_moves = self.get_valid_moves(from_pos)
-
-                    # Filter out moves that would leave the king in check
-                    for to_pos in potential_moves:
-                        if not self.would_move_cause_check(from_pos, to_pos, color):
-                            all_moves.append((from_pos, to_pos))
-
-        return all_moves
-
-    def is_checkmate(self, color):
-        """Check if the given color is in checkmate"""
-        # First, check if the king is in check
-        if not self.is_in_check(color):
-            return False
-
-        # If in check, see if there are any valid moves that can get out of check
-        return len(self.get_all_valid_moves_for_color(color)) == 0
-
-    def is_stalemate(self, color):
-        """Check if the given color is in stalemate"""
-        # First, check if the king is NOT in check
-        if self.is_in_check(color):
-            return False
-
-        # If not in check, see if there are any valid moves
-        return len(self.get_all_valid_moves_for_color(color)) == 0
-
-    def make_move(self, from_pos, to_pos, player_color):
-        """Make a move on the board"""
-        if not self.is_valid_move(from_pos, to_pos, player_color):
-            return False
-
-        # Check if this move would leave the king in check
-        if self.would_move_cause_check(from_pos, to_pos, player_color):
-            self.add_message("System", "Invalid move: would leave your king in check")
-            return False
-
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-
-        # Get the piece and update its position
-        piece = self.board[from_row][from_col]
-        captured = self.board[to_row][to_col]
-
-        # Update the board
-        self.board[to_row][to_col] = piece
-        self.board[from_row][from_col] = None
-
-        # Add message about the move
-        move_text = f"{piece['color']} {piece['type']} moved from ({from_row},{from_col}) to ({to_row},{to_col})"
-        if captured:
-            move_text += f", capturing {captured['color']} {captured['type']}"
-        self.add_message("System", move_text)
-
-        # Switch turns
-        next_color = 'black' if player_color == 'white' else 'white'
-        self.turn = next_color
-
-        # Check for check, checkmate, or stalemate
-        if self.is_in_check(next_color):
-            if self.is_checkmate(next_color):
-                self.status = f"{player_color}_wins"
-                self.add_message("System", f"Checkmate! {player_color.capitalize()} wins!")
-                # Disable chat when game ends
-                self.add_chat("System", "Game has ended. Chat is now disabled.")
-            else:
-                self.add_message("System", f"{next_color.capitalize()} is in check!")
-        elif self.is_stalemate(next_color):
-            self.status = "stalemate"
-            self.add_message("System", "Stalemate! The game is a draw.")
-            # Disable chat when game ends
-            self.add_chat("System", "Game has ended. Chat is now disabled.")
-
-        # Update timestamp
-        self.last_update = time.time()
-
-        return True
-
-    def to_dict(self):
-        """Convert game state to dictionary"""
-        return {
-            'game_id': self.game_id,
-            'board': self.board,
-            'turn': self.turn,
-            'status': self.status,
-            'messages': self.messages,
-            'chat_messages': self.chat_messages,
-            'last_update': self.last_update,
-            'white_player_name': self.white_player_name,
-            'black_player_name': self.black_player_name
-        }
-
-    def from_dict(self, data):
-        """Update game state from dictionary"""
-        self.game_id = data.get('game_id', self.game_id)
-        self.board = data['board']
-        self.turn = data['turn']
-        self.status = data['status']
-        self.messages = data['messages']
-        self.last_update = data['last_update']
-
-        # Handle player names
-        self.white_player_name = data.get('white_player_name', "White Player")
-        self.black_player_name = data.get('black_player_name', "Black Player")
-
-        # Handle chat messages (for backward compatibility)
-        if 'chat_messages' in data:
-            # Preserve existing chat messages if we're loading
-            self.chat_messages = data['chat_messages']
+def file_signature(stat):
+    """Identity of a file's contents from its stat: inode, modification time and size"""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
 def save_game_state(game):
-    """Save game state using the network client"""
-    try:
-        # Get the client instance
-        client = get_client()
+    """Save game state to the shared file (offline mode only)
 
-        # If we're connected to the server, send the move
-        if client.connected and client.game_id:
-            # The actual saving happens on the server side
-            return True
-
-        # Fallback to file-based saving if not connected
-        os.makedirs(os.path.dirname("game_states/"), exist_ok=True)
+    The state is written to a temporary file and swapped in with os.replace,
+    so the other window never reads a half-written file.
+    """
+    try:
         game_state_file = GAME_STATE_FILE_TEMPLATE.format(game.game_id)
-        with open(game_state_file, 'w') as f:
+        os.makedirs(os.path.dirname(game_state_file), exist_ok=True)
+        temp_file = f"{game_state_file}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
             json.dump(game.to_dict(), f)
+            f.flush()
+            os.fsync(f.fileno())
+            # The rename keeps the inode and mtime, so this is the new file's signature
+            signature = file_signature(os.fstat(f.fileno()))
+        os.replace(temp_file, game_state_file)
+
+        # Our own write doesn't need to be read back
+        loaded_signatures[game_state_file] = signature
         return True
     except Exception as e:
         print(f"Error saving game state: {e}")
         return False
 
+def apply_game_state(game, data, player_color=None, preserve_player_name=True):
+    """Update the local game from a state dictionary, keeping our player name"""
+    # Save current player name if needed
+    original_player_name = None
+    if preserve_player_name and player_color:
+        if player_color == 'white':
+            original_player_name = game.white_player_name
+        elif player_color == 'black':
+            original_player_name = game.black_player_name
+
+    game.from_dict(data)
+
+    # Restore player name if needed
+    if preserve_player_name and player_color and original_player_name and original_player_name != "Waiting for opponent...":
+        if player_color == 'white':
+            game.white_player_name = original_player_name
+        elif player_color == 'black':
+            game.black_player_name = original_player_name
+
+def process_server_events(game, player_color=None):
+    """Apply everything the server pushed since the last frame
+
+    The client's receive thread queues messages as they arrive; only the
+    newest game state is applied, so a burst of updates costs one from_dict.
+    Returns True if the game state changed.
+    """
+    client = get_client()
+    latest_state = None
+
+    for message in client.get_events():
+        if message.get('game_state'):
+            latest_state = message['game_state']
+        if message.get('type') == 'error':
+            game.add_message("System", f"Server: {message.get('message')}")
+        elif message.get('type') == 'disconnected':
+            game.add_message("System", "Lost connection to the server")
+
+    if latest_state:
+        apply_game_state(game, latest_state, player_color)
+        return True
+    return False
+
 def load_game_state(game, player_color=None, preserve_player_name=True):
-    """Load game state from server or file"""
+    """Load game state from the shared file (offline mode only)"""
     try:
-        # Get the client instance
-        client = get_client()
-
-        # If we're connected to the server, request the latest state
-        if client.connected and client.game_id:
-            client.request_game_state()
-
-            # The game state will be updated via callback
-            # For now, use the client's cached state if available
-            if client.game_state:
-                # Save current player name if needed
-                original_player_name = None
-                if preserve_player_name and player_color:
-                    if player_color == 'white':
-                        original_player_name = game.white_player_name
-                    elif player_color == 'black':
-                        original_player_name = game.black_player_name
-
-                # Update game from client state
-                game.from_dict(client.game_state)
-
-                # Restore player name if needed
-                if preserve_player_name and player_color and original_player_name and original_player_name != "Waiting for opponent...":
-                    if player_color == 'white':
-                        game.white_player_name = original_player_name
-                    elif player_color == 'black':
-                        game.black_player_name = original_player_name
-
-                return True
-
-        # Fallback to file-based loading if not connected
         game_state_file = GAME_STATE_FILE_TEMPLATE.format(game.game_id)
         if os.path.exists(game_state_file):
-            # Save current player name if needed
-            original_player_name = None
-            if preserve_player_name and player_color:
-                if player_color == 'white':
-                    original_player_name = game.white_player_name
-                elif player_color == 'black':
-                    original_player_name = game.black_player_name
+            # Skip the parse when the file hasn't been replaced since the last load
+            signature = file_signature(os.stat(game_state_file))
+            if loaded_signatures.get(game_state_file) == signature:
+                return False
 
             # Load game state
             with open(game_state_file, 'r') as f:
                 data = json.load(f)
-                game.from_dict(data)
-
-            # Restore player name if needed
-            if preserve_player_name and player_color and original_player_name and original_player_name != "Waiting for opponent...":
-                if player_color == 'white':
-                    game.white_player_name = original_player_name
-                elif player_color == 'black':
-                    game.black_player_name = original_player_name
-
+            apply_game_state(game, data, player_color, preserve_player_name)
+            loaded_signatures[game_state_file] = signature
             return True
         return False
     except Exception as e:
         print(f"Error loading game state: {e}")
         return False
 
-def handle_game_update(message_type, game_state):
-    """Callback function for game state updates from the server"""
-    if not game_state:
-        return
+def connect_to_server(player_color, game_id, player_name, bot_difficulty=None):
+    """Connect to the chess server and create, join or spectate the game
+
+    White creates the game (with the lobby's game ID if one was given),
+    black joins it and spectators watch it. The lobby lists a game before
+    its creator's window has set it up on the server, so joining retries
+    for a while if it doesn't exist yet. Window events are pumped while
+    waiting, so an open window (the lobby's) keeps responding. Returns the
+    server's game state, or None on failure.
+    """
+    client = get_client()
+    # Every message from the server wakes the window if it is idling
+    if not client.connect(callback=wake):
+        return None
+
+    def send_request():
+        if player_color == 'white':
+            return client.create_game(player_name, bot_difficulty, game_id)
+        if player_color == 'black':
+            return client.join_game(game_id, player_name)
+        return client.spectate_game(game_id, player_name)
 
-    # This function will be called when the server sends a game state update
-    # We'll update our local game state in the main game loop
+    if player_color != 'white' and not game_id:
+        print("A game ID is needed to join or spectate a game")
+        return None
+
+    send_request()
+    deadline = time.time() + JOIN_TIMEOUT
+    retry_at = None  # When to ask again after the game wasn't found
+    while time.time() < deadline and client.connected:
+        for message in client.get_events():
+            message_type = message.get('type')
+            if message_type in ('game_created', 'game_joined', 'game_spectating'):
+                return message.get('game_state')
+            if message_type == 'error':
+                if message.get('message') != 'Game not found':
+                    return None
+                retry_at = time.time() + JOIN_RETRY_INTERVAL
+        if retry_at is not None and time.time() >= retry_at:
+            retry_at = None
+            send_request()
+
+        # Keep the window responsive; its events wait in the queue for the game
+        if pygame.display.get_surface():
+            pygame.event.pump()
+        time.sleep(0.05)
+
+    print("Timed out waiting for the server")
+    return None
 
 # Create piece images
 def create_piece_images():
@@ -921,11 +490,44 @@ def create_piece_images():
     return images
 
 # Draw functions
+def draw_background(screen):
+    """Draw the gradient background with a chess pattern along the bottom"""
+    width, height = screen.get_size()
+
+    # Draw a gradient background - classic black-and-white
+    for y in range(height):
+        # Create a gradient from dark gray to slightly lighter gray
+        color_value = 30 + (y / height * 20)
+        color = (color_value, color_value, color_value)
+        pygame.draw.line(screen, color, (0, y), (width, y))
+
+    # Draw subtle chess pattern at the bottom with classic black-and-white color scheme
+    pattern_height = 100
+    pattern_surface = pygame.Surface((width, pattern_height), pygame.SRCALPHA)
+    square_size = 25
+    for row in range(pattern_height // square_size):
+        for col in range(width // square_size):
+            color = (255, 255, 255) if (row + col) % 2 == 0 else (0, 0, 0)
+            pygame.draw.rect(pattern_surface, color, (
+                col * square_size, row * square_size, square_size, square_size
+            ))
+    pattern_surface.set_alpha(150)  # More visible
+    screen.blit(pattern_surface, (0, height - pattern_height))
+
 def draw_board(screen):
     """Draw the chess board with coordinates and border"""
     # Use the enhanced board drawing function
     draw_enhanced_board(screen, BOARD_X_OFFSET, BOARD_Y_OFFSET, BOARD_WIDTH, SQUARE_SIZE)
 
+def static_layer(screen):
+    """Background, empty board and sidebar background, rendered first if the window changed"""
+    def render(surface):
+        draw_background(surface)
+        draw_board(surface)
+        draw_sidebar_background(surface, WINDOW_WIDTH - SIDEBAR_WIDTH, SIDEBAR_WIDTH, WINDOW_HEIGHT)
+
+    return static_layers.get('board', screen.get_size(), render)
+
 def draw_pieces(screen, board, piece_images):
     """Draw the chess pieces"""
     for row in range(BOARD_SIZE):
@@ -946,8 +548,8 @@ def draw_highlight(screen, pos, valid_moves=None, board=None):
     # Use the enhanced highlight drawing function
     draw_enhanced_highlight(screen, pos, BOARD_X_OFFSET, BOARD_Y_OFFSET, SQUARE_SIZE, valid_moves, board)
 
-def draw_sidebar(screen, game, player_color, chat_input="", is_typing=False, new_game_button=None, spectator_name=None, is_bot_game=False):
-    """Draw the sidebar with game info and chat"""
+def draw_sidebar(screen, game, player_color, chat_input="", is_typing=False, new_game_button=None, spectator_name=None, is_bot_game=False, explorer=None):
+    """Draw the sidebar with game info and chat (or the opening explorer)"""
     # Use the enhanced sidebar drawing function
     draw_enhanced_sidebar(
         screen,
@@ -964,9 +566,157 @@ def draw_sidebar(screen, game, player_color, chat_input="", is_typing=False, new
         is_typing,
         new_game_button,
         spectator_name,
-        is_bot_game
+        is_bot_game,
+        explorer,
+        background=False
     )
 
+class GameRenderer:
+    """Redraws only the parts of the game window that changed
+
+    Everything is drawn on top of the static layer. Board squares are
+    redrawn when their piece changes or they gain or lose a highlight; the
+    selected square and its move markers pulse, so they are redrawn every
+    frame while a piece is selected. The sidebar is redrawn when anything
+    it shows changes, otherwise only the pulsing turn indicator and the
+    New Game button when its hover changes. Just those rectangles are
+    passed to pygame.display.update.
+    """
+    def __init__(self, screen, piece_images):
+        self.screen = screen
+        self.piece_images = piece_images
+        self.drawn_board = None    # Board as last drawn
+        self.drawn_marks = set()   # Squares highlighted in the last frame
+        self.drawn_sidebar = None  # Everything the sidebar showed in the last frame
+        self.drawn_hover = None    # New Game button hover in the last frame
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Redraw the whole window next frame, e.g. after it was uncovered"""
+        self.full_redraw = True
+
+    def draw(self, game, player_color, chat_input, is_typing, player_name, is_bot_game,
+             explorer, new_game_button):
+        """Redraw what changed and show it; returns True if anything was drawn"""
+        screen = self.screen
+        layer = static_layer(screen)
+        sidebar_x = WINDOW_WIDTH - SIDEBAR_WIDTH
+        sidebar_rect = pygame.Rect(sidebar_x, 0, SIDEBAR_WIDTH, WINDOW_HEIGHT)
+
+        marks = set()
+        if game.selected_piece:
+            marks.add(tuple(game.selected_piece))
+            marks.update(tuple(move) for move in game.valid_moves)
+        sidebar_state = (
+            game.version, game.turn, game.status, game.white_player_name, game.black_player_name,
+            tuple((message['sender'], message['text']) for message in game.messages[-3:]),
+            tuple((message['sender'], message['text']) for message in game.chat_messages[-8:]),
+            chat_input, is_typing, is_typing and (pygame.time.get_ticks() // 500) % 2 == 0,
+            explorer if not explorer else id(explorer)
+        )
+        hovered = new_game_button.is_hovered if new_game_button else None
+
+        def draw_sidebar_and_button():
+            draw_sidebar(screen, game, player_color, chat_input, is_typing, None, player_name,
+                         is_bot_game=is_bot_game, explorer=explorer)
+            if new_game_button:
+                new_game_button.draw(screen, font)
+
+        if self.full_redraw:
+            screen.blit(layer, (0, 0))
+            if game.selected_piece:
+                draw_highlight(screen, game.selected_piece, game.valid_moves, game.board)
+            draw_pieces(screen, game.board, self.piece_images)
+            draw_sidebar_and_button()
+            pygame.display.flip()
+            rects = [screen.get_rect()]
+        else:
+            rects = []
+
+            # Squares whose piece or highlight changed, plus the pulsing ones
+            dirty = marks | self.drawn_marks
+            for row in range(BOARD_SIZE):
+                for col in range(BOARD_SIZE):
+                    if game.board[row][col] != self.drawn_board[row][col]:
+                        dirty.add((row, col))
+            if dirty:
+                squares = [pygame.Rect(BOARD_X_OFFSET + col * SQUARE_SIZE, BOARD_Y_OFFSET + row * SQUARE_SIZE,
+                                       SQUARE_SIZE, SQUARE_SIZE) for row, col in dirty]
+                area = squares[0].unionall(squares[1:])
+                screen.set_clip(area)
+                screen.blit(layer, area, area)
+                if game.selected_piece:
+                    draw_highlight(screen, game.selected_piece, game.valid_moves, game.board)
+                draw_pieces(screen, game.board, self.piece_images)
+                screen.set_clip(None)
+                rects.extend(squares)
+
+            if sidebar_state != self.drawn_sidebar:
+                screen.set_clip(sidebar_rect)
+                screen.blit(layer, sidebar_rect, sidebar_rect)
+                draw_sidebar_and_button()
+                screen.set_clip(None)
+                rects.append(sidebar_rect)
+            else:
+                if player_color != 'spectator':
+                    rect = turn_indicator_rect(sidebar_x)
+                    screen.blit(layer, rect, rect)
+                    draw_turn_indicator(screen, sidebar_x, GREEN if game.turn == player_color else RED)
+                    rects.append(rect)
+                if new_game_button and hovered != self.drawn_hover:
+                    # The hover glow reaches 5 pixels past the button
+                    rect = new_game_button.rect.inflate(10, 10)
+                    screen.blit(layer, rect, rect)
+                    new_game_button.draw(screen, font)
+                    rects.append(rect)
+
+            if rects:
+                pygame.display.update(rects)
+
+        self.full_redraw = False
+        self.drawn_board = [row[:] for row in game.board]
+        self.drawn_marks = marks
+        self.drawn_sidebar = sidebar_state
+        self.drawn_hover = hovered
+        return bool(rects)
+
+
+class BotThinker:
+    """Runs the offline bot's search in a thread, so the window keeps drawing while it thinks
+
+    The search works on a copy of the game. Its move is only handed back
+    if the position is still the one it searched, so a game that was reset
+    or reloaded meanwhile just gets a new search.
+    """
+    def __init__(self, bot):
+        self.bot = bot
+        self.thread = None
+        self.version = None  # Position version the running search started from
+        self.move = None
+
+    def poll(self, game):
+        """The bot's move once its search has finished, otherwise None (starting a search if none is running)"""
+        if self.thread is None:
+            self.version = game.version
+            self.move = None
+            self.thread = threading.Thread(target=self._search, args=(copy.deepcopy(game),))
+            self.thread.daemon = True
+            self.thread.start()
+            return None
+        if self.thread.is_alive():
+            return None
+
+        self.thread = None
+        return self.move if game.version == self.version else None
+
+    def _search(self, game):
+        """Search the copied position and wake the window with the result"""
+        try:
+            self.move = self.bot.make_move(game)
+        except Exception as e:
+            print(f"Bot search failed: {e}")
+        wake()
+
 
 def show_menu():
     """Show interactive menu for game setup"""
@@ -1026,10 +776,11 @@ def main():
     parser.add_argument("game_id", nargs="?", help="Game ID")
     parser.add_argument("player_name", nargs="?", help="Player name")
     parser.add_argument("--bot", nargs="?", const="medium", help="Play against bot with specified difficulty (easy, medium, hard)")
+    parser.add_argument("--offline", action="store_true", help="Share game state through a local file instead of the server")
 
     # Handle the case where sys.argv might have '--bot' as the 4th argument and the difficulty as the 5th
     if len(sys.argv) > 4 and sys.argv[4] == "--bot" and len(sys.argv) > 5:
-        args = parser.parse_args(sys.argv[1:4] + ["--bot", sys.argv[5]])
+        args = parser.parse_args(sys.argv[1:4] + ["--bot", sys.argv[5]] + sys.argv[6:])
     else:
         args = parser.parse_args()
 
@@ -1038,7 +789,6 @@ def main():
         player_color, bot_difficulty, _ = show_menu()
         game_id = args.game_id
         player_name = args.player_name
-        play_against_bot = bot_difficulty is not None
         if not player_name:
             player_name = input("Enter your name (optional): ").strip()
             if not player_name:
@@ -1055,27 +805,69 @@ def main():
         player_name = args.player_name
 
         # Check if playing against bot
-        play_against_bot = args.bot is not None
-        bot_difficulty = args.bot if args.bot else "medium"
+        bot_difficulty = args.bot
+
+    run_game(player_color, game_id, player_name, bot_difficulty, args.offline)
+
+    # Clean up
+    get_client().disconnect()
+    pygame.quit()
+    sys.exit()
+
+
+def run_game(player_color, game_id=None, player_name=None, bot_difficulty=None, offline=False,
+             black_player_name=None):
+    """Play one game in this process's window until it is closed or left
 
-    # Create window (not fullscreen)
-    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-    pygame.display.set_caption(f"Chess - {player_color.capitalize()} Player")
-    clock = pygame.time.Clock()
+    This is the scene the lobby switches to. It reuses the open window when
+    it has the game's size, and the fonts, piece sprites and server
+    connection stay loaded from one game to the next. Giving
+    black_player_name makes it a hotseat game: two people share this window,
+    which plays whichever side is to move, offline. Returns 'quit' when the
+    window was closed, 'lobby' when the player left with Escape, or None if
+    the server couldn't start the game.
+    """
+    play_against_bot = bot_difficulty is not None
+    hotseat = black_player_name is not None
+    offline = offline or hotseat
 
     # Create game
     game = ChessGame(game_id, player_name)
+    client = get_client()
+
+    # Online games take their state from the server; the server also hosts the bot
+    if not offline:
+        server_bot = bot_difficulty if play_against_bot and player_color == 'white' else None
+        game_state = connect_to_server(player_color, game_id, player_name, server_bot)
+        if game_state is None:
+            print("Could not start the game on the chess server. "
+                  "Start it with run_server.py, or pass --offline to play without it.")
+            return None
+        apply_game_state(game, game_state, player_color, preserve_player_name=False)
+
+    # Use the window that is already open (not fullscreen)
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != (WINDOW_WIDTH, WINDOW_HEIGHT):
+        screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    if hotseat:
+        pygame.display.set_caption("Chess - Local Game")
+    else:
+        pygame.display.set_caption(f"Chess - {player_color.capitalize()} Player")
+    pacer = FramePacer(FPS)
 
-    # Create beautiful 3D-style piece images
-    piece_images = create_enhanced_piece_images(SQUARE_SIZE)
+    # Create beautiful 3D-style piece images (loaded from the sprite atlas after the first start)
+    piece_images = load_piece_images(SQUARE_SIZE)
+    renderer = GameRenderer(screen, piece_images)
 
-    # Initialize bot if playing against bot
+    # Initialize a local bot if playing against bot offline
     bot = None
-    if play_against_bot and player_color == 'white':
+    is_bot_game = play_against_bot and player_color == 'white'
+    if is_bot_game and offline:
         bot = ChessBot(bot_difficulty)
         bot.set_color('black')
         # Set the black player name to the bot name
         game.black_player_name = bot.name
+        bot_thinker = BotThinker(bot)
 
     # Create buttons based on player role
     if player_color == 'spectator':
@@ -1092,87 +884,104 @@ def main():
             "new_game"
         )
 
-    # Initialize game state file if it doesn't exist
-    game_state_file = GAME_STATE_FILE_TEMPLATE.format(game.game_id)
-    if not os.path.exists(game_state_file):
-        save_game_state(game)
-    else:
-        load_game_state(game, player_color)
-
-    # If we're the black player joining an existing game, update our name
-    if player_color == 'black' and player_name:
-        if game.black_player_name == "Waiting for opponent...":
-            game.set_black_player(player_name)
+    if offline:
+        # Initialize game state file if it doesn't exist
+        game_state_file = GAME_STATE_FILE_TEMPLATE.format(game.game_id)
+        if not os.path.exists(game_state_file):
+            save_game_state(game)
+        else:
+            load_game_state(game, player_color)
+
+        # If we're the black player joining an existing game, update our name
+        if player_color == 'black' and player_name:
+            if game.black_player_name == "Waiting for opponent...":
+                game.set_black_player(player_name)
+                save_game_state(game)
+        elif hotseat and game.black_player_name == "Waiting for opponent...":
+            game.set_black_player(black_player_name)
             save_game_state(game)
 
     # Main game loop
     running = True
+    result = 'quit'
     last_check_time = 0
     chat_input = ""
     is_typing = False
 
-    # Background pattern with animated chess pieces
-    def draw_background(screen):
-        # Draw a gradient background - classic black-and-white
-        for y in range(WINDOW_HEIGHT):
-            # Create a gradient from dark gray to slightly lighter gray
-            color_value = 30 + (y / WINDOW_HEIGHT * 20)
-            color = (color_value, color_value, color_value)
-            pygame.draw.line(screen, color, (0, y), (WINDOW_WIDTH, y))
-
-        # Draw subtle chess pattern at the bottom with classic black-and-white color scheme
-        pattern_height = 100
-        pattern_surface = pygame.Surface((WINDOW_WIDTH, pattern_height), pygame.SRCALPHA)
-        square_size = 25
-        for row in range(pattern_height // square_size):
-            for col in range(WINDOW_WIDTH // square_size):
-                color = (255, 255, 255) if (row + col) % 2 == 0 else (0, 0, 0)
-                pygame.draw.rect(pattern_surface, color, (
-                    col * square_size, row * square_size, square_size, square_size
-                ))
-        pattern_surface.set_alpha(150)  # More visible
-        screen.blit(pattern_surface, (0, WINDOW_HEIGHT - pattern_height))
+    # Opening explorer, shown in place of the chat with Tab (online only)
+    show_explorer = False
+    explorer_version = None  # Position version the statistics were last requested for
+    explorer_fen = None
 
     while running:
         try:
+            # In a hotseat game this window plays the side to move
+            if hotseat:
+                player_color = game.turn
+
             # Get current mouse position for button hover effects
             mouse_pos = pygame.mouse.get_pos()
             if new_game_button:  # Only update if button exists (not for spectators)
                 new_game_button.update(mouse_pos)
 
-            # Check for game state updates every 0.5 seconds
+            # Apply server updates as soon as they arrive; offline mode
+            # has to poll the shared file every 0.5 seconds
             current_time = time.time()
-            if current_time - last_check_time > 0.5:
+            if not offline:
+                if process_server_events(game, player_color) and game.selected_piece:
+                    # Drop a selection the new position has made stale
+                    row, col = game.selected_piece
+                    piece = game.board[row][col]
+                    if game.turn != player_color or not piece or piece['color'] != player_color:
+                        game.selected_piece = None
+                        game.valid_moves = []
+                    else:
+                        game.valid_moves = game.get_valid_moves(game.selected_piece)
+            elif current_time - last_check_time > 0.5:
                 # Always check for updates to get new chat messages
                 # But preserve our player name
                 load_game_state(game, player_color)
                 last_check_time = current_time
 
-                # If playing against bot and it's the bot's turn, make a move
-                if bot and game.turn == bot.color:
-                    # Let the bot make a move
-                    bot_move = bot.make_move(game)
-                    if bot_move:
-                        from_pos, to_pos = bot_move
-                        if game.make_move(from_pos, to_pos, bot.color):
-                            # Add a message about the bot's move
-                            game.add_message("System", f"{bot.name} made a move")
-                            # Save the updated game state
-                            save_game_state(game)
+            # If playing against bot and it's the bot's turn, make a move once
+            # its search (running in the background) has one
+            if bot and game.turn == bot.color and game.status == "in_progress":
+                bot_move = bot_thinker.poll(game)
+                if bot_move:
+                    from_pos, to_pos = bot_move[0], bot_move[1]
+                    promotion = bot_move[2] if len(bot_move) > 2 else None
+                    if game.make_move(from_pos, to_pos, bot.color, promotion):
+                        # Add a message about the bot's move
+                        game.add_message("System", f"{bot.name} made a move")
+                        # Save the updated game state
+                        save_game_state(game)
 
             # Handle events
-            for event in pygame.event.get():
+            for event in pacer.events():
                 if event.type == pygame.QUIT:
                     running = False
 
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    # Another window uncovered part of ours
+                    renderer.invalidate()
+
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         if is_typing:
                             is_typing = False
                             chat_input = ""
+                        else:
+                            # Back to the lobby
+                            result = 'lobby'
+                            running = False
+
+                    elif event.key == pygame.K_TAB and not offline:
+                        show_explorer = not show_explorer
+                        explorer_version = None
+                        is_typing = False
 
                     # Only process chat input if not playing against bot and game is in progress
-                    elif is_typing and not bot and game.status == "in_progress":
+                    elif is_typing and not is_bot_game and game.status == "in_progress":
                         if event.key == pygame.K_RETURN:
                             if chat_input:
                                 # Determine sender name for the chat
@@ -1183,9 +992,12 @@ def main():
                                     # Players use their player name
                                     sender_name = game.white_player_name if player_color == 'white' else game.black_player_name
 
-                                # Send the chat message directly without filtering
-                                game.add_chat(sender_name, chat_input)
-                                save_game_state(game)
+                                # Online, the server adds the message and pushes it back
+                                if offline:
+                                    game.add_chat(sender_name, chat_input)
+                                    save_game_state(game)
+                                else:
+                                    client.send_chat(chat_input)
 
                                 chat_input = ""
                         elif event.key == pygame.K_BACKSPACE:
@@ -1207,6 +1019,11 @@ def main():
                                 if new_game_button:
                                     action = new_game_button.check_click(mouse_pos)
                                     if action == "new_game":
+                                        if not offline:
+                                            client.reset_game()
+                                            game.selected_piece = None
+                                            game.valid_moves = []
+                                            continue
                                         game.reset_game()
                                         # If playing against bot, make sure the bot name is preserved
                                         if bot:
@@ -1229,8 +1046,15 @@ def main():
                                             from_pos = game.selected_piece
                                             to_pos = (row, col)
 
-                                            # Try to make the move
-                                            if game.make_move(from_pos, to_pos, player_color):
+                                            # Online moves are checked here for quick feedback, then
+                                            # played by the server, which pushes the new position back
+                                            if (not offline and game.status == "in_progress" and
+                                                    game.is_valid_move(from_pos, to_pos, player_color) and
+                                                    not game.would_move_cause_check(from_pos, to_pos, player_color)):
+                                                client.make_move(from_pos, to_pos)
+                                                game.selected_piece = None
+                                                game.valid_moves = []
+                                            elif offline and game.make_move(from_pos, to_pos, player_color):
                                                 game.selected_piece = None
                                                 game.valid_moves = []
                                                 # Save the updated game state
@@ -1253,8 +1077,9 @@ def main():
                                                 # Calculate valid moves for the selected piece
                                                 game.valid_moves = game.get_valid_moves((row, col))
 
-                            # Check if chat is enabled (not playing against bot and game is in progress)
-                            chat_enabled = not bot and game.status == "in_progress"
+                            # Check if chat is enabled (not playing against bot, game is in
+                            # progress and the explorer isn't covering it)
+                            chat_enabled = not is_bot_game and game.status == "in_progress" and not show_explorer
 
                             if chat_enabled:
                                 # Check if the chat input box was clicked
@@ -1278,35 +1103,33 @@ def main():
             # Clean up any expired messages
             game.clean_expired_messages()
 
-            # Draw everything
-            draw_background(screen)
-            draw_board(screen)
-
-            # Draw highlight for selected piece and valid moves
-            if game.selected_piece:
-                draw_highlight(screen, game.selected_piece, game.valid_moves, game.board)
-
-            draw_pieces(screen, game.board, piece_images)
-
-            # Draw sidebar (pass is_bot_game=True if playing against bot)
-            draw_sidebar(screen, game, player_color, chat_input, is_typing, None, player_name, is_bot_game=bool(bot))
-
-            # Draw new game button separately (since our enhanced button needs the font parameter)
-            if new_game_button:
-                new_game_button.draw(screen, font)
-
-            # Update the display
-            pygame.display.flip()
-
-            # Cap the frame rate
-            clock.tick(FPS)
+            # Ask for the explorer's statistics again whenever the position changes
+            explorer = None
+            if show_explorer:
+                if explorer_version != game.version:
+                    explorer_fen = game.to_fen()
+                    client.request_opening_stats(explorer_fen)
+                    explorer_version = game.version
+                # An answer for an earlier position may still arrive; don't show it
+                stats = client.opening_stats
+                explorer = stats if stats and stats.get('fen') == explorer_fen else {}
+
+            # Redraw and show only what changed since the last frame
+            renderer.draw(game, player_color, chat_input, is_typing, player_name, is_bot_game,
+                          explorer, new_game_button)
+
+            # Cap the frame rate; run at full rate while the selection pulses and
+            # idle when nothing is happening (the bot's search wakes the window
+            # when it has a move)
+            pacer.tick(animating=bool(game.selected_piece))
 
         except Exception as e:
             print(f"Error in main loop: {e}")
 
-    # Clean up
-    pygame.quit()
-    sys.exit()
+    # Free our seat on the server; the connection stays open for the next game
+    if not offline:
+        client.leave_game()
+    return result
 
 if __name__ == "__main__":
     try:
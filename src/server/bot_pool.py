@@ -0,0 +1,209 @@
+"""
+Bot Worker Pool
+Runs bot searches for server-hosted bot games in a shared pool of worker processes
+"""
+
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue, Full
+
+from ..utils.chess_bot import ChessBot
+from ..utils.chess_rules import ChessGame
+
+# Pool configuration
+BOT_WORKERS = os.cpu_count() or 2         # Worker processes shared by all bot games
+MAX_CONCURRENT_SEARCHES = BOT_WORKERS     # Searches running at the same time
+MAX_QUEUED_SEARCHES = 1000                # Pending searches before new ones are rejected
+SEARCH_DEADLINE = 3.0                     # Seconds from request to move, including queue wait
+
+
+def _build_game(board, turn, flags):
+    """Create a rules engine instance for the given position"""
+    game = ChessGame()
+    game.board = board
+    game.turn = turn
+    game.flags = flags
+    game.reset_history()
+    return game
+
+
+def fallback_move(board, turn, flags):
+    """Pick a random legal move when a search misses its deadline"""
+    game = _build_game(board, turn, flags)
+    moves = game.get_all_valid_moves_for_color(turn)
+    return random.choice(moves) if moves else None
+
+
+def _search_worker(board, turn, flags, difficulty, clock, max_move_time):
+    """Run one bot search in a worker process and return the result"""
+    game = _build_game(board, turn, flags)
+    bot = ChessBot(difficulty, clock=clock, max_move_time=max_move_time)
+    bot.set_color(turn)
+
+    move = bot.make_move(game)
+    return {
+        'move': move,
+        'clock': bot.time_manager.remaining,
+        'search': bot.last_search
+    }
+
+
+class BotWorkerPool:
+    """Queues bot searches and runs them on a shared process pool
+
+    Requests are queued in arrival order and dispatched while fewer than
+    max_concurrent searches are running. Each request carries a deadline;
+    the search is given whatever time remains when it leaves the queue, and
+    a single watchdog thread reports a timeout for every request with no
+    result by its deadline.
+    """
+    def __init__(self, workers=BOT_WORKERS, max_concurrent=MAX_CONCURRENT_SEARCHES,
+                 max_queued=MAX_QUEUED_SEARCHES, deadline=SEARCH_DEADLINE):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.requests = Queue(maxsize=max_queued)
+        self.deadline = deadline
+        self.running = True
+
+        # Deadlines of outstanding requests, soonest first, guarded by lock
+        self.lock = threading.Condition()
+        self.deadlines = []
+        self.sequence = itertools.count()  # Orders requests with the same deadline
+
+        # Dispatcher thread moves requests from the queue into the pool
+        self.dispatcher = threading.Thread(target=self._dispatch)
+        self.dispatcher.daemon = True
+        self.dispatcher.start()
+
+        # Watchdog thread times out requests that miss their deadline
+        self.watchdog = threading.Thread(target=self._watch)
+        self.watchdog.daemon = True
+        self.watchdog.start()
+
+    def submit(self, board, turn, flags, difficulty, clock, callback):
+        """Queue a search; callback(result) is called once with a result dict
+
+        The result has 'move' set to None and 'timed_out' set to True when
+        the deadline passes first. Returns False if the queue is full.
+        """
+        request = {
+            'board': board,
+            'turn': turn,
+            'flags': flags,
+            'difficulty': difficulty,
+            'clock': clock,
+            'callback': callback,
+            'deadline': time.time() + self.deadline,
+            'done': threading.Event()
+        }
+        try:
+            self.requests.put_nowait(request)
+        except Full:
+            print("Bot queue is full, rejecting search")
+            return False
+
+        with self.lock:
+            heapq.heappush(self.deadlines, (request['deadline'], next(self.sequence), request))
+            self.lock.notify()
+        return True
+
+    def queued(self):
+        """Number of searches waiting for a free slot"""
+        return self.requests.qsize()
+
+    def shutdown(self):
+        """Stop dispatching and shut down the worker processes"""
+        self.running = False
+        self.requests.put(None)
+        with self.lock:
+            self.lock.notify()
+        # Running searches are bounded by their deadline, so waiting is short
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _dispatch(self):
+        """Start queued searches as slots become free"""
+        while self.running:
+            request = self.requests.get()
+            if request is None:
+                break
+
+            # Skip requests whose deadline already passed in the queue
+            remaining = request['deadline'] - time.time()
+            if remaining <= 0 or request['done'].is_set():
+                self._expire(request)
+                continue
+
+            self.slots.acquire()
+            remaining = request['deadline'] - time.time()
+            if remaining <= 0:
+                self.slots.release()
+                self._expire(request)
+                continue
+
+            try:
+                future = self.executor.submit(
+                    _search_worker,
+                    request['board'],
+                    request['turn'],
+                    request['flags'],
+                    request['difficulty'],
+                    request['clock'],
+                    # Leave some slack for process round-trips
+                    max(0.01, remaining * 0.8)
+                )
+            except Exception as e:
+                print(f"Error starting bot search: {e}")
+                self.slots.release()
+                self._expire(request)
+                continue
+
+            future.add_done_callback(lambda f, r=request: self._finished(f, r))
+
+    def _watch(self):
+        """Expire requests as their deadlines pass"""
+        while self.running:
+            expired = []
+            with self.lock:
+                if not self.deadlines:
+                    self.lock.wait()
+                else:
+                    self.lock.wait(self.deadlines[0][0] - time.time())
+                now = time.time()
+                while self.deadlines and self.deadlines[0][0] <= now:
+                    expired.append(heapq.heappop(self.deadlines)[2])
+
+            for request in expired:
+                self._expire(request)
+
+    def _finished(self, future, request):
+        """Deliver a completed search and free its slot"""
+        self.slots.release()
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Bot search failed: {e}")
+            self._expire(request)
+            return
+        self._deliver(request, result)
+
+    def _expire(self, request):
+        """Deliver a timeout result for a search that missed its deadline"""
+        self._deliver(request, {'move': None, 'timed_out': True})
+
+    def _deliver(self, request, result):
+        """Call the request's callback exactly once"""
+        # The watchdog, the dispatcher and the executor's callback thread can
+        # all get here for the same request
+        with self.lock:
+            if request['done'].is_set():
+                return
+            request['done'].set()
+        try:
+            request['callback'](result)
+        except Exception as e:
+            print(f"Error in bot callback: {e}")
@@ -12,12 +12,26 @@ import uuid
 import os
 import signal
 import sys
+import copy
+import re
+import secrets
 from queue import Queue
 
+from .bot_pool import BotWorkerPool, fallback_move
+from ..utils.chess_bot import DIFFICULTY_SETTINGS
+from ..utils.chess_rules import ChessGame, DRAW_MESSAGES, PROMOTION_TYPES, describe_move
+from ..utils.game_journal import GameJournal, SNAPSHOT_INTERVAL
+from ..utils.game_store import GameStore
+from ..utils.game_archive import GameArchive
+from ..utils.game_janitor import run_janitor, IDLE_TTL, JANITOR_INTERVAL
+from ..utils import opening_explorer
+
 # Server configuration
 HOST = '127.0.0.1'  # Localhost
 PORT = 5555        # Port to listen on
 BUFFER_SIZE = 4096  # Socket buffer size
+MESSAGE_DELIMITER = b"\n"  # Messages are newline-delimited JSON
+GAME_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')  # Game IDs double as journal file names
 
 # Game state storage
 games = {}  # Dictionary to store active games
@@ -25,18 +39,28 @@ clients = {}  # Dictionary to store connected clients
 client_locks = {}  # Locks for thread safety
 
 # Create a lock for thread-safe operations on shared resources
-games_lock = threading.Lock()
+# (re-entrant because handlers broadcast while already holding it)
+games_lock = threading.RLock()
 clients_lock = threading.Lock()
 
 # Message queue for broadcasting
 message_queue = Queue()
 
+# Shared pool of bot worker processes, started in main()
+bot_pool = None
+
+# Append-only journal that lets games survive a restart, opened in main()
+journal = None
+
+# Database of games, players and moves shared with the lobby, opened in main()
+store = None
+
 class ChessGameState:
     """Class to store and manage chess game state"""
     def __init__(self, game_id=None, creator_name=None):
         self.game_id = game_id if game_id else str(uuid.uuid4())
-        self.board = self.create_initial_board()
-        self.turn = 'white'
+        # Board, side to move, castling/en-passant flags and draw-rule history
+        self.position = ChessGame(self.game_id)
         self.status = 'in_progress'
         self.messages = []
         self.chat_messages = []
@@ -46,42 +70,33 @@ class ChessGameState:
         self.white_player_socket = None
         self.black_player_socket = None
         self.spectators = []
+        self.bot_difficulty = None  # Set when black is played by a server-hosted bot
+        self.bot_clock = None  # Bot's remaining clock in seconds
+        self.seat_tokens = {}  # Color -> secret that lets that player take their seat back
 
         # Add initial messages
         self.add_message("System", "Game created!")
         self.add_chat("System", "Chat enabled. Type messages below.")
 
-    def create_initial_board(self):
-        """Create the initial chess board"""
-        # 8x8 board with pieces
-        board = [[None for _ in range(8)] for _ in range(8)]
-
-        # Set up pawns
-        for col in range(8):
-            board[1][col] = {'type': 'pawn', 'color': 'black'}
-            board[6][col] = {'type': 'pawn', 'color': 'white'}
-
-        # Set up other pieces for black
-        board[0][0] = {'type': 'rook', 'color': 'black'}
-        board[0][1] = {'type': 'knight', 'color': 'black'}
-        board[0][2] = {'type': 'bishop', 'color': 'black'}
-        board[0][3] = {'type': 'queen', 'color': 'black'}
-        board[0][4] = {'type': 'king', 'color': 'black'}
-        board[0][5] = {'type': 'bishop', 'color': 'black'}
-        board[0][6] = {'type': 'knight', 'color': 'black'}
-        board[0][7] = {'type': 'rook', 'color': 'black'}
-
-        # Set up other pieces for white
-        board[7][0] = {'type': 'rook', 'color': 'white'}
-        board[7][1] = {'type': 'knight', 'color': 'white'}
-        board[7][2] = {'type': 'bishop', 'color': 'white'}
-        board[7][3] = {'type': 'queen', 'color': 'white'}
-        board[7][4] = {'type': 'king', 'color': 'white'}
-        board[7][5] = {'type': 'bishop', 'color': 'white'}
-        board[7][6] = {'type': 'knight', 'color': 'white'}
-        board[7][7] = {'type': 'rook', 'color': 'white'}
-
-        return board
+    @property
+    def board(self):
+        """The board, owned by the rules position"""
+        return self.position.board
+
+    @property
+    def turn(self):
+        """Color to move"""
+        return self.position.turn
+
+    @property
+    def flags(self):
+        """Castling rights and en-passant file"""
+        return self.position.flags
+
+    @property
+    def version(self):
+        """Bumped whenever the position changes, including resets"""
+        return self.position.version
 
     def add_message(self, sender, text):
         """Add a message to the game log"""
@@ -101,24 +116,130 @@ class ChessGameState:
         self.add_message("System", f"{player_name} has joined as Black!")
         self.add_chat("System", f"{player_name} has joined the game.")
 
+    def set_bot_player(self, difficulty):
+        """Make black a server-hosted bot"""
+        self.bot_difficulty = difficulty
+        self.bot_clock = DIFFICULTY_SETTINGS[difficulty]['clock']
+        self.set_black_player(f"Chess Bot ({difficulty.capitalize()})")
+
+    def take_seat(self, color):
+        """New secret for a player's seat, handed only to the player taking it"""
+        token = secrets.token_hex(16)
+        self.seat_tokens[color] = token
+        return token
+
+    def can_rejoin(self, color, token):
+        """Whether a player holding token may take back an empty seat
+
+        A bot's seat has no token, so nobody can take it over.
+        """
+        socket_attr = 'white_player_socket' if color == 'white' else 'black_player_socket'
+        expected = self.seat_tokens.get(color)
+        return (bool(token) and bool(expected) and not getattr(self, socket_attr) and
+                secrets.compare_digest(str(token), expected))
+
+    def reset(self):
+        """Start a new game with the same players"""
+        version = self.position.version + 1
+        self.position = ChessGame(self.game_id)
+        self.position.version = version
+        self.status = 'in_progress'
+        if self.bot_difficulty:
+            self.bot_clock = DIFFICULTY_SETTINGS[self.bot_difficulty]['clock']
+        self.last_update = time.time()
+        self.add_message("System", "Game has been reset!")
+        self.add_chat("System", "New game started! Chat is enabled for this game.")
+
+    def replay(self, record):
+        """Apply one journal record while restoring the game"""
+        record_type = record.get('type')
+        if record_type == 'snapshot':
+            state = record['state']
+            self.from_dict(state)
+            self.seat_tokens = dict(state.get('seat_tokens', {}))
+            self.bot_difficulty = state.get('bot_difficulty')
+            if self.bot_difficulty:
+                self.bot_clock = DIFFICULTY_SETTINGS[self.bot_difficulty]['clock']
+        elif record_type == 'move':
+            self.move_piece(record['from_pos'], record['to_pos'], record.get('promotion'))
+        elif record_type == 'chat':
+            self.add_chat(record['sender'], record['text'])
+        elif record_type == 'player':
+            self.set_black_player(record['name'])
+            if record.get('seat_token'):
+                self.seat_tokens['black'] = record['seat_token']
+        elif record_type == 'reset':
+            self.reset()
+
+    def is_legal_move(self, from_pos, to_pos, player_color):
+        """Check a move against the full rules of chess"""
+        position = self.position
+        return (position.is_valid_move(from_pos, to_pos, player_color) and
+                not position.would_move_cause_check(from_pos, to_pos, player_color))
+
+    def move_piece(self, from_pos, to_pos, promotion=None):
+        """Move a piece, log the move, switch turns and update the status"""
+        if promotion not in PROMOTION_TYPES:
+            promotion = 'queen'
+        position = self.position
+        undo = position.push_move((tuple(from_pos), tuple(to_pos), promotion))
+        position.record_position()
+        position.version += 1
+
+        # Add message about the move
+        self.add_message("System", describe_move(from_pos, to_pos, undo, self.board))
+
+        # Check for checkmate, stalemate or a draw
+        draw = position.draw_status(undo)
+        if position.is_checkmate(self.turn):
+            winner = 'black' if self.turn == 'white' else 'white'
+            self.status = f"{winner}_wins"
+            self.add_message("System", f"Checkmate! {winner.capitalize()} wins!")
+        elif position.is_stalemate(self.turn):
+            self.status = 'stalemate'
+            self.add_message("System", "Stalemate! The game is a draw.")
+        elif draw:
+            self.status = draw
+            self.add_message("System", f"{DRAW_MESSAGES[draw]} The game is a draw.")
+        elif position.is_in_check(self.turn):
+            self.add_message("System", f"{self.turn.capitalize()} is in check!")
+
+        # Update timestamp
+        self.last_update = time.time()
+
     def to_dict(self):
         """Convert game state to dictionary"""
         return {
             'game_id': self.game_id,
             'board': self.board,
             'turn': self.turn,
+            'flags': self.flags,
+            'halfmove_clock': self.position.halfmove_clock,
+            'position_history': self.position.position_history,
+            'version': self.position.version,
             'status': self.status,
             'messages': self.messages,
             'chat_messages': self.chat_messages,
             'last_update': self.last_update,
             'white_player_name': self.white_player_name,
-            'black_player_name': self.black_player_name
+            'black_player_name': self.black_player_name,
+            'bot_difficulty': self.bot_difficulty
         }
 
+    def journal_state(self):
+        """Game state for journal snapshots, which also keep the seat tokens
+
+        to_dict goes to every client, so it must not carry them.
+        """
+        return dict(self.to_dict(), seat_tokens=self.seat_tokens)
+
     def from_dict(self, data):
         """Update game state from dictionary"""
-        self.board = data['board']
-        self.turn = data['turn']
+        self.position.board = data['board']
+        self.position.turn = data['turn']
+        self.position.flags = data.get('flags', self.position.castling_from_board())
+        self.position.reset_history(data.get('halfmove_clock', 0), data.get('position_history'))
+        self.position.version = data.get('version', self.position.version + 1)
         self.status = data['status']
         self.messages = data['messages']
         self.chat_messages = data.get('chat_messages', self.chat_messages)
@@ -141,20 +262,28 @@ def handle_client(client_socket, client_address):
         }
 
     try:
+        buffer = b""
         while True:
             # Receive data from client
             data = client_socket.recv(BUFFER_SIZE)
             if not data:
                 break
 
-            # Parse the JSON message
-            try:
-                message = json.loads(data.decode('utf-8'))
-                handle_message(client_id, message)
-            except json.JSONDecodeError:
-                print(f"Invalid JSON from client {client_id}")
-            except Exception as e:
-                print(f"Error handling message from client {client_id}: {e}")
+            # A read can hold part of a message or several messages
+            buffer += data
+            while MESSAGE_DELIMITER in buffer:
+                line, buffer = buffer.split(MESSAGE_DELIMITER, 1)
+                if not line.strip():
+                    continue
+
+                # Parse the JSON message
+                try:
+                    message = json.loads(line.decode('utf-8'))
+                    handle_message(client_id, message)
+                except json.JSONDecodeError:
+                    print(f"Invalid JSON from client {client_id}")
+                except Exception as e:
+                    print(f"Error handling message from client {client_id}: {e}")
 
     except Exception as e:
         print(f"Error with client {client_id}: {e}")
@@ -181,23 +310,73 @@ def handle_message(client_id, message):
     elif message_type == 'make_move':
         make_move(client_id, message)
 
+    elif message_type == 'reset_game':
+        reset_game(client_id, message)
+
     elif message_type == 'chat_message':
         handle_chat(client_id, message)
 
     elif message_type == 'request_state':
         send_game_state(client_id)
 
+    elif message_type == 'request_opening_stats':
+        send_opening_stats(client_id, message)
+
+    elif message_type == 'leave_game':
+        leave_game(client_id)
+
     else:
         print(f"Unknown message type: {message_type}")
 
 def create_game(client_id, message):
     """Create a new game"""
     player_name = message.get('player_name', 'Player')
+    bot_difficulty = message.get('bot_difficulty')
+
+    # A connection is in one game at a time
+    leave_game(client_id)
+
+    if bot_difficulty and (bot_difficulty not in DIFFICULTY_SETTINGS or not bot_pool):
+        response = {'type': 'error', 'message': 'Bot opponent not available'}
+        send_to_client(client_id, response)
+        return
+
+    # Create a new game, keeping the ID the lobby picked if there is one
+    game_id = message.get('game_id') or str(uuid.uuid4())
+    if not GAME_ID_PATTERN.match(game_id):
+        response = {'type': 'error', 'message': 'Invalid game ID'}
+        send_to_client(client_id, response)
+        return
 
     with games_lock:
-        # Create a new game
-        game_id = str(uuid.uuid4())
-        games[game_id] = ChessGameState(game_id, player_name)
+        game = games.get(game_id)
+        if game:
+            # White can take their seat back in a game restored after a restart
+            if not game.can_rejoin('white', message.get('seat_token')):
+                response = {'type': 'error', 'message': 'Game already exists'}
+                send_to_client(client_id, response)
+                return
+            seat_token = game.seat_tokens['white']
+        else:
+            games[game_id] = ChessGameState(game_id, player_name)
+            seat_token = games[game_id].take_seat('white')
+
+            # Black is played by a bot from the shared worker pool
+            if bot_difficulty:
+                games[game_id].set_bot_player(bot_difficulty)
+
+            # Start the journal with the new game's state
+            if journal:
+                journal.compact(game_id, games[game_id].journal_state())
+
+            # The lobby may already have added the game under this ID
+            if store:
+                try:
+                    store.create_game(game_id, f"{player_name}'s game", player_name)
+                    if bot_difficulty:
+                        store.join_game(game_id, games[game_id].black_player_name)
+                except Exception as e:
+                    print(f"Error adding game {game_id} to the store: {e}")
 
         # Update client info
         with clients_lock:
@@ -211,6 +390,7 @@ def create_game(client_id, message):
             'type': 'game_created',
             'game_id': game_id,
             'player_color': 'white',
+            'seat_token': seat_token,
             'game_state': games[game_id].to_dict()
         }
         send_to_client(client_id, response)
@@ -221,6 +401,7 @@ def join_game(client_id, message):
     """Join an existing game"""
     game_id = message.get('game_id')
     player_name = message.get('player_name', 'Player')
+    leave_game(client_id)
 
     with games_lock:
         if game_id not in games:
@@ -230,14 +411,23 @@ def join_game(client_id, message):
 
         game = games[game_id]
 
+        # Black can take their seat back after a restart or a dropped connection
+        rejoining = game.can_rejoin('black', message.get('seat_token'))
+
         # Check if black player slot is available
-        if game.black_player_name != "Waiting for opponent...":
+        if game.black_player_name != "Waiting for opponent..." and not rejoining:
             response = {'type': 'error', 'message': 'Game is full'}
             send_to_client(client_id, response)
             return
 
         # Join as black player
-        game.set_black_player(player_name)
+        if rejoining:
+            seat_token = game.seat_tokens['black']
+            player_name = game.black_player_name
+        else:
+            seat_token = game.take_seat('black')
+            game.set_black_player(player_name)
+            record_event(game_id, {'type': 'player', 'name': player_name, 'seat_token': seat_token})
 
         # Update client info
         with clients_lock:
@@ -251,6 +441,7 @@ def join_game(client_id, message):
             'type': 'game_joined',
             'game_id': game_id,
             'player_color': 'black',
+            'seat_token': seat_token,
             'game_state': game.to_dict()
         }
         send_to_client(client_id, response)
@@ -262,7 +453,7 @@ def join_game(client_id, message):
                 'opponent_name': player_name,
                 'game_state': game.to_dict()
             }
-            game.white_player_socket.sendall(json.dumps(notify).encode('utf-8'))
+            game.white_player_socket.sendall(encode_message(notify))
 
         print(f"Player {player_name} joined game {game_id} as black")
 
@@ -270,6 +461,7 @@ def spectate_game(client_id, message):
     """Join a game as a spectator"""
     game_id = message.get('game_id')
     spectator_name = message.get('player_name', 'Spectator')
+    leave_game(client_id)
 
     with games_lock:
         if game_id not in games:
@@ -286,6 +478,12 @@ def spectate_game(client_id, message):
             clients[client_id]['player_name'] = spectator_name
             game.spectators.append(clients[client_id]['socket'])
 
+        if store:
+            try:
+                store.add_spectator(game_id, spectator_name)
+            except Exception as e:
+                print(f"Error adding spectator to the store: {e}")
+
         # Send response to client
         response = {
             'type': 'game_spectating',
@@ -308,6 +506,7 @@ def make_move(client_id, message):
     game_id = message.get('game_id')
     from_pos = message.get('from_pos')
     to_pos = message.get('to_pos')
+    promotion = message.get('promotion')
 
     with games_lock:
         if game_id not in games:
@@ -323,45 +522,127 @@ def make_move(client_id, message):
 
         player_color = client_info['player_color']
 
-        # Check if it's this player's turn
+        # Check if the game is still going and it's this player's turn
+        if game.status != 'in_progress':
+            response = {'type': 'error', 'message': 'Game is over'}
+            send_to_client(client_id, response)
+            return
+
         if game.turn != player_color:
             response = {'type': 'error', 'message': 'Not your turn'}
             send_to_client(client_id, response)
             return
 
-        # Update the game state with the move
-        # This is a simplified version - in a real implementation, you would validate the move
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
+        # Validate the move against the full rules
+        if not game.is_legal_move(from_pos, to_pos, player_color):
+            response = {'type': 'error', 'message': 'Illegal move'}
+            send_to_client(client_id, response)
+            return
 
-        # Get the piece and check if it exists
-        piece = game.board[from_row][from_col]
-        if not piece or piece['color'] != player_color:
-            response = {'type': 'error', 'message': 'Invalid piece selection'}
+        if promotion is not None and promotion not in PROMOTION_TYPES:
+            response = {'type': 'error', 'message': 'Invalid promotion'}
             send_to_client(client_id, response)
             return
 
-        # Move the piece
-        captured = game.board[to_row][to_col]
-        game.board[to_row][to_col] = piece
-        game.board[from_row][from_col] = None
+        # The journal and store only see the piece a pawn actually became
+        promotion = promotion_type(game, from_pos, to_pos, promotion)
+        game.move_piece(from_pos, to_pos, promotion)
+        record_event(game_id, {'type': 'move', 'from_pos': from_pos, 'to_pos': to_pos,
+                               'promotion': promotion})
 
-        # Add message about the move
-        move_text = f"{piece['color']} {piece['type']} moved from ({from_row},{from_col}) to ({to_row},{to_col})"
-        if captured:
-            move_text += f", capturing {captured['color']} {captured['type']}"
-        game.add_message("System", move_text)
+        # Broadcast the updated game state to all clients in this game
+        broadcast_game_state(game_id)
 
-        # Switch turns
-        game.turn = 'black' if game.turn == 'white' else 'white'
+        print(f"Move made in game {game_id} by {player_color}")
 
-        # Update timestamp
-        game.last_update = time.time()
+        # Let the bot answer
+        if game.bot_difficulty and game.status == 'in_progress':
+            request_bot_move(game_id)
+
+def promotion_type(game, from_pos, to_pos, promotion=None):
+    """Piece a legal move promotes to (a queen unless promotion names another), or None"""
+    piece = game.board[from_pos[0]][from_pos[1]]
+    if piece and piece['type'] == 'pawn' and to_pos[0] in (0, 7):
+        return promotion if promotion in PROMOTION_TYPES else 'queen'
+    return None
+
+def request_bot_move(game_id):
+    """Queue a search for the bot's next move"""
+    with games_lock:
+        if game_id not in games:
+            return
+
+        game = games[game_id]
+        board = copy.deepcopy(game.board)
+        turn = game.turn
+        flags = game.flags
+        difficulty = game.bot_difficulty
+        clock = game.bot_clock
+        version = game.version
+
+    def on_result(result):
+        apply_bot_move(game_id, turn, version, result)
+
+    if not bot_pool.submit(board, turn, flags, difficulty, clock, on_result):
+        # Queue is full, answer with a quick move rather than stalling the game
+        on_result({'move': None, 'timed_out': True})
+
+def apply_bot_move(game_id, bot_color, version, result):
+    """Play the bot's move once its search has finished
+
+    The result is dropped if the position changed since the search was
+    requested (version is the game's version at that time), e.g. because
+    the game was reset and the bot is to move again in a new game.
+    """
+    with games_lock:
+        if game_id not in games:
+            return
+
+        game = games[game_id]
+        if game.version != version or game.turn != bot_color or game.status != 'in_progress':
+            return
+
+        move = result.get('move')
+        if result.get('timed_out'):
+            # The search missed its deadline, keep the game moving anyway
+            move = fallback_move(copy.deepcopy(game.board), bot_color, game.flags)
+            print(f"Bot search timed out in game {game_id}, playing fallback move")
+        elif result.get('clock') is not None:
+            game.bot_clock = result['clock']
+
+        if move and game.is_legal_move(move[0], move[1], bot_color):
+            promotion = promotion_type(game, move[0], move[1], move[2] if len(move) > 2 else None)
+            game.move_piece(move[0], move[1], promotion)
+            record_event(game_id, {'type': 'move', 'from_pos': move[0], 'to_pos': move[1],
+                                   'promotion': promotion})
 
-        # Broadcast the updated game state to all clients in this game
         broadcast_game_state(game_id)
 
-        print(f"Move made in game {game_id} by {player_color}")
+def reset_game(client_id, message):
+    """Start a new game when one of the players asks for it"""
+    game_id = message.get('game_id')
+
+    with games_lock:
+        if game_id not in games:
+            response = {'type': 'error', 'message': 'Game not found'}
+            send_to_client(client_id, response)
+            return
+
+        client_info = clients.get(client_id)
+        if not client_info:
+            return
+
+        # Spectators can watch but not restart the game
+        if client_info['game_id'] != game_id or client_info['player_color'] not in ('white', 'black'):
+            response = {'type': 'error', 'message': 'Only players can reset the game'}
+            send_to_client(client_id, response)
+            return
+
+        games[game_id].reset()
+        record_event(game_id, {'type': 'reset'})
+        broadcast_game_state(game_id)
+
+        print(f"Game {game_id} reset by {client_info['player_color']}")
 
 def handle_chat(client_id, message):
     """Process a chat message"""
@@ -389,12 +670,110 @@ def handle_chat(client_id, message):
 
         # Add the chat message
         game.add_chat(sender_name, chat_text)
+        record_event(game_id, {'type': 'chat', 'sender': sender_name, 'text': chat_text})
 
         # Broadcast the updated game state
         broadcast_game_state(game_id)
 
         print(f"Chat in game {game_id} from {sender_name}: {chat_text}")
 
+def record_event(game_id, record):
+    """Append an event to the game's journal and the game store
+
+    Every SNAPSHOT_INTERVAL records, and when the game finishes, the
+    journal is compacted to one snapshot, so both its size and a restore's
+    replay stay bounded. Call with games_lock held.
+    """
+    game = games[game_id]
+    finished = record['type'] == 'move' and game.status != 'in_progress'
+
+    if journal:
+        try:
+            if journal.append(game_id, record) >= SNAPSHOT_INTERVAL or finished:
+                journal.compact(game_id, game.journal_state())
+        except Exception as e:
+            print(f"Error writing journal for game {game_id}: {e}")
+
+    if store:
+        try:
+            if record['type'] == 'move':
+                store.record_move(game_id, record['from_pos'], record['to_pos'], record['promotion'])
+                if finished:
+                    store.set_status(game_id, 'finished', game.status)
+                    opening_explorer.record_game(store, store.get_moves(game_id), game.status)
+            elif record['type'] == 'player':
+                store.join_game(game_id, record['name'])
+            elif record['type'] == 'reset':
+                store.clear_moves(game_id)
+                waiting = game.black_player_name == "Waiting for opponent..."
+                store.set_status(game_id, 'waiting' if waiting else 'in_progress')
+        except Exception as e:
+            print(f"Error writing game {game_id} to the store: {e}")
+
+def restore_games():
+    """Rebuild the games left in the journal by a previous run"""
+    for game_id in journal.game_ids():
+        records = journal.load(game_id)
+        if not records or records[0].get('type') != 'snapshot':
+            print(f"Journal for game {game_id} has no snapshot, skipping it")
+            continue
+
+        game = ChessGameState(game_id)
+        try:
+            for record in records:
+                game.replay(record)
+        except Exception as e:
+            print(f"Error restoring game {game_id}: {e}")
+            continue
+
+        with games_lock:
+            games[game_id] = game
+            # Fold the replayed tail into a fresh snapshot
+            journal.compact(game_id, game.journal_state())
+
+        # Pick the bot's search back up if it was thinking
+        if game.bot_difficulty and game.turn == 'black' and game.status == 'in_progress':
+            request_bot_move(game_id)
+
+    if games:
+        print(f"Restored {len(games)} games from the journal")
+
+def expire_idle_games():
+    """Drop games nobody has been connected to for IDLE_TTL seconds
+
+    Games normally end when the last player leaves; this catches games
+    restored from the journal that nobody came back to.
+    """
+    now = time.time()
+    with games_lock:
+        for game_id, game in list(games.items()):
+            connected = game.white_player_socket or game.black_player_socket or game.spectators
+            if connected or now - game.last_update < IDLE_TTL:
+                continue
+
+            del games[game_id]
+            if journal:
+                journal.remove(game_id)
+            if store and game.status == 'in_progress':
+                store.set_status(game_id, 'expired')
+            print(f"Game {game_id} expired after being idle")
+
+def janitor_loop():
+    """Periodically expire idle games and archive finished ones"""
+    archive = GameArchive(store)
+    while True:
+        time.sleep(JANITOR_INTERVAL)
+        try:
+            expire_idle_games()
+            with games_lock:
+                live_game_ids = list(games)
+            stats = run_janitor(store, archive, live_game_ids=live_game_ids)
+            if stats['expired'] or stats['archived'] or stats['removed']:
+                print(f"Janitor expired {stats['expired']} games, archived {stats['archived']}, "
+                      f"removed {stats['removed']} unreadable state files")
+        except Exception as e:
+            print(f"Error running janitor: {e}")
+
 def send_game_state(client_id):
     """Send the current game state to a client"""
     client_info = clients.get(client_id)
@@ -416,6 +795,37 @@ def send_game_state(client_id):
 
         send_to_client(client_id, response)
 
+def send_opening_stats(client_id, message):
+    """Send the opening explorer's move statistics for a position
+
+    The position is given as a FEN, or defaults to the client's game. The
+    answer comes straight from the store's index, so games_lock is only
+    held to read the game's position.
+    """
+    fen = message.get('fen')
+    if not fen:
+        client_info = clients.get(client_id)
+        with games_lock:
+            game = games.get(client_info['game_id']) if client_info else None
+            fen = game.position.to_fen() if game else None
+    if not fen or not store:
+        send_to_client(client_id, {'type': 'error', 'message': 'Opening explorer not available'})
+        return
+
+    try:
+        moves = opening_explorer.explorer_moves(store, fen)
+    except (ValueError, IndexError, KeyError, TypeError, AttributeError):
+        # load_fen doesn't validate, so a malformed FEN fails in many ways
+        send_to_client(client_id, {'type': 'error', 'message': 'Invalid position'})
+        return
+
+    response = {
+        'type': 'opening_stats',
+        'fen': fen,
+        'moves': moves
+    }
+    send_to_client(client_id, response)
+
 def broadcast_game_state(game_id):
     """Broadcast game state to all clients in a game"""
     with games_lock:
@@ -425,30 +835,30 @@ def broadcast_game_state(game_id):
         game = games[game_id]
         game_state = game.to_dict()
 
-        # Prepare the message
-        message = {
+        # Prepare the message once for every recipient
+        message = encode_message({
             'type': 'game_state_update',
             'game_state': game_state
-        }
+        })
 
         # Send to white player
         if game.white_player_socket:
             try:
-                game.white_player_socket.sendall(json.dumps(message).encode('utf-8'))
+                game.white_player_socket.sendall(message)
             except:
                 pass
 
         # Send to black player
         if game.black_player_socket:
             try:
-                game.black_player_socket.sendall(json.dumps(message).encode('utf-8'))
+                game.black_player_socket.sendall(message)
             except:
                 pass
 
         # Send to all spectators
         for spectator_socket in game.spectators:
             try:
-                spectator_socket.sendall(json.dumps(message).encode('utf-8'))
+                spectator_socket.sendall(message)
             except:
                 # Remove disconnected spectators later
                 pass
@@ -462,23 +872,38 @@ def send_to_client(client_id, message):
         client_socket = clients[client_id]['socket']
 
         try:
-            client_socket.sendall(json.dumps(message).encode('utf-8'))
+            client_socket.sendall(encode_message(message))
         except Exception as e:
             print(f"Error sending to client {client_id}: {e}")
 
+def encode_message(message):
+    """Serialize a message for the wire"""
+    return json.dumps(message).encode('utf-8') + MESSAGE_DELIMITER
+
 def cleanup_client(client_id):
     """Clean up when a client disconnects"""
+    leave_game(client_id, disconnected=True)
+
+def leave_game(client_id, disconnected=False):
+    """Take a client out of its game, keeping its connection unless it disconnected
+
+    The lobby plays one game after another over the same connection, so
+    this also runs before a client creates, joins or spectates a game.
+    """
     with clients_lock:
         if client_id not in clients:
             return
 
-        client_info = clients[client_id]
+        client_info = dict(clients[client_id])
         game_id = client_info.get('game_id')
         player_color = client_info.get('player_color')
         player_name = client_info.get('player_name')
 
-        # Remove from clients dictionary
-        del clients[client_id]
+        if disconnected:
+            # Remove from clients dictionary
+            del clients[client_id]
+        else:
+            clients[client_id].update(game_id=None, player_color=None, player_name=None)
 
     # Handle game cleanup if needed
     if game_id:
@@ -500,7 +925,7 @@ def cleanup_client(client_id):
                             'game_state': game.to_dict()
                         }
                         try:
-                            game.black_player_socket.sendall(json.dumps(notify).encode('utf-8'))
+                            game.black_player_socket.sendall(encode_message(notify))
                         except:
                             pass
 
@@ -518,7 +943,7 @@ def cleanup_client(client_id):
                             'game_state': game.to_dict()
                         }
                         try:
-                            game.white_player_socket.sendall(json.dumps(notify).encode('utf-8'))
+                            game.white_player_socket.sendall(encode_message(notify))
                         except:
                             pass
 
@@ -533,6 +958,13 @@ def cleanup_client(client_id):
                 # If both players are gone and no spectators, remove the game
                 if not game.white_player_socket and not game.black_player_socket and not game.spectators:
                     del games[game_id]
+                    if journal:
+                        journal.remove(game_id)
+                    if store and game.status == 'in_progress':
+                        try:
+                            store.set_status(game_id, 'abandoned')
+                        except Exception as e:
+                            print(f"Error updating game {game_id} in the store: {e}")
                     print(f"Game {game_id} removed as all players left")
                 else:
                     # Broadcast updated state to remaining players/spectators
@@ -540,6 +972,8 @@ def cleanup_client(client_id):
 
 def main():
     """Main server function"""
+    global bot_pool, journal, store
+
     # Create server socket
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -549,13 +983,28 @@ def main():
         server_socket.listen(5)
         print(f"Chess server started on {HOST}:{PORT}")
 
+        # Start the shared bot workers
+        bot_pool = BotWorkerPool()
+
+        # Bring back the games that were running when the server last stopped
+        journal = GameJournal()
+        store = GameStore()
+        restore_games()
+
+        # Keep the data directory and lobby list from growing forever
+        janitor_thread = threading.Thread(target=janitor_loop)
+        janitor_thread.daemon = True
+        janitor_thread.start()
+
         # Handle graceful shutdown
         def signal_handler(sig, frame):
             print("\nShutting down server...")
+            bot_pool.shutdown()
             server_socket.close()
             sys.exit(0)
 
         signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
 
         # Accept connections
         while True:
@@ -568,6 +1017,10 @@ def main():
         print(f"Server error: {e}")
 
     finally:
+        if bot_pool:
+            bot_pool.shutdown()
+        if journal:
+            journal.close()
         server_socket.close()
 
 if __name__ == "__main__":
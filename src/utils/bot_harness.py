@@ -0,0 +1,306 @@
+"""
+Bot Harness
+Plays batches of headless bot-vs-bot games in parallel and reports strength and speed
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .chess_bot import ChessBot, DIFFICULTY_SETTINGS
+from .chess_rules import ChessGame
+
+# Harness defaults
+DEFAULT_GAMES = 100           # Games per run (played in colour-swapped pairs)
+DEFAULT_MAX_PLIES = 300       # Games still running after this many plies are scored as draws
+DEFAULT_RANDOM_PLIES = 4      # Random opening plies so games don't repeat
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "..", "..", "data", "bot_harness.jsonl")
+
+
+def play_game(index, engines, max_plies, random_plies, seed):
+    """Play one bot-vs-bot game and return its record
+
+    engines is a pair of engine configs (difficulty, clock, increment) for
+    engine A and B. Even-numbered games give A the white pieces; each pair
+    of games shares a random opening so colours are the only difference.
+    """
+    a_white = index % 2 == 0
+    white_cfg, black_cfg = engines if a_white else (engines[1], engines[0])
+
+    game = ChessGame()
+    bots = {}
+    for color, cfg in (('white', white_cfg), ('black', black_cfg)):
+        bot = ChessBot(cfg['difficulty'], clock=cfg['clock'], increment=cfg['increment'])
+        bot.set_color(color)
+        bots[color] = bot
+
+    # Shared opening for both games of a pair
+    opening_rng = random.Random(seed + index // 2)
+    for _ in range(random_plies):
+        moves = game.get_all_valid_moves_for_color(game.turn)
+        if not moves:
+            break
+        move = opening_rng.choice(moves)
+        game.make_move(move[0], move[1], game.turn, move[2] if len(move) > 2 else None)
+    random.seed(seed + index)
+
+    moves = {'white': [], 'black': []}
+    result = None
+    reason = None
+    plies = 0
+
+    # The bot prints every move; keep worker output quiet
+    with contextlib.redirect_stdout(io.StringIO()):
+        while game.status == 'in_progress' and plies < max_plies:
+            color = game.turn
+            bot = bots[color]
+            clock_before = bot.time_manager.remaining
+            move = bot.make_move(game)
+            if not move:
+                break
+
+            stats = bot.last_search
+            moves[color].append({
+                'time': stats['time'],
+                'depth': stats['depth'],
+                'nodes': stats['nodes']
+            })
+
+            # Running out of clock loses the game
+            if stats['time'] > clock_before:
+                result = 'black' if color == 'white' else 'white'
+                reason = 'time'
+                break
+
+            game.make_move(move[0], move[1], color, move[2] if len(move) > 2 else None)
+            plies += 1
+
+    if result is None:
+        if game.status.endswith('_wins'):
+            result = game.status.split('_')[0]
+            reason = 'checkmate'
+        elif game.status == 'stalemate':
+            result = 'draw'
+            reason = 'stalemate'
+        elif game.status.startswith('draw_'):
+            result = 'draw'
+            reason = game.status[len('draw_'):]
+        elif game.status == 'in_progress' and plies >= max_plies:
+            result = 'draw'
+            reason = 'max_plies'
+        elif game.is_in_check(game.turn):
+            result = 'black' if game.turn == 'white' else 'white'
+            reason = 'checkmate'
+        else:
+            result = 'draw'
+            reason = 'stalemate'
+
+    # Score from engine A's point of view
+    a_color = 'white' if a_white else 'black'
+    if result == 'draw':
+        a_score = 0.5
+    else:
+        a_score = 1.0 if result == a_color else 0.0
+
+    return {
+        'index': index,
+        'a_color': a_color,
+        'result': result,
+        'reason': reason,
+        'plies': plies,
+        'a_score': a_score,
+        'a_moves': moves[a_color],
+        'b_moves': moves['black' if a_color == 'white' else 'white']
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def score_summary(scores):
+    """Win/draw/loss counts, score and 95% error bars for engine A"""
+    n = len(scores)
+    wins = sum(1 for s in scores if s == 1.0)
+    draws = sum(1 for s in scores if s == 0.5)
+    losses = n - wins - draws
+    if n == 0:
+        return {'games': 0, 'wins': 0, 'draws': 0, 'losses': 0}
+
+    mean = sum(scores) / n
+    variance = sum((s - mean) ** 2 for s in scores) / n
+    margin = 1.96 * math.sqrt(variance / n)
+
+    summary = {
+        'games': n,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'score': mean,
+        'score_error': margin,
+        'elo': elo_difference(mean)
+    }
+
+    # Elo error bars come from the ends of the score interval
+    summary['elo_low'] = elo_difference(mean - margin)
+    summary['elo_high'] = elo_difference(mean + margin)
+    return summary
+
+
+def elo_difference(score):
+    """Elo difference implied by an expected score, clamped away from 0 and 1"""
+    score = min(max(score, 0.001), 0.999)
+    return -400 * math.log10(1 / score - 1)
+
+
+def engine_summary(moves):
+    """Speed and depth statistics for one engine's moves"""
+    times = [m['time'] for m in moves]
+    total_time = sum(times)
+    total_nodes = sum(m['nodes'] for m in moves)
+    return {
+        'moves': len(moves),
+        'nps': int(total_nodes / total_time) if total_time > 0 else 0,
+        'avg_depth': sum(m['depth'] for m in moves) / len(moves) if moves else 0.0,
+        'latency_ms': {
+            'p50': percentile(times, 50) * 1000,
+            'p90': percentile(times, 90) * 1000,
+            'p99': percentile(times, 99) * 1000,
+            'max': max(times) * 1000 if times else 0.0
+        }
+    }
+
+
+def run_match(engines, games=DEFAULT_GAMES, workers=None, max_plies=DEFAULT_MAX_PLIES,
+              random_plies=DEFAULT_RANDOM_PLIES, seed=None, output=None):
+    """Play a match between two engine configs and return the summary"""
+    run_id = str(uuid.uuid4())
+    seed = seed if seed is not None else random.randrange(1 << 30)
+    config = {
+        'engine_a': engines[0],
+        'engine_b': engines[1],
+        'games': games,
+        'max_plies': max_plies,
+        'random_plies': random_plies,
+        'seed': seed
+    }
+
+    records = []
+    started = time.time()
+    out = open(output, 'a') if output else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_game, i, engines, max_plies, random_plies, seed)
+                       for i in range(games)]
+            for future in as_completed(futures):
+                record = future.result()
+                records.append(record)
+                if out:
+                    out.write(json.dumps({'type': 'game', 'run_id': run_id, **record}) + "\n")
+
+                done = len(records)
+                if done % max(1, games // 20) == 0 or done == games:
+                    partial = score_summary([r['a_score'] for r in records])
+                    print(f"{done}/{games} games: +{partial['wins']} ={partial['draws']} "
+                          f"-{partial['losses']} ({partial['score']:.3f})")
+
+        summary = {
+            'type': 'summary',
+            'run_id': run_id,
+            'time': time.time() - started,
+            'config': config,
+            'result': score_summary([r['a_score'] for r in records]),
+            'engine_a': engine_summary([m for r in records for m in r['a_moves']]),
+            'engine_b': engine_summary([m for r in records for m in r['b_moves']])
+        }
+        if out:
+            out.write(json.dumps(summary) + "\n")
+    finally:
+        if out:
+            out.close()
+
+    return summary
+
+
+def print_summary(summary):
+    """Print a match summary in a readable form"""
+    result = summary['result']
+    config = summary['config']
+    print()
+    print(f"Run {summary['run_id']} ({summary['time']:.1f} s)")
+    for key in ('engine_a', 'engine_b'):
+        cfg = config[key]
+        print(f"  {key[-1].upper()}: {cfg['difficulty']} {cfg['clock']}+{cfg['increment']}")
+    if not result['games']:
+        return
+    print(f"  A vs B: +{result['wins']} ={result['draws']} -{result['losses']} "
+          f"score {result['score']:.3f} +/- {result['score_error']:.3f}")
+    print(f"  Elo: {result['elo']:+.0f} [{result['elo_low']:+.0f}, {result['elo_high']:+.0f}]")
+    for key in ('engine_a', 'engine_b'):
+        stats = summary[key]
+        latency = stats['latency_ms']
+        print(f"  {key[-1].upper()}: {stats['nps']} nps, depth {stats['avg_depth']:.2f}, "
+              f"latency p50 {latency['p50']:.0f} ms / p90 {latency['p90']:.0f} ms / "
+              f"p99 {latency['p99']:.0f} ms / max {latency['max']:.0f} ms")
+
+
+def engine_config(difficulty, clock, increment):
+    """Build an engine config, filling in the difficulty's default time control"""
+    settings = DIFFICULTY_SETTINGS[difficulty]
+    return {
+        'difficulty': difficulty,
+        'clock': settings['clock'] if clock is None else clock,
+        'increment': settings['increment'] if increment is None else increment
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Headless bot-vs-bot match harness")
+    parser.add_argument("--a", default="medium", choices=["easy", "medium", "hard"],
+                        help="Difficulty of engine A")
+    parser.add_argument("--b", default="medium", choices=["easy", "medium", "hard"],
+                        help="Difficulty of engine B")
+    parser.add_argument("--clock", type=float, help="Clock in seconds for both engines")
+    parser.add_argument("--increment", type=float, help="Increment in seconds for both engines")
+    parser.add_argument("--b-clock", type=float, help="Clock override for engine B")
+    parser.add_argument("--b-increment", type=float, help="Increment override for engine B")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="Number of games")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES,
+                        help="Adjudicate a draw after this many plies")
+    parser.add_argument("--random-plies", type=int, default=DEFAULT_RANDOM_PLIES,
+                        help="Random opening plies per game pair")
+    parser.add_argument("--seed", type=int, help="Seed for openings and bot noise")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON lines file to append to")
+    args = parser.parse_args()
+
+    engines = (
+        engine_config(args.a, args.clock, args.increment),
+        engine_config(args.b,
+                      args.b_clock if args.b_clock is not None else args.clock,
+                      args.b_increment if args.b_increment is not None else args.increment)
+    )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    summary = run_match(engines, args.games, args.workers, args.max_plies,
+                        args.random_plies, args.seed, args.output)
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
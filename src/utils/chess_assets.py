@@ -5,6 +5,9 @@ Contains helper functions for drawing chess-themed UI elements
 import pygame
 import math
 import random
+import numpy as np
+
+from .font_cache import get_font, render_text
 
 # Chess piece icons (enhanced 3D-style)
 def draw_chess_icon(surface, piece_type, color, pos, size=40):
@@ -289,191 +292,248 @@ def draw_chess_board_pattern(surface, rect, light_color=(255, 255, 255), dark_co
             pygame.draw.rect(surface, color, square_rect)
 
 # Decorative chess pieces for background
-class DecorativePiece:
-    def __init__(self, piece_type, color, x, y, size, speed, rotation_speed=None):
-        self.piece_type = piece_type
-        self.color = color
-        self.x = x
-        self.y = y
-        self.size = size
-        self.speed = speed
-        self.rotation = random.randint(0, 360)
-        self.rotation_speed = rotation_speed if rotation_speed is not None else random.uniform(-0.5, 0.5)
-        self.alpha = random.randint(30, 80)
-        self.pulse_speed = random.uniform(0.01, 0.05)
-        self.pulse_amount = random.uniform(0.05, 0.15)
-        self.pulse_offset = random.uniform(0, 6.28)  # Random phase offset (0 to 2π)
-
-    def update(self, width, height):
-        self.y += self.speed
-        self.rotation += self.rotation_speed
-
-        # Reset if off screen
-        if self.y > height + self.size:
-            self.y = -self.size
-            self.x = random.randint(0, width)
+ROTATION_STEP = 2       # Degrees between the pre-rendered rotation frames of a piece
+PIECE_SIZE_STEP = 10    # Background piece sizes are rounded to a multiple of this
+MAX_DOT_RADIUS = 6      # Largest star, glow or dust dot drawn
 
-    def draw(self, surface):
-        # Calculate pulsing size effect
-        time_factor = pygame.time.get_ticks() * self.pulse_speed / 1000
-        pulse = 1 + self.pulse_amount * math.sin(time_factor + self.pulse_offset)
-        current_size = self.size * pulse
-
-        # Create a temporary surface for the piece with alpha
-        temp_surface = pygame.Surface((current_size*2.5, current_size*2.5), pygame.SRCALPHA)
-        draw_chess_icon(temp_surface, self.piece_type, self.color, (current_size, current_size), current_size)
-
-        # Add glossy highlight effect
-        self._add_glossy_highlight(temp_surface)
-
-        # Add subtle glow effect
-        glow_surface = pygame.Surface((current_size*3, current_size*3), pygame.SRCALPHA)
-        glow_color = (255, 255, 255, 10) if self.color == "white" else (100, 100, 255, 10)
-        pygame.draw.circle(glow_surface, glow_color, (current_size*1.5, current_size*1.5), current_size*1.2)
-        temp_surface.blit(glow_surface, (current_size*0.25, current_size*0.25))
-
-        # Apply rotation
-        rotated_surface = pygame.transform.rotate(temp_surface, self.rotation)
-
-        # Apply alpha with slight pulsing
-        alpha_pulse = self.alpha + int(10 * math.sin(time_factor * 1.5))
-        alpha_pulse = max(20, min(alpha_pulse, 100))  # Keep alpha between 20 and 100
-        rotated_surface.set_alpha(alpha_pulse)
-
-        # Blit to main surface
-        rect = rotated_surface.get_rect(center=(self.x, self.y))
-        surface.blit(rotated_surface, rect)
-
-    def _add_glossy_highlight(self, surface):
-        """Add an enhanced glossy highlight effect to the piece"""
-        # Get current size from the surface
-        surf_width, surf_height = surface.get_size()
-        center_x, center_y = surf_width // 2, surf_height // 2
-
-        # Create a highlight surface
-        highlight = pygame.Surface((surf_width, surf_height), pygame.SRCALPHA)
-
-        # Determine highlight parameters based on piece color - classic black-and-white
-        if self.color == "white":
-            primary_highlight = (255, 255, 255, 70)  # Semi-transparent white
-            secondary_highlight = (255, 255, 255, 40)  # White glow
-        else:
-            primary_highlight = (100, 100, 100, 40)  # Gray highlight for black pieces
-            secondary_highlight = (50, 50, 50, 30)  # Dark gray glow
-
-        # Calculate time-based animation for moving highlight
-        time_factor = pygame.time.get_ticks() / 2000
-        offset_x = math.sin(time_factor) * (self.size / 8)
-        offset_y = math.cos(time_factor * 0.7) * (self.size / 10)
-
-        # Draw main oval highlight
-        highlight_width = self.size // 3
-        highlight_height = self.size // 1.5
-        highlight_rect = (
-            center_x - highlight_width // 2 + offset_x,
-            center_y - highlight_height // 2 + offset_y,
-            highlight_width,
-            highlight_height
-        )
-        pygame.draw.ellipse(highlight, primary_highlight, highlight_rect)
-
-        # Add a small bright spot that moves slightly
-        spot_x = center_x - self.size // 4 + offset_x * 1.5
-        spot_y = center_y - self.size // 8 + offset_y * 1.5
-        pygame.draw.circle(highlight, (255, 255, 255, 120), (spot_x, spot_y), self.size // 10)
-
-        # Add a secondary highlight for depth
-        secondary_rect = (
-            center_x - highlight_width // 1.5,
-            center_y - highlight_height // 3,
-            highlight_width // 1.5,
-            highlight_height // 2
-        )
-        pygame.draw.ellipse(highlight, secondary_highlight, secondary_rect)
-
-        # Blit the highlight to the main surface
-        surface.blit(highlight, (0, 0))
+piece_frames = {}  # (piece_type, color, size) -> rotation frames, rendered on first use
+
+def add_glossy_highlight(surface, color, size):
+    """Add an enhanced glossy highlight effect to a piece sprite"""
+    # Get current size from the surface
+    surf_width, surf_height = surface.get_size()
+    center_x, center_y = surf_width // 2, surf_height // 2
+
+    # Create a highlight surface
+    highlight = pygame.Surface((surf_width, surf_height), pygame.SRCALPHA)
+
+    # Determine highlight parameters based on piece color - classic black-and-white
+    if color == "white":
+        primary_highlight = (255, 255, 255, 70)  # Semi-transparent white
+        secondary_highlight = (255, 255, 255, 40)  # White glow
+    else:
+        primary_highlight = (100, 100, 100, 40)  # Gray highlight for black pieces
+        secondary_highlight = (50, 50, 50, 30)  # Dark gray glow
+
+    # Draw main oval highlight
+    highlight_width = size // 3
+    highlight_height = size // 1.5
+    highlight_rect = (
+        center_x - highlight_width // 2,
+        center_y - highlight_height // 2,
+        highlight_width,
+        highlight_height
+    )
+    pygame.draw.ellipse(highlight, primary_highlight, highlight_rect)
+
+    # Add a small bright spot
+    spot_x = center_x - size // 4
+    spot_y = center_y - size // 8
+    pygame.draw.circle(highlight, (255, 255, 255, 120), (spot_x, spot_y), size // 10)
+
+    # Add a secondary highlight for depth
+    secondary_rect = (
+        center_x - highlight_width // 1.5,
+        center_y - highlight_height // 3,
+        highlight_width // 1.5,
+        highlight_height // 2
+    )
+    pygame.draw.ellipse(highlight, secondary_highlight, secondary_rect)
+
+    # Blit the highlight to the main surface
+    surface.blit(highlight, (0, 0))
+
+def draw_decorative_sprite(piece_type, color, size):
+    """Unrotated sprite of a background piece: the icon, its highlight and a faint glow"""
+    # Create a temporary surface for the piece with alpha
+    sprite = pygame.Surface((size*2.5, size*2.5), pygame.SRCALPHA)
+    draw_chess_icon(sprite, piece_type, color, (size, size), size)
+
+    # Add glossy highlight effect
+    add_glossy_highlight(sprite, color, size)
+
+    # Add subtle glow effect
+    glow_surface = pygame.Surface((size*3, size*3), pygame.SRCALPHA)
+    glow_color = (255, 255, 255, 10) if color == "white" else (100, 100, 255, 10)
+    pygame.draw.circle(glow_surface, glow_color, (size*1.5, size*1.5), size*1.2)
+    sprite.blit(glow_surface, (size*0.25, size*0.25))
+    return sprite
+
+def piece_frame(piece_type, color, size, rotation):
+    """Sprite of a background piece at the nearest pre-rendered rotation
+
+    The frames are shared by every piece that looks the same, so callers
+    set their alpha right before blitting them.
+    """
+    key = (piece_type, color, size)
+    frames = piece_frames.get(key)
+    if frames is None:
+        frames = piece_frames[key] = [draw_decorative_sprite(piece_type, color, size)]
+        frames.extend([None] * (360 // ROTATION_STEP - 1))
+
+    index = int(round(rotation / ROTATION_STEP)) % len(frames)
+    if frames[index] is None:
+        frames[index] = pygame.transform.rotate(frames[0], index * ROTATION_STEP)
+    return frames[index]
+
+def piece_alpha(alpha, pulse_speed):
+    """Slowly pulsing alpha of background pieces (works on arrays too)"""
+    time_factor = pygame.time.get_ticks() * pulse_speed / 1000
+    return np.clip(alpha + (10 * np.sin(time_factor * 1.5)).astype(int), 20, 100)
+
+def disc_offsets(radius):
+    """(dx, dy) arrays of the pixels within radius of a center pixel"""
+    span = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(span, span, indexing='ij')
+    inside = dx ** 2 + dy ** 2 <= radius ** 2
+    return dx[inside], dy[inside]
+
+DOT_STENCILS = [disc_offsets(radius) for radius in range(MAX_DOT_RADIUS + 1)]
+
+def draw_dots(surface, x, y, radius, colors, alpha):
+    """Alpha-blend filled dots onto a surface in bulk
+
+    x, y and radius are arrays with one entry per dot, colors is an (n, 3)
+    array and alpha an array of 0-255 values. Dots are grouped by rounded
+    radius, so the cost barely grows with the number of dots.
+    """
+    pixels = pygame.surfarray.pixels3d(surface)
+    width, height = pixels.shape[:2]
+    radius = np.clip(np.rint(radius).astype(int), 0, MAX_DOT_RADIUS)
+    x = x.astype(int)
+    y = y.astype(int)
+
+    for dot_radius in np.unique(radius):
+        chosen = radius == dot_radius
+        dx, dy = DOT_STENCILS[dot_radius]
+        px = (x[chosen, None] + dx).ravel()
+        py = (y[chosen, None] + dy).ravel()
+        rgb = np.repeat(colors[chosen], len(dx), axis=0)
+        opacity = np.repeat(alpha[chosen], len(dx))[:, None] / 255
+
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        px, py = px[inside], py[inside]
+        target = pixels[px, py].astype(np.float32)
+        pixels[px, py] = (target + (rgb[inside] - target) * opacity[inside]).astype(np.uint8)
+
+    # Unlock the surface
+    del pixels
 
 # Animated background with falling chess pieces and particle effects
 class AnimatedChessBackground:
-    def __init__(self, width, height, num_pieces=20):
+    """Falling chess pieces over stars, gold dust and nebula clouds
+
+    Every particle, star, cloud and piece is a row in NumPy arrays that are
+    updated together, dots are blended straight into the surface's pixels
+    and pieces use pre-rendered rotation frames, so the frame time hardly
+    depends on how many there are.
+    """
+    def __init__(self, width, height, num_pieces=20, num_stars=150, num_particles=80):
         self.width = width
         self.height = height
-        self.pieces = []
-        self.particles = []
-        self.stars = []
         self.time = 0
+        self.rng = np.random.default_rng()
+        rng = self.rng
 
         # Create a subtle gradient effect
         self.gradient_offset = 0
         self.gradient_speed = 0.2
-
-        # Create nebula-like clouds
-        self.clouds = []
-        for _ in range(5):
-            self.clouds.append({
-                'x': random.randint(0, width),
-                'y': random.randint(0, height),
-                'size': random.randint(200, 400),
-                'color': (
-                    random.randint(40, 70),  # R
-                    random.randint(40, 70),  # G
-                    random.randint(80, 120), # B
-                    random.randint(5, 15)    # Alpha
-                ),
-                'speed': random.uniform(0.05, 0.2),
-                'direction': random.uniform(0, 2 * math.pi)
-            })
+        self.gradient_strip = pygame.Surface((1, height))
+        self.gradient_surface = pygame.Surface((width, height))
+
+        # Create nebula-like clouds, each drawn once into its own sprite
+        num_clouds = 5
+        self.cloud_x = rng.uniform(0, width, num_clouds)
+        self.cloud_y = rng.uniform(0, height, num_clouds)
+        self.cloud_size = rng.integers(200, 401, num_clouds)
+        self.cloud_speed = rng.uniform(0.05, 0.2, num_clouds)
+        self.cloud_direction = rng.uniform(0, 2 * math.pi, num_clouds)
+        self.cloud_sprites = []
+        for size in self.cloud_size:
+            color = (
+                random.randint(40, 70),  # R
+                random.randint(40, 70),  # G
+                random.randint(80, 120), # B
+                random.randint(5, 15)    # Alpha
+            )
+            self.cloud_sprites.append(self._draw_cloud(int(size), color))
 
         # Create stars (small bright points)
-        for _ in range(150):
-            size = random.uniform(0.5, 2)
-            brightness = random.randint(150, 255)
-            twinkle_speed = random.uniform(1, 3)
-            self.stars.append({
-                'x': random.randint(0, width),
-                'y': random.randint(0, height),
-                'size': size,
-                'color': (brightness, brightness, brightness, random.randint(100, 200)),
-                'twinkle_speed': twinkle_speed,
-                'twinkle_offset': random.uniform(0, 6.28)  # Random phase offset
-            })
-
+        self.star_x = rng.uniform(0, width, num_stars)
+        self.star_y = rng.uniform(0, height, num_stars)
+        self.star_size = rng.uniform(0.5, 2, num_stars)
+        brightness = rng.integers(150, 256, num_stars)
+        self.star_color = np.stack([brightness] * 3, axis=1)
+        self.star_alpha = rng.integers(100, 201, num_stars)
+        self.star_twinkle_speed = rng.uniform(1, 3, num_stars)
+        self.star_twinkle_offset = rng.uniform(0, 6.28, num_stars)  # Random phase offset
+
+        # Create chess pieces with more elegant movement; sizes are rounded
+        # so pieces share their rotation frames
         piece_types = ["pawn", "knight", "bishop", "rook", "queen", "king"]
         colors = ["white", "black"]
+        sizes = rng.integers(30, 61, num_pieces)  # More consistent size range
+        self.piece_looks = [
+            (random.choice(piece_types), random.choice(colors),
+             int(round(size / PIECE_SIZE_STEP)) * PIECE_SIZE_STEP)
+            for size in sizes
+        ]
+        self.piece_size = np.array([look[2] for look in self.piece_looks])
+        self.piece_x = rng.uniform(0, width, num_pieces)
+        self.piece_y = rng.uniform(-height, height, num_pieces)
 
-        # Create chess pieces with more elegant movement
-        for _ in range(num_pieces):
-            piece_type = random.choice(piece_types)
-            color = random.choice(colors)
-            x = random.randint(0, width)
-            y = random.randint(-height, height)
-            size = random.randint(30, 60)  # More consistent size range
-
-            # Slower, more elegant movement
-            speed = random.uniform(0.1, 0.5)
-            rotation_speed = random.uniform(-0.3, 0.3)  # Gentler rotation
-
-            self.pieces.append(DecorativePiece(piece_type, color, x, y, size, speed, rotation_speed))
+        # Slower, more elegant movement
+        self.piece_speed = rng.uniform(0.1, 0.5, num_pieces)
+        self.piece_rotation = rng.uniform(0, 360, num_pieces)
+        self.piece_rotation_speed = rng.uniform(-0.3, 0.3, num_pieces)  # Gentler rotation
+        self.piece_alpha = rng.integers(30, 81, num_pieces)
+        self.piece_pulse_speed = rng.uniform(0.01, 0.05, num_pieces)
 
         # Create particles for a more dynamic background (gold dust effect)
-        for _ in range(80):
-            x = random.randint(0, width)
-            y = random.randint(0, height)
-            size = random.uniform(0.8, 2)
-            speed = random.uniform(0.05, 0.2)
-
-            # Gold/amber particles
-            r = random.randint(200, 255)
-            g = random.randint(170, 220)
-            b = random.randint(50, 100)
-            a = random.randint(20, 60)
-
-            self.particles.append({
-                'x': x, 'y': y, 'size': size, 'speed': speed,
-                'color': (r, g, b, a),
-                'direction': random.uniform(0, 2 * math.pi)
-            })
+        self.particle_x = rng.uniform(0, width, num_particles)
+        self.particle_y = rng.uniform(0, height, num_particles)
+        self.particle_size = rng.uniform(0.8, 2, num_particles)
+        self.particle_speed = rng.uniform(0.05, 0.2, num_particles)
+        self.particle_direction = rng.uniform(0, 2 * math.pi, num_particles)
+
+        # Gold/amber particles
+        self.particle_color = np.stack([
+            rng.integers(200, 256, num_particles),
+            rng.integers(170, 221, num_particles),
+            rng.integers(50, 101, num_particles)
+        ], axis=1)
+        self.particle_alpha = rng.integers(20, 61, num_particles)
+
+    def _draw_cloud(self, size, color):
+        """A soft, glowing cloud sprite"""
+        cloud_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        for radius in range(size, 0, -10):
+            # Vary alpha based on radius
+            alpha_factor = radius / size
+            ring_color = (color[0], color[1], color[2], int(color[3] * alpha_factor))
+
+            # Add some variation to the position for less perfect circles
+            offset_x = random.uniform(-5, 5) if radius < size * 0.8 else 0
+            offset_y = random.uniform(-5, 5) if radius < size * 0.8 else 0
+
+            pygame.draw.circle(cloud_surface, ring_color, (int(size + offset_x), int(size + offset_y)), radius)
+        return cloud_surface
+
+    def _drift(self, x, y, direction, speed, padding=0):
+        """Move points along their directions, wrapping them around the screen with padding"""
+        padding = np.broadcast_to(padding, x.shape)
+        x += np.cos(direction) * speed
+        y += np.sin(direction) * speed
+        for values, limit in ((x, self.width), (y, self.height)):
+            before = values < -padding
+            after = values > limit + padding
+            values[before] = limit + padding[before]
+            values[after] = -padding[after]
+
+    def _wander(self, direction, chance, amount):
+        """Change a few directions slightly for more natural movement"""
+        turning = self.rng.random(len(direction)) < chance
+        direction[turning] += self.rng.uniform(-amount, amount, np.count_nonzero(turning))
 
     def update(self):
         self.time += 0.01
@@ -481,148 +541,61 @@ class AnimatedChessBackground:
         if self.gradient_offset > 360:
             self.gradient_offset = 0
 
-        # Update nebula clouds
-        for cloud in self.clouds:
-            cloud['x'] += math.cos(cloud['direction']) * cloud['speed']
-            cloud['y'] += math.sin(cloud['direction']) * cloud['speed']
-
-            # Wrap clouds around screen with padding
-            padding = cloud['size']
-            if cloud['x'] < -padding:
-                cloud['x'] = self.width + padding
-            elif cloud['x'] > self.width + padding:
-                cloud['x'] = -padding
-            if cloud['y'] < -padding:
-                cloud['y'] = self.height + padding
-            elif cloud['y'] > self.height + padding:
-                cloud['y'] = -padding
-
-            # Occasionally change direction slightly
-            if random.random() < 0.005:
-                cloud['direction'] += random.uniform(-0.1, 0.1)
-
-        # Update chess pieces
-        for piece in self.pieces:
-            piece.update(self.width, self.height)
+        # Update nebula clouds, wrapping them around the screen with padding
+        self._drift(self.cloud_x, self.cloud_y, self.cloud_direction, self.cloud_speed, self.cloud_size)
+        self._wander(self.cloud_direction, 0.005, 0.1)
+
+        # Update chess pieces, sending them back to the top once off screen
+        self.piece_y += self.piece_speed
+        self.piece_rotation += self.piece_rotation_speed
+        fallen = self.piece_y > self.height + self.piece_size
+        self.piece_y[fallen] = -self.piece_size[fallen]
+        self.piece_x[fallen] = self.rng.uniform(0, self.width, np.count_nonzero(fallen))
 
         # Update particles (gold dust)
-        for particle in self.particles:
-            particle['x'] += math.cos(particle['direction']) * particle['speed']
-            particle['y'] += math.sin(particle['direction']) * particle['speed']
-
-            # Wrap particles around screen
-            if particle['x'] < 0:
-                particle['x'] = self.width
-            elif particle['x'] > self.width:
-                particle['x'] = 0
-            if particle['y'] < 0:
-                particle['y'] = self.height
-            elif particle['y'] > self.height:
-                particle['y'] = 0
-
-            # Occasionally change direction slightly for more natural movement
-            if random.random() < 0.02:
-                particle['direction'] += random.uniform(-0.3, 0.3)
+        self._drift(self.particle_x, self.particle_y, self.particle_direction, self.particle_speed)
+        self._wander(self.particle_direction, 0.02, 0.3)
 
     def draw(self, surface):
-        # Draw cosmic gradient background
-        gradient_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-
-        # Create a subtle shifting gradient
-        for y in range(0, self.height, 2):  # Step by 2 for performance
-            # Calculate gradient color with subtle animation
-            progress = y / self.height
-            phase = (progress * 6.28 + self.time * 0.2) % 6.28
-
-            # Deep blue to purple gradient
-            r = int(45 + 10 * math.sin(phase))
-            g = int(45 + 5 * math.sin(phase * 0.7))
-            b = int(65 + 15 * math.sin(phase * 0.5))
-
-            pygame.draw.line(gradient_surface, (r, g, b), (0, y), (self.width, y))
-
-        surface.blit(gradient_surface, (0, 0))
-
-        # Draw nebula-like clouds
-        for cloud in self.clouds:
-            cloud_surface = pygame.Surface((cloud['size'] * 2, cloud['size'] * 2), pygame.SRCALPHA)
-
-            # Create a soft, glowing cloud
-            for radius in range(int(cloud['size']), 0, -10):
-                # Vary alpha based on radius
-                alpha_factor = radius / cloud['size']
-                color = (
-                    cloud['color'][0],
-                    cloud['color'][1],
-                    cloud['color'][2],
-                    int(cloud['color'][3] * alpha_factor)
-                )
-
-                # Add some variation to the position for less perfect circles
-                offset_x = random.uniform(-5, 5) if radius < cloud['size'] * 0.8 else 0
-                offset_y = random.uniform(-5, 5) if radius < cloud['size'] * 0.8 else 0
-
-                pygame.draw.circle(
-                    cloud_surface,
-                    color,
-                    (int(cloud['size'] + offset_x), int(cloud['size'] + offset_y)),
-                    radius
-                )
-
-            # Apply a subtle time-based distortion
-            distortion = math.sin(self.time * 0.5) * 5
-            cloud_rect = cloud_surface.get_rect(center=(cloud['x'] + distortion, cloud['y']))
-            surface.blit(cloud_surface, cloud_rect)
-
-        # Draw stars with twinkling effect
-        for star in self.stars:
-            # Calculate twinkling effect
-            twinkle = math.sin(self.time * star['twinkle_speed'] + star['twinkle_offset'])
-            size_mod = 1 + 0.3 * twinkle
-            alpha_mod = 1 + 0.5 * twinkle
-
-            # Apply modifications
-            size = star['size'] * size_mod
-            alpha = min(255, int(star['color'][3] * alpha_mod))
-            color = (star['color'][0], star['color'][1], star['color'][2], alpha)
-
-            # Draw the star
-            pygame.draw.circle(
-                surface,
-                color,
-                (int(star['x']), int(star['y'])),
-                size
-            )
-
-            # Add a subtle glow to brighter stars
-            if star['size'] > 1.5:
-                glow_size = size * 2
-                glow_surface = pygame.Surface((int(glow_size * 2), int(glow_size * 2)), pygame.SRCALPHA)
-                glow_color = (star['color'][0], star['color'][1], star['color'][2], 30)
-                pygame.draw.circle(glow_surface, glow_color, (int(glow_size), int(glow_size)), int(glow_size))
-                surface.blit(glow_surface, (int(star['x'] - glow_size), int(star['y'] - glow_size)))
-
-        # Draw gold dust particles
-        for particle in self.particles:
-            # Pulse size and alpha slightly based on time
-            pulse = math.sin(self.time * 2 + particle['x'] * 0.01)
-            size_mod = 1 + 0.2 * pulse
-            alpha_mod = 1 + 0.3 * pulse
-
-            size = particle['size'] * size_mod
-            alpha = min(255, int(particle['color'][3] * alpha_mod))
-            color = (particle['color'][0], particle['color'][1], particle['color'][2], alpha)
-
-            pygame.draw.circle(
-                surface,
-                color,
-                (int(particle['x']), int(particle['y'])),
-                size
-            )
-
-        # Draw chess pieces
-        for piece in self.pieces:
-            piece.draw(surface)
+        # Draw cosmic gradient background: one column, stretched across the screen
+        phase = (np.arange(self.height) / self.height * 6.28 + self.time * 0.2) % 6.28
+        column = np.stack([
+            45 + 10 * np.sin(phase),
+            45 + 5 * np.sin(phase * 0.7),
+            65 + 15 * np.sin(phase * 0.5)  # Deep blue to purple gradient
+        ], axis=1).astype(np.uint8)
+        pygame.surfarray.blit_array(self.gradient_strip, column[None, :, :])
+        pygame.transform.scale(self.gradient_strip, (self.width, self.height), self.gradient_surface)
+        surface.blit(self.gradient_surface, (0, 0))
+
+        # Draw nebula-like clouds with a subtle time-based distortion
+        distortion = math.sin(self.time * 0.5) * 5
+        surface.blits([
+            (sprite, sprite.get_rect(center=(x + distortion, y)))
+            for sprite, x, y in zip(self.cloud_sprites, self.cloud_x, self.cloud_y)
+        ], doreturn=False)
+
+        # Draw stars with twinkling effect, and a subtle glow around brighter ones
+        twinkle = np.sin(self.time * self.star_twinkle_speed + self.star_twinkle_offset)
+        star_size = self.star_size * (1 + 0.3 * twinkle)
+        star_alpha = np.minimum(255, self.star_alpha * (1 + 0.5 * twinkle))
+        draw_dots(surface, self.star_x, self.star_y, star_size, self.star_color, star_alpha)
+        bright = self.star_size > 1.5
+        draw_dots(surface, self.star_x[bright], self.star_y[bright], star_size[bright] * 2,
+                  self.star_color[bright], np.full(np.count_nonzero(bright), 30))
+
+        # Draw gold dust particles, pulsing size and alpha slightly based on time
+        pulse = np.sin(self.time * 2 + self.particle_x * 0.01)
+        draw_dots(surface, self.particle_x, self.particle_y, self.particle_size * (1 + 0.2 * pulse),
+                  self.particle_color, np.minimum(255, self.particle_alpha * (1 + 0.3 * pulse)))
+
+        # Draw chess pieces from their pre-rendered rotation frames
+        alphas = piece_alpha(self.piece_alpha, self.piece_pulse_speed)
+        for (piece_type, color, size), x, y, rotation, alpha in zip(
+                self.piece_looks, self.piece_x, self.piece_y, self.piece_rotation, alphas):
+            frame = piece_frame(piece_type, color, size, rotation)
+            frame.set_alpha(int(alpha))
+            surface.blit(frame, frame.get_rect(center=(x, y)))
 
 # Fancy button with chess theme
 def draw_chess_button(surface, rect, text, font, is_hovered=False, custom_color=None):
@@ -699,12 +672,12 @@ def draw_chess_button(surface, rect, text, font, is_hovered=False, custom_color=
     text_size = 1.05 if is_hovered else 1.0
 
     # Shadow text - classic black-and-white
-    shadow_surf = font.render(text, True, (20, 20, 20))
+    shadow_surf = render_text(font, text, (20, 20, 20))
     shadow_rect = shadow_surf.get_rect(center=(width//2 + glow_radius + 2, height//2 + glow_radius + 2))
     button_surface.blit(shadow_surf, shadow_rect)
 
     # Main text
-    text_surf = font.render(text, True, text_color)
+    text_surf = render_text(font, text, text_color)
     if is_hovered:
         # Scale text slightly larger when hovered
         original_size = text_surf.get_size()
@@ -974,12 +947,12 @@ def draw_chess_input(surface, rect, text, placeholder, font, small_font, is_acti
     padding = pattern_width + 15
     if text:
         # Draw text shadow
-        shadow_surf = font.render(text, True, (100, 100, 100))
+        shadow_surf = render_text(font, text, (100, 100, 100))
         shadow_rect = shadow_surf.get_rect(x=glow_radius + padding + 1, centery=glow_radius + height // 2 + 1)
         input_surface.blit(shadow_surf, shadow_rect)
 
         # Draw main text
-        text_surf = font.render(text, True, text_color)
+        text_surf = render_text(font, text, text_color)
         text_rect = text_surf.get_rect(x=glow_radius + padding, centery=glow_radius + height // 2)
         input_surface.blit(text_surf, text_rect)
     else:
@@ -1133,19 +1106,19 @@ def draw_chess_game_item(surface, rect, game_name, host_name, guest_name=None, s
                     1, border_radius=2)
 
     # Prepare fonts with better styling
-    font_large = pygame.font.SysFont('Arial', 24)
-    font_small = pygame.font.SysFont('Arial', 18)
+    font_large = get_font('Arial', 24)
+    font_small = get_font('Arial', 18)
 
     # Game name with shadow and glow - limit length to prevent overflow
     if len(game_name) > 15:
         game_name = game_name[:15] + "..."
 
     # Draw name shadow
-    name_shadow = font_large.render(game_name, True, (20, 20, 40))
+    name_shadow = render_text(font_large, game_name, (20, 20, 40))
     item_surface.blit(name_shadow, (board_x + board_size + 32, board_y + 17))
 
     # Draw name with subtle glow if hovered
-    name_text = font_large.render(game_name, True, text_color)
+    name_text = render_text(font_large, game_name, text_color)
     if is_hovered:
         # Add subtle glow to text
         glow_text = font_large.render(game_name, True, (255, 255, 200))
@@ -1156,7 +1129,7 @@ def draw_chess_game_item(surface, rect, game_name, host_name, guest_name=None, s
 
     # Enhanced status badge with glow and animation
     status_text = "Waiting for player" if status == "waiting" else "In progress"
-    status_badge = font_small.render(status_text, True, (240, 240, 240))
+    status_badge = render_text(font_small, status_text, (240, 240, 240))
     badge_width = status_badge.get_width() + 20
     badge_height = 25
     badge_x = glow_radius + width - badge_width - 20
@@ -1196,7 +1169,7 @@ def draw_chess_game_item(surface, rect, game_name, host_name, guest_name=None, s
 
     # Draw badge text with shadow
     shadow_offset = 1
-    badge_shadow = font_small.render(status_text, True, (0, 0, 0, 100))
+    badge_shadow = render_text(font_small, status_text, (0, 0, 0, 100))
     item_surface.blit(badge_shadow, (badge_x + 10 + shadow_offset, badge_y + 4 + shadow_offset))
     item_surface.blit(status_badge, (badge_x + 10, badge_y + 4))
 
@@ -1217,9 +1190,9 @@ def draw_chess_game_item(surface, rect, game_name, host_name, guest_name=None, s
     item_surface.blit(king_surface, (player_section_x, board_y + 45 + king_offset))
 
     # Draw host text with shadow
-    host_shadow = font_small.render(f"White: {host_name}", True, (20, 20, 40))
+    host_shadow = render_text(font_small, f"White: {host_name}", (20, 20, 40))
     item_surface.blit(host_shadow, (player_section_x + 21, board_y + 39))
-    host_text = font_small.render(f"White: {host_name}", True, (220, 220, 220))
+    host_text = render_text(font_small, f"White: {host_name}", (220, 220, 220))
     item_surface.blit(host_text, (player_section_x + 20, board_y + 38))
 
     # Guest name with animated black king icon if game is in progress
@@ -1235,9 +1208,9 @@ def draw_chess_game_item(surface, rect, game_name, host_name, guest_name=None, s
         item_surface.blit(king_surface, (player_section_x, board_y + 65 + king_offset))
 
         # Draw guest text with shadow
-        guest_shadow = font_small.render(f"Black: {guest_name}", True, (20, 20, 40))
+        guest_shadow = render_text(font_small, f"Black: {guest_name}", (20, 20, 40))
         item_surface.blit(guest_shadow, (player_section_x + 21, board_y + 59))
-        guest_text = font_small.render(f"Black: {guest_name}", True, (220, 220, 220))
+        guest_text = render_text(font_small, f"Black: {guest_name}", (220, 220, 220))
         item_surface.blit(guest_text, (player_section_x + 20, board_y + 58))
 
     # Blit the final item to the main surface
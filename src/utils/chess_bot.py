@@ -8,13 +8,150 @@ import time
 # Use the BOARD_SIZE constant directly
 BOARD_SIZE = 8
 
+# Piece values in centipawns
+PIECE_VALUES = {
+    'pawn': 100,
+    'knight': 320,
+    'bishop': 330,
+    'rook': 500,
+    'queen': 900,
+    'king': 0  # King has no capture value
+}
+
+# Score used for checkmate (reduced by ply so faster mates score higher)
+MATE_SCORE = 100000
+
+# How often (in nodes) the search checks the hard deadline
+DEADLINE_CHECK_INTERVAL = 64
+
+# Expected growth in search time from one depth to the next, used to skip
+# iterations that can't finish before the soft deadline
+ITERATION_GROWTH = 4.0
+
+# Per-difficulty search settings:
+# - clock / increment: the bot's configured time control in seconds
+# - moves_to_go: how many moves the remaining clock is spread over
+# - min_budget / max_budget: bounds on the per-move budget in seconds
+# - max_depth: iterative deepening stops at this depth
+# - stability: iterations with an unchanged best move before stopping early
+# - noise: random centipawns added to root moves to vary play
+DIFFICULTY_SETTINGS = {
+    "easy": {
+        'clock': 60.0,
+        'increment': 0.0,
+        'moves_to_go': 40,
+        'min_budget': 0.005,
+        'max_budget': 0.05,
+        'max_depth': 1,
+        'stability': 1,
+        'noise': 300
+    },
+    "medium": {
+        'clock': 180.0,
+        'increment': 1.0,
+        'moves_to_go': 35,
+        'min_budget': 0.05,
+        'max_budget': 1.0,
+        'max_depth': 3,
+        'stability': 2,
+        'noise': 30
+    },
+    "hard": {
+        'clock': 300.0,
+        'increment': 2.0,
+        'moves_to_go': 30,
+        'min_budget': 0.2,
+        'max_budget': 6.0,
+        'max_depth': 64,
+        'stability': 4,
+        'noise': 0
+    }
+}
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the hard deadline has passed"""
+
+
+class TimeManager:
+    """Allocates a per-move search budget from a game clock
+
+    Each move gets a soft deadline (don't start another iteration after it)
+    and a hard deadline (abort the current iteration). The clock is charged
+    with the time actually spent and credited with the increment.
+    """
+    def __init__(self, difficulty="medium", clock=None, increment=None, max_move_time=None):
+        settings = DIFFICULTY_SETTINGS.get(difficulty, DIFFICULTY_SETTINGS["medium"])
+        self.settings = settings
+        self.remaining = settings['clock'] if clock is None else clock
+        self.increment = settings['increment'] if increment is None else increment
+        self.max_move_time = max_move_time  # Optional hard cap per move (e.g. server deadline)
+        self.start_time = None
+        self.budget = 0.0
+        self.soft_deadline = None
+        self.hard_deadline = None
+
+    def start_move(self):
+        """Allocate the budget for a new move and start its timer"""
+        settings = self.settings
+
+        # Spread the remaining clock over the expected number of moves
+        budget = self.remaining / settings['moves_to_go'] + self.increment * 0.8
+        budget = max(settings['min_budget'], min(settings['max_budget'], budget))
+
+        # Never plan to use more than a fraction of what is left on the clock
+        budget = min(budget, max(self.remaining * 0.5, settings['min_budget']))
+
+        # The hard deadline lets an iteration overrun the soft one a little
+        hard_limit = min(budget * 1.5, max(self.remaining * 0.8, budget))
+        if self.max_move_time is not None:
+            budget = min(budget, self.max_move_time / 1.5)
+            hard_limit = min(hard_limit, self.max_move_time)
+
+        self.budget = budget
+        self.start_time = time.perf_counter()
+        self.soft_deadline = self.start_time + budget
+        self.hard_deadline = self.start_time + hard_limit
+        return budget
+
+    def elapsed(self):
+        """Seconds spent on the current move"""
+        return time.perf_counter() - self.start_time
+
+    def soft_expired(self):
+        """Whether another iteration should not be started"""
+        return time.perf_counter() >= self.soft_deadline
+
+    def hard_expired(self):
+        """Whether the running iteration must be aborted"""
+        return time.perf_counter() >= self.hard_deadline
+
+    def time_left(self):
+        """Seconds until the soft deadline"""
+        return self.soft_deadline - time.perf_counter()
+
+    def shorten(self, factor):
+        """Pull the soft deadline in, e.g. when the best move is stable"""
+        self.soft_deadline = self.start_time + (self.soft_deadline - self.start_time) * factor
+
+    def finish_move(self):
+        """Charge the clock for the time spent and add the increment"""
+        spent = self.elapsed()
+        self.remaining = max(0.0, self.remaining - spent) + self.increment
+        return spent
+
+
 class ChessBot:
     """A simple chess bot that can play chess"""
-    def __init__(self, difficulty="medium"):
-        """Initialize the bot with a difficulty level"""
+    def __init__(self, difficulty="medium", clock=None, increment=None, max_move_time=None):
+        """Initialize the bot with a difficulty level and optional time control"""
         self.difficulty = difficulty  # "easy", "medium", or "hard"
         self.name = f"Chess Bot ({difficulty.capitalize()})"
         self.color = None  # Will be set when the game starts
+        self.settings = DIFFICULTY_SETTINGS.get(difficulty, DIFFICULTY_SETTINGS["medium"])
+        self.time_manager = TimeManager(difficulty, clock, increment, max_move_time)
+        self.nodes = 0
+        self.last_search = {}  # Statistics from the most recent search
 
     def set_color(self, color):
         """Set the bot's color"""
@@ -22,159 +159,196 @@ class ChessBot:
 
     def make_move(self, game):
         """Make a move based on the current game state"""
-        # Add a small delay to make it seem like the bot is "thinking"
-        thinking_time = {
-            "easy": 0.5,
-            "medium": 1.0,
-            "hard": 1.5
-        }.get(self.difficulty, 1.0)
-
-        time.sleep(thinking_time)
-
-        # Print debug info
         print(f"Bot {self.name} is thinking...")
-        print(f"Bot color: {self.color}")
-        print(f"Current turn: {game.turn}")
 
-        # Get all valid moves for the bot's pieces
+        # Get all legal moves for the bot's pieces
         valid_moves = self._get_all_valid_moves(game)
 
-        # Print number of valid moves found
-        print(f"Found {len(valid_moves)} valid moves")
-
         if not valid_moves:
             print("No valid moves available")
             return None  # No valid moves available
 
-        # Choose a move based on difficulty
-        chosen_move = None
-        if self.difficulty == "easy":
-            # Easy: Choose a random move
-            chosen_move = self._choose_random_move(valid_moves)
-        elif self.difficulty == "medium":
-            # Medium: Prefer captures and checks, but sometimes make random moves
-            chosen_move = self._choose_medium_move(valid_moves, game)
-        else:  # hard
-            # Hard: Evaluate positions and choose the best move
-            chosen_move = self._choose_hard_move(valid_moves, game)
-
-        # Print the chosen move
+        budget = self.time_manager.start_move()
+        chosen_move, depth, score = self._iterative_deepening(game, valid_moves)
+        spent = self.time_manager.finish_move()
+
+        self.last_search = {
+            'depth': depth,
+            'nodes': self.nodes,
+            'time': spent,
+            'budget': budget,
+            'score': score,
+            'nps': int(self.nodes / spent) if spent > 0 else 0,
+            'clock_remaining': self.time_manager.remaining
+        }
+
         if chosen_move:
-            from_pos, to_pos = chosen_move
-            print(f"Bot chose move: {from_pos} -> {to_pos}")
+            from_pos, to_pos = chosen_move[0], chosen_move[1]
+            print(f"Bot chose move: {from_pos} -> {to_pos} "
+                  f"(depth {depth}, {self.nodes} nodes, {spent * 1000:.0f} ms)")
         else:
             print("Bot couldn't find a move")
 
         return chosen_move
 
     def _get_all_valid_moves(self, game):
-        """Get all valid moves for the bot's pieces"""
-        valid_moves = []
-
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = game.board[row][col]
-                # Check if there's a piece and it's the bot's color
-                if piece and isinstance(piece, dict) and piece.get('color') == self.color:
-                    # For each piece of the bot's color, find all valid moves
-                    from_pos = (row, col)
-
-                    # Use the game's get_valid_moves method to get valid moves for this piece
-                    piece_valid_moves = game.get_valid_moves(from_pos)
-                    for to_pos in piece_valid_moves:
-                        valid_moves.append((from_pos, to_pos))
-
-        return valid_moves
-
-    def _choose_random_move(self, valid_moves):
-        """Choose a random move from the list of valid moves"""
-        if not valid_moves:
-            return None
-        return random.choice(valid_moves)
-
-    def _choose_medium_move(self, valid_moves, game):
-        """Choose a move with medium difficulty strategy"""
-        # Categorize moves
-        capture_moves = []
-        center_moves = []
-        other_moves = []
-
-        for from_pos, to_pos in valid_moves:
-            # Check if it's a capture move
-            if game.board[to_pos[0]][to_pos[1]]:
-                capture_moves.append((from_pos, to_pos))
-            # Check if it's a move to the center (4 center squares)
-            elif 3 <= to_pos[0] <= 4 and 3 <= to_pos[1] <= 4:
-                center_moves.append((from_pos, to_pos))
+        """Get all legal moves for the bot's pieces"""
+        return game.get_all_valid_moves_for_color(self.color)
+
+    def _iterative_deepening(self, game, valid_moves):
+        """Search one ply deeper each iteration until the time manager says stop"""
+        tm = self.time_manager
+        self.nodes = 0
+
+        # Root noise is fixed per move so every iteration ranks moves consistently
+        noise = self.settings['noise']
+        root_noise = {move: random.uniform(0, noise) if noise else 0 for move in valid_moves}
+
+        # Shuffle first so equally ranked quiet moves vary between games
+        root_moves = list(valid_moves)
+        random.shuffle(root_moves)
+        root_moves = self._order_moves(game.board, root_moves)
+
+        best_move = root_moves[0]
+        best_score = 0
+        completed_depth = 0
+        stable_iterations = 0
+
+        for depth in range(1, self.settings['max_depth'] + 1):
+            iteration_start = time.perf_counter()
+            try:
+                move, score = self._search_root(game, root_moves, depth, root_noise)
+            except SearchTimeout:
+                break
+            iteration_time = time.perf_counter() - iteration_start
+
+            completed_depth = depth
+            if move == best_move:
+                stable_iterations += 1
             else:
-                other_moves.append((from_pos, to_pos))
-
-        # Make sure we have at least one valid move
-        if not valid_moves:
-            return None
-
-        # 60% chance to choose a capture if available
-        if capture_moves and random.random() < 0.6:
-            return random.choice(capture_moves)
-        # 30% chance to choose a center move if available
-        elif center_moves and random.random() < 0.3:
-            return random.choice(center_moves)
-        # Otherwise choose randomly from all moves
-        else:
-            return random.choice(valid_moves)
-
-    def _choose_hard_move(self, valid_moves, game):
-        """Choose a move with hard difficulty strategy"""
-        if not valid_moves:
-            return None
-
-        best_move = None
-        best_score = float('-inf')
-
-        for from_pos, to_pos in valid_moves:
-            # Make a copy of the game to simulate the move
-            # Since we don't have a deep copy method, we'll evaluate without simulation
-            score = self._evaluate_move(from_pos, to_pos, game)
+                stable_iterations = 0
+            best_move, best_score = move, score
+
+            # Search the previous best move first in the next iteration
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+
+            # A forced mate won't change with more depth
+            if abs(score) >= MATE_SCORE - 1000:
+                break
+
+            # Once the best move has held for a while, cut the remaining budget
+            if stable_iterations >= self.settings['stability']:
+                tm.shorten(0.5)
+
+            # Don't start an iteration that would only be thrown away
+            if tm.soft_expired() or iteration_time * ITERATION_GROWTH > tm.time_left():
+                break
+
+        return best_move, completed_depth, best_score
+
+    def _search_root(self, game, root_moves, depth, root_noise):
+        """Search all root moves to the given depth and return the best one"""
+        opponent = 'black' if self.color == 'white' else 'white'
+        alpha = -MATE_SCORE - 1
+        beta = MATE_SCORE + 1
+        best_move = root_moves[0]
+        best_score = -MATE_SCORE - 1
+
+        for move in root_moves:
+            # Shift the window by the move's noise, so a move that fails low
+            # stays below alpha once its noise is added
+            noise = root_noise[move]
+            undo = game.push_move(move)
+            try:
+                score = -self._negamax(game, opponent, depth - 1, -(beta - noise), -(alpha - noise), 1) + noise
+            finally:
+                game.pop_move(move, undo)
 
             if score > best_score:
                 best_score = score
-                best_move = (from_pos, to_pos)
-
-        return best_move
+                best_move = move
+            if score > alpha:
+                alpha = score
+
+        return best_move, best_score
+
+    def _negamax(self, game, color, depth, alpha, beta, ply):
+        """Alpha-beta search returning the score for the side to move"""
+        self.nodes += 1
+        if self.nodes % DEADLINE_CHECK_INTERVAL == 0 and self.time_manager.hard_expired():
+            raise SearchTimeout()
+
+        if depth <= 0:
+            return self._evaluate(game.board, color)
+
+        moves = game.get_all_valid_moves_for_color(color)
+        if not moves:
+            # Checkmate or stalemate
+            if game.is_in_check(color):
+                return -MATE_SCORE + ply
+            return 0
+
+        board = game.board
+        opponent = 'black' if color == 'white' else 'white'
+        best_score = -MATE_SCORE - 1
+
+        for move in self._order_moves(board, moves):
+            undo = game.push_move(move)
+            try:
+                score = -self._negamax(game, opponent, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.pop_move(move, undo)
 
-    def _evaluate_move(self, from_pos, to_pos, game):
-        """Evaluate a move and return a score"""
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        return best_score
+
+    def _order_moves(self, board, moves):
+        """Order promotions and captures first, most valuable victim / least valuable attacker"""
+        def move_key(move):
+            from_pos, to_pos = move[0], move[1]
+            key = 0
+            if len(move) > 2:
+                key -= PIECE_VALUES[move[2]] * 10
+            target = board[to_pos[0]][to_pos[1]]
+            if target:
+                attacker = board[from_pos[0]][from_pos[1]]
+                key -= PIECE_VALUES.get(target['type'], 0) * 10 - PIECE_VALUES.get(attacker['type'], 0) // 10
+            return key
+
+        return sorted(moves, key=move_key)
+
+    def _evaluate(self, board, color):
+        """Evaluate the position from the point of view of the given color"""
         score = 0
-
-        # Get the pieces involved
-        piece = game.board[from_pos[0]][from_pos[1]]
-        target = game.board[to_pos[0]][to_pos[1]]
-
-        # Piece values
-        piece_values = {
-            'pawn': 1,
-            'knight': 3,
-            'bishop': 3,
-            'rook': 5,
-            'queen': 9,
-            'king': 0  # King has no capture value
-        }
-
-        # If it's a capture, add the value of the captured piece
-        if target:
-            score += piece_values.get(target.get('type', ''), 0)
-
-        # Prefer moving to the center of the board
-        center_distance = abs(3.5 - to_pos[0]) + abs(3.5 - to_pos[1])
-        score += (7 - center_distance) * 0.1
-
-        # Prefer developing knights and bishops early
-        if piece.get('type') in ['knight', 'bishop']:
-            # Check if piece is in starting position
-            if (self.color == 'white' and from_pos[0] == 7) or (self.color == 'black' and from_pos[0] == 0):
-                score += 0.5
-
-        # Add some randomness to avoid predictability
-        score += random.uniform(0, 0.1)
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = board[row][col]
+                if not piece:
+                    continue
+
+                value = PIECE_VALUES.get(piece['type'], 0)
+                piece_type = piece['type']
+
+                # Prefer pieces in the center of the board
+                if piece_type in ('knight', 'bishop', 'pawn', 'queen'):
+                    center_distance = abs(3.5 - row) + abs(3.5 - col)
+                    value += int((7 - center_distance) * 4)
+
+                # Reward advanced pawns
+                if piece_type == 'pawn':
+                    advance = (6 - row) if piece['color'] == 'white' else (row - 1)
+                    value += advance * 5
+
+                if piece['color'] == color:
+                    score += value
+                else:
+                    score -= value
 
         return score
@@ -7,6 +7,8 @@ import math
 import random
 import time
 
+from .font_cache import get_font, render_text, truncate_text, wrap_text
+
 # Colors - Classic black-and-white chess theme
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -24,6 +26,39 @@ BUTTON_COLOR = (30, 30, 30)     # Dark gray
 BUTTON_HOVER_COLOR = (70, 70, 70)  # Lighter gray
 CREAM = (240, 240, 240)         # Off-white for text contrast
 
+TURN_INDICATOR_Y = 125  # Top of the players' pulsing turn indicator in the sidebar
+
+class LayerCache:
+    """Static layers rendered once into surfaces and blitted every frame
+
+    A layer is redrawn only when the size it is asked for or its theme
+    (any hashable describing its colors) changes, or after invalidate().
+    """
+    def __init__(self):
+        self.layers = {}  # name -> ((size, theme), surface)
+
+    def get(self, name, size, draw, theme=None):
+        """Surface for a layer, calling draw(surface) to render it when stale"""
+        key = (tuple(size), theme)
+        cached = self.layers.get(name)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        surface = pygame.Surface(key[0])
+        if pygame.display.get_surface():
+            # Match the display's pixel format so blits are plain copies
+            surface = surface.convert()
+        draw(surface)
+        self.layers[name] = (key, surface)
+        return surface
+
+    def invalidate(self, name=None):
+        """Drop one layer, or all of them, so they are rendered again"""
+        if name is None:
+            self.layers.clear()
+        else:
+            self.layers.pop(name, None)
+
 def draw_enhanced_board(screen, board_x, board_y, board_width, square_size):
     """Draw an enhanced chess board with better visuals"""
     board_size = 8
@@ -57,12 +92,12 @@ def draw_enhanced_board(screen, board_x, board_y, board_width, square_size):
             ))
 
     # Draw coordinates
-    coord_font = pygame.font.SysFont('Arial', 14)
+    coord_font = get_font('Arial', 14)
 
     # Draw column coordinates (A-H)
     for col in range(board_size):
         # Draw at the bottom
-        col_text = coord_font.render(chr(65 + col), True, GOLD)
+        col_text = render_text(coord_font, chr(65 + col), GOLD)
         screen.blit(col_text, (
             board_x + col * square_size + square_size // 2 - col_text.get_width() // 2,
             board_y + board_width + 5
@@ -71,16 +106,14 @@ def draw_enhanced_board(screen, board_x, board_y, board_width, square_size):
     # Draw row coordinates (1-8)
     for row in range(board_size):
         # Draw on the left
-        row_text = coord_font.render(str(8 - row), True, GOLD)
+        row_text = render_text(coord_font, str(8 - row), GOLD)
         screen.blit(row_text, (
             board_x - 20,
             board_y + row * square_size + square_size // 2 - row_text.get_height() // 2
         ))
 
-def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game, player_color,
-                         title_font, header_font, font, small_font, chat_input="", is_typing=False,
-                         new_game_button=None, spectator_name=None, is_bot_game=False):
-    """Draw an enhanced sidebar with better visuals"""
+def draw_sidebar_background(screen, sidebar_x, sidebar_width, window_height):
+    """Draw the sidebar's gradient, border and chess patterns"""
     # Draw sidebar background with gradient - classic black-and-white
     for y in range(window_height):
         # Create a gradient from dark gray to slightly lighter gray
@@ -118,9 +151,36 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
     screen.blit(pattern_surface_top, (sidebar_x, 0))
     screen.blit(pattern_surface_bottom, (sidebar_x, window_height - pattern_height))
 
+def turn_indicator_rect(sidebar_x):
+    """Area the players' pulsing turn indicator can cover"""
+    return pygame.Rect(sidebar_x + 40, TURN_INDICATOR_Y, 25, 25).inflate(8, 8)
+
+def draw_turn_indicator(screen, sidebar_x, turn_color):
+    """Draw the players' turn indicator, pulsing with time"""
+    current_time = pygame.time.get_ticks() / 1000
+    pulse_size = 12 + math.sin(current_time * 4) * 2  # Pulsing effect
+
+    turn_indicator_rect = pygame.Rect(sidebar_x + 40, TURN_INDICATOR_Y, 25, 25)
+    pygame.draw.circle(screen, turn_color, turn_indicator_rect.center, pulse_size)
+    pygame.draw.circle(screen, LIGHT_GRAY, turn_indicator_rect.center, pulse_size, 1)
+
+def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game, player_color,
+                         title_font, header_font, font, small_font, chat_input="", is_typing=False,
+                         new_game_button=None, spectator_name=None, is_bot_game=False, explorer=None,
+                         background=True):
+    """Draw an enhanced sidebar with better visuals
+
+    When explorer is given (the server's opening statistics, or an empty
+    dict while they load) it replaces the chat section. Pass
+    background=False when the background is already there (e.g. from a
+    cached layer).
+    """
+    if background:
+        draw_sidebar_background(screen, sidebar_x, sidebar_width, window_height)
+
     # Draw title with shadow
-    title_text = title_font.render("CHESS GAME", True, GOLD)
-    shadow_text = title_font.render("CHESS GAME", True, (30, 30, 30))
+    title_text = render_text(title_font, "CHESS GAME", GOLD)
+    shadow_text = render_text(title_font, "CHESS GAME", (30, 30, 30))
     title_rect = title_text.get_rect(center=(sidebar_x + sidebar_width // 2, 30))
 
     # Draw shadow slightly offset
@@ -131,7 +191,7 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
     # Different display for spectators vs players
     if player_color == 'spectator':
         # Draw spectator badge
-        spectator_badge = small_font.render("SPECTATOR MODE", True, WHITE)
+        spectator_badge = render_text(small_font, "SPECTATOR MODE", WHITE)
         badge_width = spectator_badge.get_width() + 20
         badge_rect = pygame.Rect(sidebar_x + (sidebar_width - badge_width) // 2, 65, badge_width, 25)
         pygame.draw.rect(screen, BLUE, badge_rect, border_radius=12)
@@ -140,7 +200,7 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
 
         # Show spectator name if provided
         if spectator_name:
-            spectator_text = small_font.render(f"Viewing as: {spectator_name}", True, LIGHT_GRAY)
+            spectator_text = render_text(small_font, f"Viewing as: {spectator_name}", LIGHT_GRAY)
             spectator_rect = spectator_text.get_rect(center=(sidebar_x + sidebar_width // 2, 100))
             screen.blit(spectator_text, spectator_rect)
     else:
@@ -152,8 +212,8 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
         pygame.draw.circle(screen, WHITE, white_icon_rect.center, 10)
         pygame.draw.circle(screen, GRAY, white_icon_rect.center, 10, 1)
 
-        white_text = font.render(f"You: {game.white_player_name if player_color == 'white' else game.black_player_name}",
-                               True, WHITE)
+        white_text = render_text(font, f"You: {game.white_player_name if player_color == 'white' else game.black_player_name}",
+                                 WHITE)
         screen.blit(white_text, (sidebar_x + 65, player_y - 2))
 
         # Black player (circle icon)
@@ -161,30 +221,25 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
         pygame.draw.circle(screen, BLACK, black_icon_rect.center, 10)
         pygame.draw.circle(screen, LIGHT_GRAY, black_icon_rect.center, 10, 1)
 
-        black_text = font.render(f"Opponent: {game.black_player_name if player_color == 'white' else game.white_player_name}",
-                               True, LIGHT_GRAY)
+        black_text = render_text(font, f"Opponent: {game.black_player_name if player_color == 'white' else game.white_player_name}",
+                                 LIGHT_GRAY)
         screen.blit(black_text, (sidebar_x + 65, player_y + 28))
 
     # Draw turn info with visual indicator
     if player_color == 'spectator':
         # For spectators, just show whose turn it is without the green/red indicator
         turn_y = 185
-        turn_text = header_font.render(f"Turn: {game.turn.capitalize()}", True, WHITE)
+        turn_text = render_text(header_font, f"Turn: {game.turn.capitalize()}", WHITE)
         screen.blit(turn_text, (sidebar_x + 20, turn_y))
     else:
         # For players, show turn with color indicator
-        turn_y = 125
+        turn_y = TURN_INDICATOR_Y
         turn_color = GREEN if game.turn == player_color else RED
 
         # Draw animated turn indicator
-        current_time = pygame.time.get_ticks() / 1000
-        pulse_size = 12 + math.sin(current_time * 4) * 2  # Pulsing effect
-
-        turn_indicator_rect = pygame.Rect(sidebar_x + 40, turn_y, 25, 25)
-        pygame.draw.circle(screen, turn_color, turn_indicator_rect.center, pulse_size)
-        pygame.draw.circle(screen, LIGHT_GRAY, turn_indicator_rect.center, pulse_size, 1)
+        draw_turn_indicator(screen, sidebar_x, turn_color)
 
-        turn_text = header_font.render(f"Turn: {game.turn.capitalize()}", True, WHITE)
+        turn_text = render_text(header_font, f"Turn: {game.turn.capitalize()}", WHITE)
         screen.blit(turn_text, (sidebar_x + 95, turn_y + 2))
 
     # Draw status with styled box
@@ -229,13 +284,13 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
     pygame.draw.rect(screen, LIGHT_GRAY, status_rect, 1, border_radius=5)
 
     # Draw status text
-    status_text = font.render(f"Status: {status_display}", True, status_text_color)
+    status_text = render_text(font, f"Status: {status_display}", status_text_color)
     status_text_rect = status_text.get_rect(center=status_rect.center)
     screen.blit(status_text, status_text_rect)
 
     # Draw game log section
     log_section_y = 250
-    log_header = header_font.render("Game Log", True, GOLD)
+    log_header = render_text(header_font, "Game Log", GOLD)
     log_header_rect = log_header.get_rect(center=(sidebar_x + sidebar_width // 2, log_section_y))
     screen.blit(log_header, log_header_rect)
 
@@ -254,17 +309,8 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
         # Handle long messages with word wrapping
         available_width = sidebar_width - 60
 
-        # Render the full message with sender
-        message_text = font.render(f"{sender}: {text}", True, LIGHT_GRAY)
-
-        # If message is too long, truncate with ellipsis
-        if message_text.get_width() > available_width:
-            # Try different lengths until it fits
-            for length in range(len(text), 0, -1):
-                test_text = font.render(f"{sender}: {text[:length]}...", True, LIGHT_GRAY)
-                if test_text.get_width() <= available_width:
-                    message_text = test_text
-                    break
+        # Render the message with sender, truncated with an ellipsis if too long
+        message_text = render_text(font, truncate_text(font, f"{sender}: {text}", available_width), LIGHT_GRAY)
 
         message_rect = message_text.get_rect(x=sidebar_x + 30, y=y_offset)
         screen.blit(message_text, message_rect)
@@ -280,10 +326,14 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
     elif game.status != "in_progress":
         chat_disabled_reason = "Chat is disabled when\nthe game is over"
 
-    if not chat_disabled:
+    if explorer is not None:
+        draw_explorer_panel(screen, sidebar_x, log_section_y + 120, sidebar_width, window_height,
+                            explorer, header_font, small_font)
+
+    elif not chat_disabled:
         # Draw chat section
         chat_section_y = log_section_y + 120
-        chat_header = header_font.render("Chat", True, GOLD)
+        chat_header = render_text(header_font, "Chat", GOLD)
         chat_header_rect = chat_header.get_rect(center=(sidebar_x + sidebar_width // 2, chat_section_y))
         screen.blit(chat_header, chat_header_rect)
 
@@ -293,7 +343,7 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
         status_color = (50, 200, 50)  # Green for online
 
         # Draw "ONLINE" text
-        status_text = small_font.render("ONLINE", True, status_color)
+        status_text = render_text(small_font, "ONLINE", status_color)
         screen.blit(status_text, (status_x - status_text.get_width() - 5, status_y - 7))
 
         # Draw status dot
@@ -323,46 +373,26 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
                 sender_color = BLUE
 
             # Render sender name
-            sender_text = small_font.render(f"{sender}:", True, sender_color)
+            sender_text = render_text(small_font, f"{sender}:", sender_color)
 
             # Calculate available width for message text
             available_width = (sidebar_width - 60) - sender_text.get_width()
 
             # Handle long messages with word wrapping
-            words = text.split()
-            lines = []
-            current_line = ""
-
-            for word in words:
-                test_line = current_line + " " + word if current_line else word
-                test_text = small_font.render(test_line, True, LIGHT_GRAY)
-
-                if test_text.get_width() <= available_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = word
-
-            if current_line:
-                lines.append(current_line)
-
-            # If no lines were created (rare case), add the text as is
-            if not lines:
-                lines = [text]
+            lines = wrap_text(small_font, text, available_width)
 
             # Render the sender name
             screen.blit(sender_text, (sidebar_x + 30, y_offset))
 
             # Render first line next to sender
             if lines:
-                first_line_text = small_font.render(lines[0], True, LIGHT_GRAY)
+                first_line_text = render_text(small_font, lines[0], LIGHT_GRAY)
                 screen.blit(first_line_text, (sidebar_x + 30 + sender_text.get_width() + 5, y_offset))
                 y_offset += 20
 
                 # Render additional lines with proper indentation
                 for i in range(1, len(lines)):
-                    line_text = small_font.render(lines[i], True, LIGHT_GRAY)
+                    line_text = render_text(small_font, lines[i], LIGHT_GRAY)
                     screen.blit(line_text, (sidebar_x + 30 + sender_text.get_width() + 5, y_offset))
                     y_offset += 20
             else:
@@ -381,7 +411,7 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
 
         # Draw input text or placeholder
         if chat_input:
-            input_text = font.render(chat_input, True, BLACK)
+            input_text = render_text(font, chat_input, BLACK)
             input_rect = input_text.get_rect(x=sidebar_x + 30, centery=window_height - 30)
             screen.blit(input_text, input_rect)
 
@@ -391,7 +421,7 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
                 pygame.draw.line(screen, BLACK, (cursor_x, window_height - 45),
                             (cursor_x, window_height - 15), 2)
         else:
-            placeholder_text = small_font.render("Type your message here...", True, GRAY)
+            placeholder_text = render_text(small_font, "Type your message here...", GRAY)
             placeholder_rect = placeholder_text.get_rect(x=sidebar_x + 30, centery=window_height - 30)
             screen.blit(placeholder_text, placeholder_rect)
 
@@ -406,10 +436,86 @@ def draw_enhanced_sidebar(screen, sidebar_x, sidebar_width, window_height, game,
         reason_lines = chat_disabled_reason.split('\n')
 
         for i, line in enumerate(reason_lines):
-            info_text = header_font.render(line, True, LIGHT_GRAY)
+            info_text = render_text(header_font, line, LIGHT_GRAY)
             info_rect = info_text.get_rect(center=(sidebar_x + sidebar_width // 2, info_y + i * 30))
             screen.blit(info_text, info_rect)
 
+def draw_explorer_panel(screen, sidebar_x, section_y, sidebar_width, window_height,
+                        explorer, header_font, small_font):
+    """Draw the opening explorer's most played moves with their results"""
+    header = render_text(header_font, "Opening Explorer", GOLD)
+    header_rect = header.get_rect(center=(sidebar_x + sidebar_width // 2, section_y))
+    screen.blit(header, header_rect)
+
+    panel_rect = pygame.Rect(sidebar_x + 20, section_y + 25,
+                             sidebar_width - 40, window_height - section_y - 55)
+    pygame.draw.rect(screen, (20, 20, 30), panel_rect, border_radius=5)
+    pygame.draw.rect(screen, GRAY, panel_rect, 1, border_radius=5)
+
+    moves = explorer.get('moves')
+    y_offset = section_y + 35
+    if moves is None:
+        info = render_text(small_font, "Loading...", LIGHT_GRAY)
+        screen.blit(info, (sidebar_x + 30, y_offset))
+    elif not moves:
+        info = render_text(small_font, "No games from this position yet", LIGHT_GRAY)
+        screen.blit(info, (sidebar_x + 30, y_offset))
+
+    # One row per move: SAN, game count and a white/draw/black result bar
+    bar_x = sidebar_x + 130
+    bar_width = sidebar_width - 160
+    for stats in moves or []:
+        if y_offset + 20 > panel_rect.bottom:
+            break
+        screen.blit(render_text(small_font, stats['san'], WHITE), (sidebar_x + 30, y_offset))
+        screen.blit(render_text(small_font, str(stats['games']), LIGHT_GRAY), (sidebar_x + 85, y_offset))
+
+        x = bar_x
+        for count, color in ((stats['white_wins'], LIGHT_GRAY), (stats['draws'], GRAY),
+                             (stats['black_wins'], DARK_GRAY)):
+            width = round(bar_width * count / stats['games'])
+            pygame.draw.rect(screen, color, (x, y_offset + 3, width, 12))
+            x += width
+        pygame.draw.rect(screen, GRAY, (bar_x, y_offset + 3, bar_width, 12), 1)
+        y_offset += 20
+
+    hint = render_text(small_font, "Tab: back to chat", GRAY)
+    screen.blit(hint, hint.get_rect(center=(sidebar_x + sidebar_width // 2, window_height - 18)))
+
+marker_surfaces = {}  # (marker, square_size) -> surface shared by every frame
+
+def marker_surface(marker, square_size):
+    """Surface of a 'selected', 'capture' or 'move' marker, drawn once per square size
+
+    Markers pulse by changing the surface's alpha, so animating them never
+    allocates a surface.
+    """
+    key = (marker, square_size)
+    surface = marker_surfaces.get(key)
+    if surface is not None:
+        return surface
+
+    display = pygame.display.get_surface()
+    if marker == 'move':
+        # A dot, with per-pixel alpha for its round edge
+        move_radius = square_size // 4
+        surface = pygame.Surface((move_radius*2, move_radius*2), pygame.SRCALPHA)
+        pygame.draw.circle(surface, GREEN, (move_radius, move_radius), move_radius)
+        if display:
+            surface = surface.convert_alpha()
+    else:
+        # A whole square, faded with the surface alpha only
+        surface = pygame.Surface((square_size, square_size))
+        if display:
+            surface = surface.convert()
+        if marker == 'capture':
+            surface.fill(RED)
+            surface.set_alpha(120)  # Semi-transparent red
+        else:
+            surface.fill((255, 255, 0))  # Yellow
+    marker_surfaces[key] = surface
+    return surface
+
 def draw_enhanced_highlight(screen, pos, board_x, board_y, square_size, valid_moves=None, board=None):
     """Draw an enhanced highlight for selected pieces and valid moves"""
     row, col = pos
@@ -420,12 +526,9 @@ def draw_enhanced_highlight(screen, pos, board_x, board_y, square_size, valid_mo
     current_time = pygame.time.get_ticks() / 1000
     alpha = int(150 + 50 * math.sin(current_time * 4))  # Pulsing transparency
 
-    # Create highlight surface with transparency
-    highlight_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-    highlight_color = (255, 255, 0, alpha)  # Yellow with pulsing alpha
-    highlight_surface.fill(highlight_color)
-
     # Draw highlight for selected piece
+    highlight_surface = marker_surface('selected', square_size)
+    highlight_surface.set_alpha(alpha)
     screen.blit(highlight_surface, (x, y))
 
     # Draw corner indicators
@@ -453,6 +556,12 @@ def draw_enhanced_highlight(screen, pos, board_x, board_y, square_size, valid_mo
 
     # Draw valid moves if provided
     if valid_moves:
+        # Every move dot pulses together, so they share one alpha
+        capture_surface = marker_surface('capture', square_size)
+        move_surface = marker_surface('move', square_size)
+        move_surface.set_alpha(int(100 + 50 * math.sin(current_time * 4)))  # Pulsing transparency
+        move_radius = square_size // 4
+
         for move_row, move_col in valid_moves:
             move_x = board_x + move_col * square_size
             move_y = board_y + move_row * square_size
@@ -464,26 +573,14 @@ def draw_enhanced_highlight(screen, pos, board_x, board_y, square_size, valid_mo
 
             # Draw different indicators for empty squares vs. captures
             if is_capture:
-                # Draw a capture indicator (red circle)
-                capture_surface = pygame.Surface((square_size, square_size), pygame.SRCALPHA)
-                capture_color = (220, 60, 60, 120)  # Semi-transparent red
-                pygame.draw.rect(capture_surface, capture_color, (0, 0, square_size, square_size))
+                # Draw a capture indicator (red square)
                 screen.blit(capture_surface, (move_x, move_y))
 
                 # Draw a border
                 pygame.draw.rect(screen, (220, 60, 60),
                                (move_x, move_y, square_size, square_size), 2)
             else:
-                # Draw a move indicator (green circle)
-                move_radius = square_size // 4
-                move_alpha = int(100 + 50 * math.sin(current_time * 4))  # Pulsing transparency
-                move_color = (60, 200, 60, move_alpha)  # Semi-transparent green
-
-                # Create a surface for the move indicator
-                move_surface = pygame.Surface((move_radius*2, move_radius*2), pygame.SRCALPHA)
-                pygame.draw.circle(move_surface, move_color, (move_radius, move_radius), move_radius)
-
-                # Blit to the center of the square
+                # Draw a move indicator (green circle), centered in the square
                 screen.blit(move_surface, (
                     move_x + square_size//2 - move_radius,
                     move_y + square_size//2 - move_radius
@@ -531,7 +628,7 @@ def draw_enhanced_button(screen, rect, text, font, is_hovered=False):
 
     # Draw text - slightly larger when hovered
     text_size = 1.05 if is_hovered else 1.0
-    text_surf = font.render(text, True, text_color)
+    text_surf = render_text(font, text, text_color)
     if is_hovered:
         # Scale text slightly larger when hovered
         original_size = text_surf.get_size()
@@ -0,0 +1,904 @@
+"""
+Chess Rules Module
+Contains the chess game state and move validation shared by the client, server and bot
+"""
+import random
+import time
+import uuid
+
+# Board dimensions
+BOARD_SIZE = 8
+
+# FEN letters for each piece type (upper case is white)
+FEN_PIECES = {
+    'pawn': 'p',
+    'knight': 'n',
+    'bishop': 'b',
+    'rook': 'r',
+    'queen': 'q',
+    'king': 'k'
+}
+FEN_TYPES = {letter: piece_type for piece_type, letter in FEN_PIECES.items()}
+
+# Standard starting position
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Castling rights and the en-passant file are packed into one int (ChessGame.flags)
+# so they are cheap to copy, hash, serialize and restore on undo:
+# bits 0-3 hold the castling rights, bits 4-7 hold the en-passant file + 1 (0 = none)
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+ALL_CASTLING = 15
+CASTLING_MASK = 0x0F
+EN_PASSANT_SHIFT = 4
+CASTLING_LETTERS = (('K', WHITE_KINGSIDE), ('Q', WHITE_QUEENSIDE),
+                    ('k', BLACK_KINGSIDE), ('q', BLACK_QUEENSIDE))
+
+# Castling rights lost when a piece moves from or to one of these squares
+CASTLING_SQUARES = {
+    (7, 4): WHITE_KINGSIDE | WHITE_QUEENSIDE,
+    (7, 7): WHITE_KINGSIDE,
+    (7, 0): WHITE_QUEENSIDE,
+    (0, 4): BLACK_KINGSIDE | BLACK_QUEENSIDE,
+    (0, 7): BLACK_KINGSIDE,
+    (0, 0): BLACK_QUEENSIDE
+}
+
+# Pieces a pawn can promote to, best first
+PROMOTION_TYPES = ('queen', 'rook', 'bishop', 'knight')
+PROMOTION_LETTERS = {'q': 'queen', 'r': 'rook', 'b': 'bishop', 'n': 'knight'}  # Coordinate notation suffixes
+
+# Draw rules
+FIFTY_MOVE_PLIES = 100     # Halfmoves without a capture or pawn move before the game is drawn
+REPETITION_LIMIT = 3       # Occurrences of the same position that draw the game
+
+# Game log text for each kind of draw
+DRAW_MESSAGES = {
+    'draw_repetition': "Threefold repetition!",
+    'draw_fifty_moves': "Fifty moves without a capture or pawn move!",
+    'draw_insufficient_material': "Insufficient material to checkmate!"
+}
+
+# Zobrist keys for position hashing. The seed is fixed so hashes match across
+# processes and runs: one key per piece per square, one per flags value and one
+# for black to move. A move updates the hash by XOR-ing only what changed.
+_zobrist_rng = random.Random(0x5A0B)
+ZOBRIST_PIECES = {
+    (piece_type, color): [_zobrist_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+    for piece_type in FEN_PIECES for color in ('white', 'black')
+}
+ZOBRIST_FLAGS = [_zobrist_rng.getrandbits(64) for _ in range(256)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_rng.getrandbits(64)
+
+
+def square_name(pos):
+    """Algebraic name of a (row, col) square, e.g. (6, 4) -> 'e2'"""
+    row, col = pos
+    return f"{'abcdefgh'[col]}{BOARD_SIZE - row}"
+
+
+def describe_move(from_pos, to_pos, undo, board):
+    """Game log text for a move just played, given push_move's undo state"""
+    piece, captured = undo[0], undo[1]
+    (from_row, from_col), (to_row, to_col) = from_pos, to_pos
+
+    if piece['type'] == 'king' and abs(to_col - from_col) == 2:
+        side = "kingside" if to_col == 6 else "queenside"
+        return f"{piece['color']} castled {side}"
+
+    text = f"{piece['color']} {piece['type']} moved from ({from_row},{from_col}) to ({to_row},{to_col})"
+    if captured:
+        text += f", capturing {captured['color']} {captured['type']}"
+        if undo[2] != (to_row, to_col):
+            text += " en passant"
+    promoted = board[to_row][to_col]
+    if promoted['type'] != piece['type']:
+        text += f", promoting to {promoted['type']}"
+    return text
+
+
+def piece_key(piece, row, col):
+    """Zobrist key for a piece on a square"""
+    return ZOBRIST_PIECES[piece['type'], piece['color']][row * BOARD_SIZE + col]
+
+
+def parse_square(name):
+    """(row, col) of an algebraic square name, e.g. 'e2' -> (6, 4)"""
+    return (BOARD_SIZE - int(name[1]), 'abcdefgh'.index(name[0]))
+
+
+def move_name(move):
+    """Coordinate notation for a move, e.g. 'e2e4' or 'e7e8q'"""
+    name = square_name(move[0]) + square_name(move[1])
+    if len(move) > 2 and move[2]:
+        name += FEN_PIECES[move[2]]
+    return name
+
+
+def parse_move(name):
+    """Move tuple from coordinate notation, e.g. 'e7e8q' -> ((1, 4), (0, 4), 'queen')"""
+    from_pos, to_pos = parse_square(name[0:2]), parse_square(name[2:4])
+    if len(name) > 4:
+        return (from_pos, to_pos, PROMOTION_LETTERS[name[4]])
+    return (from_pos, to_pos)
+
+
+# Game state
+class ChessGame:
+    def __init__(self, game_id=None, player_name=None):
+        self.game_id = game_id if game_id else str(uuid.uuid4())
+        self.board = self.create_initial_board()
+        self.selected_piece = None
+        self.valid_moves = []  # Store valid moves for the selected piece
+        self.turn = 'white'
+        self.flags = ALL_CASTLING  # Castling rights and en-passant file, see above
+        self.status = 'in_progress'
+        self.messages = []
+        self.chat_messages = []
+        self.last_update = time.time()
+        self.white_player_name = player_name if player_name else "White Player"
+        self.black_player_name = "Waiting for opponent..."
+        self.version = 0  # Bumped whenever the position changes, so redraws and searches can tell
+        self.reset_history()
+        self.add_message("System", "Welcome to Chess!")
+        self.add_chat("System", "Chat enabled. Type messages below to communicate with your opponent.")
+
+    def reset_game(self):
+        """Reset the game to initial state"""
+        self.board = self.create_initial_board()
+        self.selected_piece = None
+        self.valid_moves = []
+        self.turn = 'white'
+        self.flags = ALL_CASTLING
+        self.status = 'in_progress'
+        self.last_update = time.time()
+        self.version += 1
+        self.reset_history()
+        self.add_message("System", "Game has been reset!")
+        self.add_chat("System", "New game started! Chat is enabled for this game.")
+
+    def reset_history(self, halfmove_clock=0, position_history=None):
+        """Recompute the position hash and start the draw-rule history from here
+
+        position_history holds the hashes since the last capture or pawn move;
+        earlier positions can never repeat, so nothing older is kept.
+        """
+        self.hash = self.compute_hash()
+        self.halfmove_clock = halfmove_clock
+        self.position_history = list(position_history) if position_history else [self.hash]
+        self.position_counts = {}
+        for position in self.position_history:
+            self.position_counts[position] = self.position_counts.get(position, 0) + 1
+
+    def compute_hash(self):
+        """Zobrist hash of the position from scratch"""
+        position_hash = ZOBRIST_FLAGS[self.flags]
+        if self.turn == 'black':
+            position_hash ^= ZOBRIST_BLACK_TO_MOVE
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = self.board[row][col]
+                if piece:
+                    position_hash ^= piece_key(piece, row, col)
+        return position_hash
+
+    def clean_expired_messages(self):
+        """Remove chat messages that have expired"""
+        # Removed disappearing message expiration functionality
+        pass
+
+    def set_black_player(self, player_name):
+        """Set the black player name when they join"""
+        self.black_player_name = player_name
+        self.add_message("System", f"{player_name} has joined as Black!")
+        self.add_chat("System", f"{player_name} has joined the game.")
+
+    def create_initial_board(self):
+        """Create the initial chess board"""
+        board = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+
+        # Set up pawns
+        for col in range(BOARD_SIZE):
+            board[1][col] = {'type': 'pawn', 'color': 'black'}
+            board[6][col] = {'type': 'pawn', 'color': 'white'}
+
+        # Set up other pieces for black
+        board[0][0] = {'type': 'rook', 'color': 'black'}
+        board[0][1] = {'type': 'knight', 'color': 'black'}
+        board[0][2] = {'type': 'bishop', 'color': 'black'}
+        board[0][3] = {'type': 'queen', 'color': 'black'}
+        board[0][4] = {'type': 'king', 'color': 'black'}
+        board[0][5] = {'type': 'bishop', 'color': 'black'}
+        board[0][6] = {'type': 'knight', 'color': 'black'}
+        board[0][7] = {'type': 'rook', 'color': 'black'}
+
+        # Set up other pieces for white
+        board[7][0] = {'type': 'rook', 'color': 'white'}
+        board[7][1] = {'type': 'knight', 'color': 'white'}
+        board[7][2] = {'type': 'bishop', 'color': 'white'}
+        board[7][3] = {'type': 'queen', 'color': 'white'}
+        board[7][4] = {'type': 'king', 'color': 'white'}
+        board[7][5] = {'type': 'bishop', 'color': 'white'}
+        board[7][6] = {'type': 'knight', 'color': 'white'}
+        board[7][7] = {'type': 'rook', 'color': 'white'}
+
+        return board
+
+    def add_message(self, sender, text):
+        """Add a message to the game log"""
+        self.messages.append({'sender': sender, 'text': text})
+        if len(self.messages) > 10:
+            self.messages.pop(0)
+
+    def add_chat(self, sender, text):
+        """Add a message to the chat
+
+        Args:
+            sender: Name of the message sender
+            text: Content of the message
+        """
+        self.chat_messages.append({
+            'sender': sender,
+            'text': text,
+            'time': time.time()
+        })
+        if len(self.chat_messages) > 20:
+            self.chat_messages.pop(0)
+
+    def get_valid_moves(self, pos):
+        """Get all valid moves for a piece at the given position"""
+        row, col = pos
+        piece = self.board[row][col]
+
+        if not piece:
+            return []
+
+        valid_moves = []
+        piece_type = piece['type']
+        color = piece['color']
+
+        # Pawn movement
+        if piece_type == 'pawn':
+            # Direction depends on color
+            direction = -1 if color == 'white' else 1
+
+            # Forward move (1 square)
+            new_row = row + direction
+            if 0 <= new_row < BOARD_SIZE and not self.board[new_row][col]:
+                valid_moves.append((new_row, col))
+
+                # Initial two-square move
+                if (color == 'white' and row == 6) or (color == 'black' and row == 1):
+                    new_row = row + 2 * direction
+                    if 0 <= new_row < BOARD_SIZE and not self.board[new_row][col] and not self.board[row + direction][col]:
+                        valid_moves.append((new_row, col))
+
+            # Diagonal captures
+            for offset in [-1, 1]:
+                new_col = col + offset
+                new_row = row + direction
+                if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
+                    target = self.board[new_row][new_col]
+                    if target and target['color'] != color:
+                        valid_moves.append((new_row, new_col))
+
+            # En passant capture of a pawn that just moved two squares
+            en_passant_file = (self.flags >> EN_PASSANT_SHIFT) - 1
+            if (en_passant_file >= 0 and color == self.turn and abs(col - en_passant_file) == 1 and
+                    row == (3 if color == 'white' else 4)):
+                valid_moves.append((row + direction, en_passant_file))
+
+        # Rook movement (horizontal and vertical)
+        elif piece_type == 'rook':
+            # Check in all four directions (up, right, down, left)
+            directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+            for dr, dc in directions:
+                for i in range(1, BOARD_SIZE):
+                    new_row, new_col = row + i * dr, col + i * dc
+
+                    # Check if position is on the board
+                    if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
+                        break
+
+                    target = self.board[new_row][new_col]
+                    if not target:
+                        valid_moves.append((new_row, new_col))
+                    elif target['color'] != color:
+                        valid_moves.append((new_row, new_col))
+                        break
+                    else:
+                        break
+
+        # Knight movement (L-shape)
+        elif piece_type == 'knight':
+            knight_moves = [
+                (-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                (1, -2), (1, 2), (2, -1), (2, 1)
+            ]
+
+            for dr, dc in knight_moves:
+                new_row, new_col = row + dr, col + dc
+
+                # Check if position is on the board
+                if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
+                    continue
+
+                target = self.board[new_row][new_col]
+                if not target or target['color'] != color:
+                    valid_moves.append((new_row, new_col))
+
+        # Bishop movement (diagonal)
+        elif piece_type == 'bishop':
+            # Check in all four diagonal directions
+            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+            for dr, dc in directions:
+                for i in range(1, BOARD_SIZE):
+                    new_row, new_col = row + i * dr, col + i * dc
+
+                    # Check if position is on the board
+                    if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
+                        break
+
+                    target = self.board[new_row][new_col]
+                    if not target:
+                        valid_moves.append((new_row, new_col))
+                    elif target['color'] != color:
+                        valid_moves.append((new_row, new_col))
+                        break
+                    else:
+                        break
+
+        # Queen movement (combination of rook and bishop)
+        elif piece_type == 'queen':
+            # Check in all eight directions
+            directions = [
+                (-1, 0), (0, 1), (1, 0), (0, -1),  # Horizontal and vertical
+                (-1, -1), (-1, 1), (1, -1), (1, 1)  # Diagonal
+            ]
+
+            for dr, dc in directions:
+                for i in range(1, BOARD_SIZE):
+                    new_row, new_col = row + i * dr, col + i * dc
+
+                    # Check if position is on the board
+                    if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
+                        break
+
+                    target = self.board[new_row][new_col]
+                    if not target:
+                        valid_moves.append((new_row, new_col))
+                    elif target['color'] != color:
+                        valid_moves.append((new_row, new_col))
+                        break
+                    else:
+                        break
+
+        # King movement (one square in any direction)
+        elif piece_type == 'king':
+            # Check all eight surrounding squares
+            directions = [
+                (-1, -1), (-1, 0), (-1, 1),
+                (0, -1),           (0, 1),
+                (1, -1),  (1, 0),  (1, 1)
+            ]
+
+            for dr, dc in directions:
+                new_row, new_col = row + dr, col + dc
+
+                # Check if position is on the board
+                if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
+                    continue
+
+                target = self.board[new_row][new_col]
+                if not target or target['color'] != color:
+                    valid_moves.append((new_row, new_col))
+
+            # Castling: king and rook unmoved, squares between empty, and the
+            # king doesn't start in, pass through or land in check
+            home_row = 7 if color == 'white' else 0
+            if color == 'white':
+                kingside, queenside = WHITE_KINGSIDE, WHITE_QUEENSIDE
+            else:
+                kingside, queenside = BLACK_KINGSIDE, BLACK_QUEENSIDE
+            if (row, col) == (home_row, 4) and self.flags & (kingside | queenside):
+                opponent = 'black' if color == 'white' else 'white'
+                if not self.is_square_under_attack((row, col), opponent):
+                    if (self.flags & kingside and self._is_rook(home_row, 7, color) and
+                            not self.board[row][5] and not self.board[row][6] and
+                            not self.is_square_under_attack((row, 5), opponent) and
+                            not self.is_square_under_attack((row, 6), opponent)):
+                        valid_moves.append((row, 6))
+                    if (self.flags & queenside and self._is_rook(home_row, 0, color) and
+                            not self.board[row][1] and not self.board[row][2] and not self.board[row][3] and
+                            not self.is_square_under_attack((row, 3), opponent) and
+                            not self.is_square_under_attack((row, 2), opponent)):
+                        valid_moves.append((row, 2))
+
+        return valid_moves
+
+    def _is_rook(self, row, col, color):
+        """Whether the square holds a rook of the given color"""
+        piece = self.board[row][col]
+        return piece is not None and piece['type'] == 'rook' and piece['color'] == color
+
+    def is_valid_move(self, from_pos, to_pos, player_color):
+        """Check if a move is valid"""
+        from_row, from_col = from_pos
+        to_row, to_col = to_pos
+
+        # Check if positions are on the board
+        if not (0 <= from_row < BOARD_SIZE and 0 <= from_col < BOARD_SIZE and
+                0 <= to_row < BOARD_SIZE and 0 <= to_col < BOARD_SIZE):
+            return False
+
+        # Check if there's a piece at the from position
+        piece = self.board[from_row][from_col]
+        if not piece:
+            return False
+
+        # Check if it's the piece's turn and color
+        if piece['color'] != self.turn or piece['color'] != player_color:
+            return False
+
+        # Check if the destination has a piece of the same color
+        dest_piece = self.board[to_row][to_col]
+        if dest_piece and dest_piece['color'] == piece['color']:
+            return False
+
+        # Get valid moves for the piece and check if the destination is among them
+        valid_moves = self.get_valid_moves(from_pos)
+        return (to_row, to_col) in valid_moves
+
+    def find_king(self, color):
+        """Find the position of the king of the given color"""
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = self.board[row][col]
+                if piece and piece['type'] == 'king' and piece['color'] == color:
+                    return (row, col)
+        return None  # Should never happen in a valid chess game
+
+    def is_square_under_attack(self, pos, attacking_color):
+        """Check if a square is under attack by any piece of the given color"""
+        row, col = pos
+
+        # Check attacks from pawns
+        pawn_direction = 1 if attacking_color == 'white' else -1
+        for offset in [-1, 1]:
+            attack_row = row + pawn_direction
+            attack_col = col + offset
+            if 0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE:
+                piece = self.board[attack_row][attack_col]
+                if piece and piece['type'] == 'pawn' and piece['color'] == attacking_color:
+                    return True
+
+        # Check attacks from knights
+        knight_moves = [
+            (-2, -1), (-2, 1), (-1, -2), (-1, 2),
+            (1, -2), (1, 2), (2, -1), (2, 1)
+        ]
+        for dr, dc in knight_moves:
+            attack_row, attack_col = row + dr, col + dc
+            if 0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE:
+                piece = self.board[attack_row][attack_col]
+                if piece and piece['type'] == 'knight' and piece['color'] == attacking_color:
+                    return True
+
+        # Check attacks from kings (for adjacent squares)
+        king_moves = [
+            (-1, -1), (-1, 0), (-1, 1),
+            (0, -1),           (0, 1),
+            (1, -1),  (1, 0),  (1, 1)
+        ]
+        for dr, dc in king_moves:
+            attack_row, attack_col = row + dr, col + dc
+            if 0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE:
+                piece = self.board[attack_row][attack_col]
+                if piece and piece['type'] == 'king' and piece['color'] == attacking_color:
+                    return True
+
+        # Check attacks from rooks, bishops, and queens (along lines)
+        # Rook directions (horizontal and vertical)
+        rook_directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+        # Bishop directions (diagonal)
+        bishop_directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+        # Check all directions
+        for dr, dc in rook_directions + bishop_directions:
+            for i in range(1, BOARD_SIZE):
+                attack_row, attack_col = row + i * dr, col + i * dc
+
+                # Check if position is on the board
+                if not (0 <= attack_row < BOARD_SIZE and 0 <= attack_col < BOARD_SIZE):
+                    break
+
+                piece = self.board[attack_row][attack_col]
+                if piece:
+                    if piece['color'] == attacking_color:
+                        # Check if this piece can attack along this direction
+                        can_attack = False
+                        if piece['type'] == 'queen':
+                            can_attack = True
+                        elif piece['type'] == 'rook' and (dr, dc) in rook_directions:
+                            can_attack = True
+                        elif piece['type'] == 'bishop' and (dr, dc) in bishop_directions:
+                            can_attack = True
+
+                        if can_attack:
+                            return True
+                    # If we hit any piece (even our own), we can't go further in this direction
+                    break
+
+        return False
+
+    def is_in_check(self, color):
+        """Check if the king of the given color is in check"""
+        king_pos = self.find_king(color)
+        if not king_pos:
+            return False  # Should never happen
+
+        # The opposing color
+        opposing_color = 'black' if color == 'white' else 'white'
+
+        # Check if the king's position is under attack
+        return self.is_square_under_attack(king_pos, opposing_color)
+
+    def would_move_cause_check(self, from_pos, to_pos, color):
+        """Check if making a move would put or leave the king in check"""
+        # Make the move temporarily
+        move = (from_pos, to_pos)
+        undo = self.push_move(move)
+
+        # Check if the king is in check after the move
+        in_check = self.is_in_check(color)
+
+        # Restore the board
+        self.pop_move(move, undo)
+
+        return in_check
+
+    def push_move(self, move):
+        """Play a move without validating it and return the state pop_move needs to undo it
+
+        A move is (from_pos, to_pos) or (from_pos, to_pos, promotion_type);
+        pawns reaching the last rank promote to a queen unless told otherwise.
+        """
+        (from_row, from_col), (to_row, to_col) = move[0], move[1]
+        board = self.board
+        piece = board[from_row][from_col]
+        captured = board[to_row][to_col]
+        captured_pos = (to_row, to_col)
+        moved = piece
+        flags = self.flags & CASTLING_MASK
+        position_hash = self.hash ^ ZOBRIST_BLACK_TO_MOVE ^ piece_key(piece, from_row, from_col)
+
+        if piece['type'] == 'pawn':
+            if from_col != to_col and not captured:
+                # En passant takes the pawn beside the moving one
+                captured_pos = (from_row, to_col)
+                captured = board[from_row][to_col]
+                board[from_row][to_col] = None
+            elif abs(to_row - from_row) == 2:
+                # Only record the en-passant file when a capture is possible,
+                # so otherwise identical positions hash the same
+                for col in (from_col - 1, from_col + 1):
+                    if 0 <= col < BOARD_SIZE:
+                        neighbour = board[to_row][col]
+                        if neighbour and neighbour['type'] == 'pawn' and neighbour['color'] != piece['color']:
+                            flags |= (from_col + 1) << EN_PASSANT_SHIFT
+                            break
+            if to_row == 0 or to_row == BOARD_SIZE - 1:
+                moved = {'type': move[2] if len(move) > 2 else 'queen', 'color': piece['color']}
+
+        elif piece['type'] == 'king' and abs(to_col - from_col) == 2:
+            # Castling also moves the rook
+            rook_from, rook_to = (7, 5) if to_col == 6 else (0, 3)
+            rook = board[from_row][rook_from]
+            board[from_row][rook_to] = rook
+            board[from_row][rook_from] = None
+            position_hash ^= piece_key(rook, from_row, rook_from) ^ piece_key(rook, from_row, rook_to)
+
+        undo = (piece, captured, captured_pos, self.flags, self.turn, self.hash, self.halfmove_clock)
+        if captured:
+            position_hash ^= piece_key(captured, captured_pos[0], captured_pos[1])
+        board[to_row][to_col] = moved
+        board[from_row][from_col] = None
+        position_hash ^= piece_key(moved, to_row, to_col)
+
+        # Moving a king or rook, or capturing a rook, loses castling rights
+        flags &= ~(CASTLING_SQUARES.get((from_row, from_col), 0) | CASTLING_SQUARES.get((to_row, to_col), 0))
+        self.hash = position_hash ^ ZOBRIST_FLAGS[self.flags] ^ ZOBRIST_FLAGS[flags]
+        self.flags = flags
+        self.turn = 'black' if piece['color'] == 'white' else 'white'
+
+        # Captures and pawn moves reset the fifty-move count
+        self.halfmove_clock = 0 if captured or piece['type'] == 'pawn' else self.halfmove_clock + 1
+        return undo
+
+    def pop_move(self, move, undo):
+        """Take back a move made with push_move"""
+        (from_row, from_col), (to_row, to_col) = move[0], move[1]
+        piece, captured, captured_pos, flags, turn, position_hash, halfmove_clock = undo
+        board = self.board
+
+        board[from_row][from_col] = piece
+        board[to_row][to_col] = None
+        board[captured_pos[0]][captured_pos[1]] = captured
+
+        if piece['type'] == 'king' and abs(to_col - from_col) == 2:
+            rook_from, rook_to = (7, 5) if to_col == 6 else (0, 3)
+            board[from_row][rook_from] = board[from_row][rook_to]
+            board[from_row][rook_to] = None
+
+        self.flags = flags
+        self.turn = turn
+        self.hash = position_hash
+        self.halfmove_clock = halfmove_clock
+
+    def record_position(self):
+        """Add the position after a game move to the repetition history"""
+        if self.halfmove_clock == 0:
+            # Nothing before a capture or pawn move can repeat
+            self.position_history = []
+            self.position_counts = {}
+        self.position_history.append(self.hash)
+        self.position_counts[self.hash] = self.position_counts.get(self.hash, 0) + 1
+
+    def draw_status(self, undo):
+        """Status for a draw by the move just played, or None
+
+        Repetition and the fifty-move rule are dictionary and counter lookups;
+        material only changes on captures and promotions, so it is only
+        rescanned after a capture or a pawn move.
+        """
+        if self.position_counts.get(self.hash, 0) >= REPETITION_LIMIT:
+            return 'draw_repetition'
+        if self.halfmove_clock >= FIFTY_MOVE_PLIES:
+            return 'draw_fifty_moves'
+        if (undo[1] or undo[0]['type'] == 'pawn') and self.has_insufficient_material():
+            return 'draw_insufficient_material'
+        return None
+
+    def has_insufficient_material(self):
+        """Whether neither side has enough material left to checkmate"""
+        minors = []
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = self.board[row][col]
+                if not piece or piece['type'] == 'king':
+                    continue
+                if piece['type'] not in ('knight', 'bishop'):
+                    return False
+                minors.append((piece['type'], (row + col) % 2))
+
+        # King against king, or a single knight or bishop
+        if len(minors) <= 1:
+            return True
+
+        # Only bishops, all on the same square color
+        return all(piece_type == 'bishop' for piece_type, _ in minors) and \
+            len(set(shade for _, shade in minors)) == 1
+
+    def get_all_valid_moves_for_color(self, color):
+        """Get all valid moves for all pieces of the given color"""
+        all_moves = []
+
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = self.board[row][col]
+                if piece and piece['color'] == color:
+                    from_pos = (row, col)
+                    # Get all potential moves for this piece
+                    potential_moves = self.get_valid_moves(from_pos)
+
+                    # Pawns reaching the last rank promote
+                    last_row = 0 if color == 'white' else BOARD_SIZE - 1
+                    promotes = piece['type'] == 'pawn' and row + (-1 if color == 'white' else 1) == last_row
+
+                    # Filter out moves that would leave the king in check
+                    for to_pos in potential_moves:
+                        if not self.would_move_cause_check(from_pos, to_pos, color):
+                            if promotes:
+                                all_moves.extend((from_pos, to_pos, promotion) for promotion in PROMOTION_TYPES)
+                            else:
+                                all_moves.append((from_pos, to_pos))
+
+        return all_moves
+
+    def is_checkmate(self, color):
+        """Check if the given color is in checkmate"""
+        # First, check if the king is in check
+        if not self.is_in_check(color):
+            return False
+
+        # If in check, see if there are any valid moves that can get out of check
+        return len(self.get_all_valid_moves_for_color(color)) == 0
+
+    def is_stalemate(self, color):
+        """Check if the given color is in stalemate"""
+        # First, check if the king is NOT in check
+        if self.is_in_check(color):
+            return False
+
+        # If not in check, see if there are any valid moves
+        return len(self.get_all_valid_moves_for_color(color)) == 0
+
+    def make_move(self, from_pos, to_pos, player_color, promotion=None):
+        """Make a move on the board (pawns promote to a queen unless promotion is given)"""
+        # No moves once the game has ended (checkmate, stalemate or a draw)
+        if self.status != 'in_progress':
+            return False
+
+        if not self.is_valid_move(from_pos, to_pos, player_color):
+            return False
+
+        # Check if this move would leave the king in check
+        if self.would_move_cause_check(from_pos, to_pos, player_color):
+            self.add_message("System", "Invalid move: would leave your king in check")
+            return False
+
+        if promotion not in PROMOTION_TYPES:
+            promotion = 'queen'
+
+        # Update the board and switch turns
+        undo = self.push_move((tuple(from_pos), tuple(to_pos), promotion))
+        self.record_position()
+        self.add_message("System", describe_move(from_pos, to_pos, undo, self.board))
+        next_color = self.turn
+
+        # Check for check, checkmate, or stalemate
+        if self.is_in_check(next_color):
+            if self.is_checkmate(next_color):
+                self.status = f"{player_color}_wins"
+                self.add_message("System", f"Checkmate! {player_color.capitalize()} wins!")
+                # Disable chat when game ends
+                self.add_chat("System", "Game has ended. Chat is now disabled.")
+            else:
+                self.add_message("System", f"{next_color.capitalize()} is in check!")
+        elif self.is_stalemate(next_color):
+            self.status = "stalemate"
+            self.add_message("System", "Stalemate! The game is a draw.")
+            # Disable chat when game ends
+            self.add_chat("System", "Game has ended. Chat is now disabled.")
+
+        # Draws by repetition, the fifty-move rule or insufficient material
+        if self.status == 'in_progress':
+            draw = self.draw_status(undo)
+            if draw:
+                self.status = draw
+                self.add_message("System", f"{DRAW_MESSAGES[draw]} The game is a draw.")
+                self.add_chat("System", "Game has ended. Chat is now disabled.")
+
+        # Update timestamp
+        self.last_update = time.time()
+        self.version += 1
+
+        return True
+
+    def load_fen(self, fen):
+        """Set up the board and side to move from a FEN string"""
+        fields = fen.split()
+        board = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        for row, rank in enumerate(fields[0].split('/')):
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                else:
+                    color = 'white' if char.isupper() else 'black'
+                    board[row][col] = {'type': FEN_TYPES[char.lower()], 'color': color}
+                    col += 1
+
+        self.board = board
+        self.turn = 'white' if len(fields) < 2 or fields[1] == 'w' else 'black'
+        self.version += 1
+        self.status = 'in_progress'
+
+        # Castling rights and en-passant square
+        flags = 0
+        castling = fields[2] if len(fields) > 2 else '-'
+        for letter, right in CASTLING_LETTERS:
+            if letter in castling:
+                flags |= right
+        if len(fields) > 3 and fields[3] != '-':
+            # Like push_move, keep the en-passant file only if a pawn can take
+            ep_file = parse_square(fields[3])[1]
+            pawn_row = 3 if self.turn == 'white' else 4
+            for col in (ep_file - 1, ep_file + 1):
+                piece = board[pawn_row][col] if 0 <= col < BOARD_SIZE else None
+                if piece and piece['type'] == 'pawn' and piece['color'] == self.turn:
+                    flags |= (ep_file + 1) << EN_PASSANT_SHIFT
+                    break
+        self.flags = flags
+        self.reset_history(int(fields[4]) if len(fields) > 4 else 0)
+
+    def to_fen(self):
+        """Describe the board and side to move as a FEN string"""
+        ranks = []
+        for row in range(BOARD_SIZE):
+            rank = ""
+            empty = 0
+            for col in range(BOARD_SIZE):
+                piece = self.board[row][col]
+                if not piece:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                letter = FEN_PIECES[piece['type']]
+                rank += letter.upper() if piece['color'] == 'white' else letter
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+
+        castling = ''.join(letter for letter, right in CASTLING_LETTERS if self.flags & right) or '-'
+        en_passant = '-'
+        en_passant_file = (self.flags >> EN_PASSANT_SHIFT) - 1
+        if en_passant_file >= 0:
+            en_passant = square_name((2 if self.turn == 'white' else 5, en_passant_file))
+
+        return f"{'/'.join(ranks)} {'w' if self.turn == 'white' else 'b'} {castling} {en_passant} {self.halfmove_clock} 1"
+
+    def castling_from_board(self):
+        """Castling rights implied by kings and rooks still on their starting squares"""
+        flags = 0
+        for color, row, kingside, queenside in (('white', 7, WHITE_KINGSIDE, WHITE_QUEENSIDE),
+                                                 ('black', 0, BLACK_KINGSIDE, BLACK_QUEENSIDE)):
+            king = self.board[row][4]
+            if not king or king['type'] != 'king' or king['color'] != color:
+                continue
+            if self._is_rook(row, 7, color):
+                flags |= kingside
+            if self._is_rook(row, 0, color):
+                flags |= queenside
+        return flags
+
+    def to_dict(self):
+        """Convert game state to dictionary"""
+        return {
+            'game_id': self.game_id,
+            'board': self.board,
+            'turn': self.turn,
+            'flags': self.flags,
+            'halfmove_clock': self.halfmove_clock,
+            'position_history': self.position_history,
+            'status': self.status,
+            'messages': self.messages,
+            'chat_messages': self.chat_messages,
+            'last_update': self.last_update,
+            'white_player_name': self.white_player_name,
+            'black_player_name': self.black_player_name
+        }
+
+    def from_dict(self, data):
+        """Update game state from dictionary"""
+        self.game_id = data.get('game_id', self.game_id)
+        self.status = data['status']
+        self.messages = data['messages']
+        self.last_update = data['last_update']
+
+        # Only replace the position and rebuild its history when it changed.
+        # The history ends with the position's hash, which covers the board,
+        # side to move and flags, so equal histories mean the same position;
+        # versions can't be compared, as every copy counts its own (states
+        # without a history always count as changed)
+        position_history = data.get('position_history')
+        if not position_history or position_history != self.position_history:
+            self.board = data['board']
+            self.turn = data['turn']
+            # Older saved states have no flags; assume unmoved kings and rooks can castle
+            self.flags = data.get('flags', self.castling_from_board())
+            self.reset_history(data.get('halfmove_clock', 0), position_history)
+            self.version += 1
+
+        # Handle player names
+        self.white_player_name = data.get('white_player_name', "White Player")
+        self.black_player_name = data.get('black_player_name', "Black Player")
+
+        # Handle chat messages (for backward compatibility)
+        if 'chat_messages' in data:
+            # Preserve existing chat messages if we're loading
+            self.chat_messages = data['chat_messages']
@@ -0,0 +1,107 @@
+"""
+Font Cache
+Process-wide cache of pygame fonts and rendered text shared by the lobby and game windows
+"""
+from collections import OrderedDict
+
+import pygame
+
+SCALED_FONT_STEP = 2     # Animated font sizes are rounded to a multiple of this
+TEXT_CACHE_SIZE = 512    # Rendered text surfaces kept, least recently used dropped first
+LAYOUT_CACHE_SIZE = 256  # Truncated and wrapped strings kept
+
+fonts = {}  # (name, size, bold, italic) -> font
+rendered_text = OrderedDict()  # (font, text, color, antialias) -> surface
+text_layouts = OrderedDict()   # ('truncate' or 'wrap', font, text, width) -> result
+
+
+def get_font(name, size, bold=False, italic=False, step=1):
+    """Font of a system family (pygame's default font if name is None), created once
+
+    Sizes are rounded to a multiple of step, so text whose size is animated
+    (pass step=SCALED_FONT_STEP) reuses a handful of fonts.
+    """
+    size = max(step, int(round(size / step)) * step)
+    key = (name, size, bold, italic)
+    font = fonts.get(key)
+    if font is None:
+        if name is None:
+            font = pygame.font.Font(None, size)
+            font.set_bold(bold)
+            font.set_italic(italic)
+        else:
+            font = pygame.font.SysFont(name, size, bold=bold, italic=italic)
+        fonts[key] = font
+    return font
+
+
+def _lru_get(cache, key):
+    """Cached value (marking it recently used), or None"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache, key, value, size):
+    """Add a value, dropping the least recently used ones past size"""
+    cache[key] = value
+    if len(cache) > size:
+        cache.popitem(last=False)
+    return value
+
+
+def render_text(font, text, color, antialias=True):
+    """font.render(text, antialias, color), reusing the surface while the text is unchanged
+
+    The surface is shared, so callers must not draw on it or change its alpha.
+    """
+    key = (font, text, tuple(color), antialias)
+    surface = _lru_get(rendered_text, key)
+    if surface is None:
+        surface = _lru_put(rendered_text, key, font.render(text, antialias, color), TEXT_CACHE_SIZE)
+    return surface
+
+
+def truncate_text(font, text, max_width, ellipsis="..."):
+    """Longest prefix of text that fits in max_width with the ellipsis, or text if it all fits"""
+    key = ('truncate', font, text, max_width, ellipsis)
+    result = _lru_get(text_layouts, key)
+    if result is not None:
+        return result
+
+    if font.size(text)[0] <= max_width:
+        result = text
+    else:
+        # Binary search on the prefix length, measuring instead of rendering
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if font.size(text[:middle] + ellipsis)[0] <= max_width:
+                low = middle
+            else:
+                high = middle - 1
+        result = text[:low] + ellipsis
+    return _lru_put(text_layouts, key, result, LAYOUT_CACHE_SIZE)
+
+
+def wrap_text(font, text, max_width):
+    """Lines of text word-wrapped to max_width (a word too long for a line gets its own)"""
+    key = ('wrap', font, text, max_width)
+    lines = _lru_get(text_layouts, key)
+    if lines is not None:
+        return lines
+
+    lines = []
+    current_line = ""
+    for word in text.split():
+        test_line = current_line + " " + word if current_line else word
+        if font.size(test_line)[0] <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return _lru_put(text_layouts, key, lines or [text], LAYOUT_CACHE_SIZE)
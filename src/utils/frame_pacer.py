@@ -0,0 +1,72 @@
+"""
+Frame Pacer
+Runs a window's loop at full rate while something is happening and slows it down when idle
+"""
+import time
+
+import pygame
+
+ACTIVE_FPS = 60         # Frame rate while there is input, network traffic or animation
+IDLE_FPS = 15           # Frame rate once nothing has happened for ACTIVE_GRACE seconds
+ACTIVE_GRACE = 1.0      # Seconds to stay at full rate after the last activity
+MAX_FRAME_TIME = 0.25   # Longest frame time reported, so animations don't jump after a stall
+
+# Posted from other threads (the network client) to wake an idle window at once
+WAKE_EVENT = pygame.event.custom_type()
+
+
+def wake(*args):
+    """Wake an idle window right away; usable as the chess client's message callback"""
+    pygame.event.post(pygame.event.Event(WAKE_EVENT))
+
+
+class FramePacer:
+    """Frame limiter that lets a window idle when it has nothing to do
+
+    Every event returned by events() counts as activity and keeps the loop
+    at the active frame rate for ACTIVE_GRACE seconds, as does
+    mark_active() or ticking with animating=True. Otherwise tick() waits
+    in pygame.event.wait, so the loop still wakes as soon as input or a
+    WAKE_EVENT arrives. Animations should advance by frame_time (seconds)
+    rather than a fixed step per frame.
+    """
+    def __init__(self, active_fps=ACTIVE_FPS, idle_fps=IDLE_FPS, grace=ACTIVE_GRACE):
+        self.clock = pygame.time.Clock()
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.grace = grace
+        self.last_activity = time.monotonic()
+        self.frame_time = 1 / active_fps
+        self.frame_start = time.monotonic()
+        self.pending = []  # Event that ended an idle wait, delivered before the rest of the queue
+
+    def mark_active(self):
+        """Run at the full frame rate for a while"""
+        self.last_activity = time.monotonic()
+
+    def is_active(self):
+        """Whether anything happened within the grace period"""
+        return time.monotonic() - self.last_activity < self.grace
+
+    def events(self):
+        """pygame.event.get() without wake events, marking the window active if there were any"""
+        events = self.pending + pygame.event.get()
+        self.pending = []
+        if events:
+            self.mark_active()
+        return [event for event in events if event.type != WAKE_EVENT]
+
+    def tick(self, animating=False):
+        """End a frame: cap it at the active rate, or wait for an event up to one idle frame"""
+        if animating or self.is_active():
+            elapsed = self.clock.tick(self.active_fps)
+        else:
+            remaining = 1 / self.idle_fps - (time.monotonic() - self.frame_start)
+            if remaining > 0:
+                event = pygame.event.wait(int(remaining * 1000))
+                if event.type != pygame.NOEVENT:
+                    self.pending.append(event)
+            elapsed = self.clock.tick()
+        self.frame_start = time.monotonic()
+        self.frame_time = min(elapsed / 1000, MAX_FRAME_TIME)
+        return elapsed
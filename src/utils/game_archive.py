@@ -0,0 +1,165 @@
+"""
+Game Archive
+Append-only gzip bundle of finished games, indexed in the game store
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+from .chess_rules import ChessGame, parse_move
+from .game_store import GameStore
+from .opening_explorer import explorer_moves, rebuild
+from .pgn import write_pgn
+
+# Archive configuration
+ARCHIVE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "archive", "games.jsonl.gz")
+
+
+class GameArchive:
+    """Finished games compressed into one append-only file
+
+    Each game is written as its own gzip member holding one JSON line, so
+    the bundle is still a normal .gz file of JSON lines, and one game can be
+    read back by decompressing just its member. The offset and length of
+    every member are kept in the store's archived_games table, and the
+    Zobrist hash of every position a game reached in archived_positions.
+    Moves are stored as one string of coordinate moves ('e2e4 e7e5 ...').
+    """
+    def __init__(self, store, path=ARCHIVE_PATH):
+        self.store = store
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def add(self, records):
+        """Append game records and index them
+
+        Each record is a lobby game dictionary plus whatever else should be
+        kept (moves, final state). Returns the number of games archived.
+        """
+        if not records:
+            return 0
+
+        members = [gzip.compress((json.dumps(record) + "\n").encode('utf-8')) for record in records]
+        data = b"".join(members)
+
+        # One O_APPEND write, so other processes appending can't interleave with it
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, data)
+            end = os.lseek(fd, 0, os.SEEK_CUR)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        offset = end - len(data)
+        entries = []
+        positions = []
+        for record, member in zip(records, members):
+            entries.append({**record, 'archive_offset': offset, 'archive_length': len(member)})
+            offset += len(member)
+            positions.extend(self.positions(record))
+        self.store.add_archived(entries, positions)
+        return len(records)
+
+    def positions(self, record):
+        """(position_hash, game_id, ply) for each position after a move of the game"""
+        game = ChessGame()
+        positions = []
+        try:
+            for ply, name in enumerate((record.get('moves') or "").split(), 1):
+                game.push_move(parse_move(name))
+                positions.append((game.hash, record['game_id'], ply))
+        except (KeyError, ValueError, TypeError, IndexError):
+            # A damaged move list only loses the index entries past the damage
+            print(f"Bad move list in game {record['game_id']}, indexed {len(positions)} plies")
+        return positions
+
+    def games_at_fen(self, fen, limit=100):
+        """(game_id, ply) of archived games that reached the position in a FEN"""
+        game = ChessGame()
+        game.load_fen(fen)
+        return self.store.games_at_position(game.hash, limit)
+
+    def get(self, game_id):
+        """Full archived record of a game, or None"""
+        entry = self.store.get_archived(game_id)
+        if not entry:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(entry['archive_offset'])
+            member = f.read(entry['archive_length'])
+        return json.loads(gzip.decompress(member))
+
+    def records(self):
+        """Every archived record, oldest first"""
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Browse and export the game archive")
+    parser.add_argument("--list", type=int, nargs="?", const=50, metavar="N",
+                        help="List the N most recently archived games")
+    parser.add_argument("--show", metavar="GAME_ID", help="Print one archived game as JSON")
+    parser.add_argument("--pgn", metavar="FILE", help="Export games as PGN ('-' for stdout)")
+    parser.add_argument("--game", action='append', metavar="GAME_ID",
+                        help="Only export this game (repeatable)")
+    parser.add_argument("--fen", help="List archived games that reached this position")
+    parser.add_argument("--openings", metavar="FEN", help="Opening explorer statistics for a position")
+    parser.add_argument("--rebuild-openings", action="store_true",
+                        help="Recount the opening explorer statistics from every finished game")
+    args = parser.parse_args()
+
+    store = GameStore()
+    archive = GameArchive(store)
+
+    if args.show:
+        record = archive.get(args.show)
+        if record is None:
+            print(f"Game {args.show} is not in the archive")
+            return
+        print(json.dumps(record, indent=2))
+
+    elif args.fen:
+        matches = archive.games_at_fen(args.fen)
+        for game_id, ply in matches:
+            print(f"{game_id}  ply {ply}")
+        print(f"{len(matches)} games reached this position")
+
+    elif args.openings:
+        for stats in explorer_moves(store, args.openings):
+            print(f"{stats['san']:8} {stats['games']:7} games  +{stats['white_wins']} "
+                  f"={stats['draws']} -{stats['black_wins']}")
+
+    elif args.rebuild_openings:
+        print(f"Counted {rebuild(store, archive)} finished games")
+
+    elif args.pgn:
+        # Records are streamed one at a time, so the archive never has to fit in memory
+        records = (archive.get(game_id) for game_id in args.game) if args.game else archive.records()
+        records = (record for record in records if record)
+        out = sys.stdout if args.pgn == '-' else open(args.pgn, 'w')
+        try:
+            count = write_pgn(records, out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"Exported {count} games", file=sys.stderr)
+
+    else:
+        for entry in store.list_archived(args.list or 50):
+            archived = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry['archived_at']))
+            print(f"{archived}  {entry['game_id']}  {entry['game_name']}: "
+                  f"{entry['white']} vs {entry['black']} ({entry['result'] or entry['status']})")
+
+
+if __name__ == "__main__":
+    main()
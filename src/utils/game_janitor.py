@@ -0,0 +1,165 @@
+"""
+Game Janitor
+Expires idle games and moves finished ones out of the store and data directory into the archive
+"""
+
+import argparse
+import glob
+import json
+import os
+import socket
+import sys
+import time
+
+from .chess_rules import move_name
+from .game_archive import GameArchive
+from .game_journal import JOURNAL_DIR
+from .game_store import GameStore, DONE_STATUSES
+
+# Janitor configuration
+IDLE_TTL = 24 * 3600        # Seconds without activity before a game is expired
+JANITOR_INTERVAL = 10 * 60  # Seconds between janitor runs in the server
+STATE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "game_states")
+STATE_FILE_PREFIX = "chess_game_state_"
+SERVER_ADDRESS = ('127.0.0.1', 5555)  # Chess server the command line janitor must not run alongside
+
+
+def read_state_file(path):
+    """Parsed offline game state file, or None if it can't be read"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def state_file_game_id(path):
+    """Game ID from a state file name"""
+    return os.path.basename(path)[len(STATE_FILE_PREFIX):-len(".json")]
+
+
+def journal_game_ids(journal_dir):
+    """IDs of the games the server keeps a journal for"""
+    try:
+        names = os.listdir(journal_dir)
+    except FileNotFoundError:
+        return set()
+    return {name[:-len(".jsonl")] for name in names if name.endswith(".jsonl")}
+
+
+def server_running(address=SERVER_ADDRESS):
+    """Whether the chess server accepts connections"""
+    try:
+        with socket.create_connection(address, timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def run_janitor(store, archive, ttl=IDLE_TTL, live_game_ids=(), state_dir=STATE_DIR,
+                journal_dir=JOURNAL_DIR):
+    """Expire idle games and archive every game that is over
+
+    Games in live_game_ids (running on the server) and games with a
+    journal (which the server restores when it starts) are never touched.
+    Offline state files idle for longer than ttl are archived with their
+    game and deleted; unreadable ones are just deleted. Returns counts of
+    what was done.
+    """
+    live_game_ids = set(live_game_ids) | journal_game_ids(journal_dir)
+    cutoff = time.time() - ttl
+    stats = {'expired': 0, 'archived': 0, 'removed': 0}
+
+    # Waiting and running games nobody has touched for a while
+    stats['expired'] = len(store.expire_idle(cutoff, live_game_ids))
+
+    # Offline state files, by game ID
+    state_files = {}
+    for path in glob.glob(os.path.join(state_dir, f"{STATE_FILE_PREFIX}*.json")):
+        game_id = state_file_game_id(path)
+        if game_id not in live_game_ids:
+            state_files[game_id] = path
+
+    # Finished, abandoned and expired games from the store, with their moves
+    # and any state file
+    records = []
+    archived_files = []
+    for game in store.list_games(DONE_STATUSES):
+        if game['game_id'] in live_game_ids:
+            continue
+        try:
+            moves = " ".join(move_name(move) for move in store.get_moves(game['game_id']))
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            # One damaged game mustn't stop the others from being archived; it
+            # stays in the store until it is fixed
+            print(f"Skipping game {game['game_id']}, its moves can't be encoded: {e!r}")
+            state_files.pop(game['game_id'], None)
+            continue
+        record = dict(game, moves=moves)
+        path = state_files.pop(game['game_id'], None)
+        if path:
+            record['state'] = read_state_file(path)
+            archived_files.append(path)
+        records.append(record)
+
+    # Idle state files of offline games the store doesn't know about
+    active_ids = {game['game_id'] for game in store.list_games(('waiting', 'in_progress'))}
+    for game_id, path in state_files.items():
+        if game_id in active_ids or os.path.getmtime(path) >= cutoff:
+            continue
+        state = read_state_file(path)
+        if state is None:
+            os.remove(path)
+            stats['removed'] += 1
+            continue
+        finished = state.get('status', 'in_progress') != 'in_progress'
+        records.append({
+            'game_id': game_id,
+            'game_name': "Offline game",
+            'host_name': state.get('white_player_name'),
+            'guest_name': state.get('black_player_name'),
+            'status': 'finished' if finished else 'expired',
+            'result': state.get('status') if finished else None,
+            'created_at': os.path.getmtime(path),
+            'spectators': [],
+            'moves': "",
+            'state': state
+        })
+        archived_files.append(path)
+
+    stats['archived'] = archive.add(records)
+
+    # The archive now holds these; delete them only after it was written
+    for path in archived_files:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    return stats
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(
+        description="Expire idle games and archive finished ones. Run it while the chess server "
+                    "is stopped; a running server already does this every few minutes.")
+    parser.add_argument("--ttl", type=float, default=IDLE_TTL / 3600,
+                        help="Hours without activity before a game is expired")
+    args = parser.parse_args()
+
+    # Only the server knows which of its games are live
+    if server_running():
+        print("The chess server is running and cleans up its own games; stop it first "
+              "to run the janitor by hand")
+        sys.exit(1)
+
+    store = GameStore()
+    archive = GameArchive(store)
+    stats = run_janitor(store, archive, args.ttl * 3600)
+    print(f"Expired {stats['expired']} idle games, archived {stats['archived']} games, "
+          f"removed {stats['removed']} unreadable state files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Game Journal
+Append-only per-game log of moves and chat, replayed to rebuild games after a restart
+"""
+
+import json
+import os
+import threading
+import time
+
+# Journal configuration
+JOURNAL_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "journals")
+FLUSH_INTERVAL = 0.05   # Seconds between batched fsyncs
+SNAPSHOT_INTERVAL = 50  # Records appended before the caller should compact the journal
+
+
+class GameJournal:
+    """One append-only JSON lines file per game
+
+    Each record is a small dict such as {'type': 'move', ...} written as one
+    line. Writes go to an open file and a background thread flushes and
+    fsyncs every file with new records once per flush interval, so a burst
+    of moves across many games shares one fsync per file. A 'snapshot'
+    record holds the full game state; compacting rewrites the file as just
+    a snapshot, so replay reads only the records after it.
+    """
+    def __init__(self, directory=JOURNAL_DIR, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.files = {}        # game_id -> open journal file
+        self.since_snapshot = {}  # game_id -> records written since the last snapshot
+        self.dirty = set()     # game_ids with records not yet fsynced
+        self.lock = threading.Lock()
+        self.running = True
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Flusher thread batches fsyncs
+        self.flusher = threading.Thread(target=self._flush_loop)
+        self.flusher.daemon = True
+        self.flusher.start()
+
+    def path(self, game_id):
+        """Journal file for a game"""
+        return os.path.join(self.directory, f"{game_id}.jsonl")
+
+    def append(self, game_id, record):
+        """Append a record and return how many were written since the last snapshot"""
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            self._file(game_id).write(line)
+            self.dirty.add(game_id)
+            count = self.since_snapshot.get(game_id, 0) + 1
+            self.since_snapshot[game_id] = count
+        return count
+
+    def compact(self, game_id, state):
+        """Replace a game's journal with a single snapshot of its state"""
+        path = self.path(game_id)
+        temp_path = path + ".tmp"
+        with self.lock:
+            self._close(game_id)
+            with open(temp_path, 'w') as f:
+                f.write(json.dumps({'type': 'snapshot', 'state': state}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            self.since_snapshot[game_id] = 0
+
+    def remove(self, game_id):
+        """Delete a game's journal"""
+        with self.lock:
+            self._close(game_id)
+            self.since_snapshot.pop(game_id, None)
+            try:
+                os.remove(self.path(game_id))
+            except FileNotFoundError:
+                pass
+
+    def load(self, game_id):
+        """Records from the last snapshot onwards, oldest first
+
+        A torn final line left by a crash is ignored.
+        """
+        records = []
+        try:
+            with open(self.path(game_id), 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"Skipping damaged journal record for game {game_id}")
+                        continue
+                    if record.get('type') == 'snapshot':
+                        records = []
+                    records.append(record)
+        except FileNotFoundError:
+            pass
+        return records
+
+    def game_ids(self):
+        """IDs of every game with a journal"""
+        return [name[:-len(".jsonl")] for name in os.listdir(self.directory)
+                if name.endswith(".jsonl")]
+
+    def flush(self):
+        """Write out and fsync every journal with new records"""
+        descriptors = []
+        with self.lock:
+            dirty = self.dirty
+            self.dirty = set()
+            for game_id in dirty:
+                f = self.files.get(game_id)
+                if f:
+                    f.flush()
+                    # Our own descriptor, so compact or remove closing the
+                    # file can't hand its number to another file before the fsync
+                    descriptors.append(os.dup(f.fileno()))
+
+        # fsync outside the lock so appends don't wait on the disk
+        for fd in descriptors:
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                print(f"Error syncing game journal: {e}")
+            finally:
+                os.close(fd)
+
+    def close(self):
+        """Flush everything and close the files"""
+        self.running = False
+        self.flush()
+        with self.lock:
+            for game_id in list(self.files):
+                self._close(game_id)
+
+    def _file(self, game_id):
+        """Open journal file for a game (call with the lock held)"""
+        f = self.files.get(game_id)
+        if f is None:
+            f = open(self.path(game_id), 'a')
+            self.files[game_id] = f
+        return f
+
+    def _close(self, game_id):
+        """Flush and close a game's file (call with the lock held)"""
+        f = self.files.pop(game_id, None)
+        if f:
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        self.dirty.discard(game_id)
+
+    def _flush_loop(self):
+        """Flush new records in batches until closed"""
+        while self.running:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing game journal: {e}")
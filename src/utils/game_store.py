@@ -0,0 +1,324 @@
+"""
+Game Store
+SQLite database of games, players, spectators and moves shared by the lobby and the server
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Store configuration
+DB_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "chess.db")
+BUSY_TIMEOUT = 5000  # Milliseconds to wait for another process's write lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT PRIMARY KEY,
+    game_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_status ON games (status, created_at);
+
+CREATE TABLE IF NOT EXISTS players (
+    game_id TEXT NOT NULL REFERENCES games (game_id) ON DELETE CASCADE,
+    color TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (game_id, color)
+);
+CREATE INDEX IF NOT EXISTS players_name ON players (name);
+
+CREATE TABLE IF NOT EXISTS spectators (
+    game_id TEXT NOT NULL REFERENCES games (game_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    PRIMARY KEY (game_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS moves (
+    game_id TEXT NOT NULL REFERENCES games (game_id) ON DELETE CASCADE,
+    ply INTEGER NOT NULL,
+    from_pos TEXT NOT NULL,
+    to_pos TEXT NOT NULL,
+    promotion TEXT,
+    played_at REAL NOT NULL,
+    PRIMARY KEY (game_id, ply)
+);
+
+CREATE TABLE IF NOT EXISTS archived_games (
+    game_id TEXT PRIMARY KEY,
+    game_name TEXT NOT NULL,
+    white TEXT,
+    black TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    archived_at REAL NOT NULL,
+    archive_offset INTEGER NOT NULL,
+    archive_length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archived_games_time ON archived_games (archived_at);
+
+CREATE TABLE IF NOT EXISTS archived_positions (
+    position_hash INTEGER NOT NULL,
+    game_id TEXT NOT NULL,
+    ply INTEGER NOT NULL,
+    PRIMARY KEY (position_hash, game_id, ply)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS opening_stats (
+    position_hash INTEGER NOT NULL,
+    move TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    white_wins INTEGER NOT NULL,
+    draws INTEGER NOT NULL,
+    black_wins INTEGER NOT NULL,
+    PRIMARY KEY (position_hash, move)
+) WITHOUT ROWID;
+"""
+
+# Statuses of games that are over and can be archived
+DONE_STATUSES = ('finished', 'abandoned', 'expired')
+
+
+def signed_hash(position_hash):
+    """Zobrist hashes are unsigned 64-bit; SQLite integers are signed"""
+    return position_hash - (1 << 64) if position_hash >= (1 << 63) else position_hash
+
+
+class GameStore:
+    """Games, players, spectators and moves in one SQLite database
+
+    The database runs in WAL mode so the lobby windows and the server can
+    read while one of them writes. Each thread gets its own connection and
+    every operation is a single short transaction.
+    """
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """This thread's connection, opened on first use"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+            self.local.conn = conn
+        return conn
+
+    def create_game(self, game_id, game_name, host_name, status='waiting'):
+        """Add a game hosted by White; returns False if the ID is already taken"""
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO games (game_id, game_name, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (game_id, game_name, status, now, now))
+            if cursor.rowcount == 0:
+                return False
+            conn.execute("INSERT INTO players (game_id, color, name) VALUES (?, 'white', ?)",
+                         (game_id, host_name))
+        return True
+
+    def join_game(self, game_id, player_name):
+        """Take the Black seat of a waiting game; returns False if it isn't waiting"""
+        with self._connection() as conn:
+            # The status check and update are one statement, so only one joiner wins
+            cursor = conn.execute(
+                "UPDATE games SET status = 'in_progress', updated_at = ? "
+                "WHERE game_id = ? AND status = 'waiting'",
+                (time.time(), game_id))
+            if cursor.rowcount == 0:
+                return False
+            conn.execute("INSERT OR REPLACE INTO players (game_id, color, name) VALUES (?, 'black', ?)",
+                         (game_id, player_name))
+        return True
+
+    def add_spectator(self, game_id, spectator_name):
+        """Record a spectator; returns False if the game doesn't exist"""
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT OR IGNORE INTO spectators (game_id, name) VALUES (?, ?)",
+                             (game_id, spectator_name))
+        except sqlite3.IntegrityError:
+            # The foreign key rejects spectators of unknown games
+            return False
+        return True
+
+    def set_status(self, game_id, status, result=None):
+        """Update a game's lobby status and, once finished, its result"""
+        with self._connection() as conn:
+            conn.execute("UPDATE games SET status = ?, result = ?, updated_at = ? WHERE game_id = ?",
+                         (status, result, time.time(), game_id))
+
+    def record_move(self, game_id, from_pos, to_pos, promotion=None):
+        """Append a move to the game's move list"""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO moves (game_id, ply, from_pos, to_pos, promotion, played_at) "
+                "SELECT ?, COALESCE(MAX(ply), 0) + 1, ?, ?, ?, ? FROM moves WHERE game_id = ?",
+                (game_id, json.dumps(list(from_pos)), json.dumps(list(to_pos)), promotion,
+                 now, game_id))
+            # Keep the game from looking idle to the janitor
+            conn.execute("UPDATE games SET updated_at = ? WHERE game_id = ?", (now, game_id))
+
+    def clear_moves(self, game_id):
+        """Forget a game's moves when it is restarted"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM moves WHERE game_id = ?", (game_id,))
+
+    def get_moves(self, game_id):
+        """Moves of a game in order as (from_pos, to_pos, promotion) tuples"""
+        rows = self._connection().execute(
+            "SELECT from_pos, to_pos, promotion FROM moves WHERE game_id = ? ORDER BY ply",
+            (game_id,)).fetchall()
+        return [(tuple(json.loads(row['from_pos'])), tuple(json.loads(row['to_pos'])), row['promotion'])
+                for row in rows]
+
+    def get_game(self, game_id):
+        """A game as a lobby dictionary, or None"""
+        games = self._games("WHERE g.game_id = ?", (game_id,))
+        return games[0] if games else None
+
+    def list_games(self, statuses):
+        """Games with any of the given statuses, oldest first"""
+        placeholders = ", ".join("?" for _ in statuses)
+        return self._games(f"WHERE g.status IN ({placeholders})", tuple(statuses))
+
+    def expire_idle(self, cutoff, keep=()):
+        """Mark waiting and running games untouched since cutoff as expired
+
+        Games whose IDs are in keep (e.g. live on the server) are left alone.
+        Returns the IDs that were expired.
+        """
+        keep = set(keep)
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT game_id FROM games WHERE status IN ('waiting', 'in_progress') AND updated_at < ?",
+            (cutoff,)).fetchall()
+        expired = [row['game_id'] for row in rows if row['game_id'] not in keep]
+
+        # Recheck in the update in case a player came back meanwhile
+        with conn:
+            conn.executemany(
+                "UPDATE games SET status = 'expired', updated_at = ? "
+                "WHERE game_id = ? AND status IN ('waiting', 'in_progress') AND updated_at < ?",
+                [(time.time(), game_id, cutoff) for game_id in expired])
+        return expired
+
+    def add_archived(self, entries, positions=()):
+        """Index archived games and drop them from the live tables
+
+        entries are dicts with the game's lobby fields plus archive_offset
+        and archive_length of its record in the archive bundle. positions
+        are (position_hash, game_id, ply) for every position the games
+        reached.
+        """
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO archived_positions (position_hash, game_id, ply) VALUES (?, ?, ?)",
+                [(signed_hash(position_hash), game_id, ply) for position_hash, game_id, ply in positions])
+            conn.executemany(
+                "INSERT OR REPLACE INTO archived_games (game_id, game_name, white, black, status, "
+                "result, archived_at, archive_offset, archive_length) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(e['game_id'], e['game_name'], e.get('host_name'), e.get('guest_name'), e['status'],
+                  e.get('result'), now, e['archive_offset'], e['archive_length']) for e in entries])
+            # Players, spectators and moves go with the game (ON DELETE CASCADE)
+            conn.executemany("DELETE FROM games WHERE game_id = ?", [(e['game_id'],) for e in entries])
+
+    def get_archived(self, game_id):
+        """Archive index entry of a game, or None"""
+        row = self._connection().execute(
+            "SELECT * FROM archived_games WHERE game_id = ?", (game_id,)).fetchone()
+        return dict(row) if row else None
+
+    def games_at_position(self, position_hash, limit=100):
+        """(game_id, ply) of archived games that reached a position, first ply per game"""
+        rows = self._connection().execute(
+            "SELECT game_id, MIN(ply) AS ply FROM archived_positions WHERE position_hash = ? "
+            "GROUP BY game_id LIMIT ?", (signed_hash(position_hash), limit)).fetchall()
+        return [(row['game_id'], row['ply']) for row in rows]
+
+    def add_opening_game(self, moves, counts):
+        """Count one finished game in the opening statistics
+
+        moves are (position_hash, move) for each ply counted and counts is
+        the game's (white_wins, draws, black_wins).
+        """
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO opening_stats (position_hash, move, games, white_wins, draws, black_wins) "
+                "VALUES (?, ?, 1, ?, ?, ?) ON CONFLICT (position_hash, move) DO UPDATE SET "
+                "games = games + 1, white_wins = white_wins + excluded.white_wins, "
+                "draws = draws + excluded.draws, black_wins = black_wins + excluded.black_wins",
+                [(signed_hash(position_hash), move, *counts) for position_hash, move in moves])
+
+    def get_opening_stats(self, position_hash, limit=12):
+        """Statistics of the moves played from a position, most played first"""
+        rows = self._connection().execute(
+            "SELECT move, games, white_wins, draws, black_wins FROM opening_stats "
+            "WHERE position_hash = ? ORDER BY games DESC LIMIT ?",
+            (signed_hash(position_hash), limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def clear_opening_stats(self):
+        """Forget all opening statistics before they are rebuilt"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM opening_stats")
+
+    def list_archived(self, limit=50):
+        """Most recently archived games first"""
+        rows = self._connection().execute(
+            "SELECT * FROM archived_games ORDER BY archived_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_games(self):
+        """Number of games in the store"""
+        return self._connection().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def import_games(self, games):
+        """Copy lobby dictionaries from the old JSON games list into the store"""
+        with self._connection() as conn:
+            for game in games:
+                conn.execute(
+                    "INSERT OR IGNORE INTO games (game_id, game_name, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (game['game_id'], game.get('game_name', ''), game.get('status', 'waiting'),
+                     game.get('created_at', 0), game.get('created_at', 0)))
+                conn.execute("INSERT OR IGNORE INTO players (game_id, color, name) VALUES (?, 'white', ?)",
+                             (game['game_id'], game.get('host_name') or ''))
+                if game.get('guest_name'):
+                    conn.execute("INSERT OR IGNORE INTO players (game_id, color, name) VALUES (?, 'black', ?)",
+                                 (game['game_id'], game['guest_name']))
+                for name in game.get('spectators', []):
+                    conn.execute("INSERT OR IGNORE INTO spectators (game_id, name) VALUES (?, ?)",
+                                 (game['game_id'], name))
+
+    def _games(self, where, params):
+        """Lobby dictionaries for the games matching a WHERE clause"""
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT g.game_id, g.game_name, g.status, g.result, g.created_at, "
+            "w.name AS host_name, b.name AS guest_name FROM games g "
+            "LEFT JOIN players w ON w.game_id = g.game_id AND w.color = 'white' "
+            "LEFT JOIN players b ON b.game_id = g.game_id AND b.color = 'black' "
+            f"{where} ORDER BY g.created_at", params).fetchall()
+
+        games = []
+        for row in rows:
+            game = dict(row)
+            game['spectators'] = [r['name'] for r in conn.execute(
+                "SELECT name FROM spectators WHERE game_id = ?", (row['game_id'],))]
+            games.append(game)
+        return games
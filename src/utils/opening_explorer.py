@@ -0,0 +1,82 @@
+"""
+Opening Explorer
+Move statistics for opening positions, aggregated from finished games
+"""
+
+from .chess_rules import ChessGame, move_name, parse_move
+from .pgn import move_san
+
+# Explorer configuration
+OPENING_DEPTH = 30   # Plies of each finished game counted in the statistics
+EXPLORER_MOVES = 12  # Most played moves returned for a position
+
+
+def result_counts(result):
+    """(white_wins, draws, black_wins) a finished game adds, or None if it has no result"""
+    if result == 'white_wins':
+        return (1, 0, 0)
+    if result == 'black_wins':
+        return (0, 0, 1)
+    if result == 'stalemate' or (result and result.startswith('draw_')):
+        return (0, 1, 0)
+    return None
+
+
+def opening_moves(moves, depth=OPENING_DEPTH):
+    """(position_hash, move) for the first plies of a game
+
+    moves are move tuples or coordinate names. Promotions are always named,
+    so a pawn promoted by default counts the same as one promoted to a queen.
+    """
+    game = ChessGame()
+    positions = []
+    for move in list(moves)[:depth]:
+        move = parse_move(move if isinstance(move, str) else move_name(move))
+        (from_row, from_col), (to_row, _) = move[0], move[1]
+        if len(move) == 2 and game.board[from_row][from_col]['type'] == 'pawn' and to_row in (0, 7):
+            move = (move[0], move[1], 'queen')
+        positions.append((game.hash, move_name(move)))
+        game.push_move(move)
+    return positions
+
+
+def record_game(store, moves, result):
+    """Add a finished game to the statistics; returns False if it has no result"""
+    counts = result_counts(result)
+    if counts is None:
+        return False
+    store.add_opening_game(opening_moves(moves), counts)
+    return True
+
+
+def explorer_moves(store, fen, limit=EXPLORER_MOVES):
+    """Statistics of the moves played from a FEN position, most played first
+
+    Raises ValueError if the FEN can't be read.
+    """
+    game = ChessGame()
+    game.load_fen(fen)
+    moves = []
+    for stats in store.get_opening_stats(game.hash, limit):
+        try:
+            stats['san'] = move_san(game, parse_move(stats['move']))
+        except (KeyError, TypeError, IndexError, ValueError):
+            # A hash collision with another position; the move doesn't fit here
+            continue
+        moves.append(stats)
+    return moves
+
+
+def rebuild(store, archive):
+    """Recount the statistics from the archive and the finished games still in the store
+
+    Returns the number of games counted.
+    """
+    store.clear_opening_stats()
+    count = 0
+    for record in archive.records():
+        if record.get('status') == 'finished':
+            count += record_game(store, (record.get('moves') or "").split(), record.get('result'))
+    for game in store.list_games(('finished',)):
+        count += record_game(store, store.get_moves(game['game_id']), game['result'])
+    return count
@@ -0,0 +1,172 @@
+"""
+Perft Module
+Counts move generator leaf nodes on standard positions to check correctness and speed
+"""
+
+import argparse
+import sys
+import time
+
+from .chess_rules import ChessGame, START_FEN, move_name
+
+# Standard perft positions with known leaf counts per depth
+# (from the Chess Programming Wiki "Perft Results" page)
+STANDARD_POSITIONS = [
+    {
+        'name': 'start',
+        'fen': START_FEN,
+        'counts': {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}
+    },
+    {
+        'name': 'kiwipete',
+        'fen': "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        'counts': {1: 48, 2: 2039, 3: 97862, 4: 4085603}
+    },
+    {
+        'name': 'endgame',
+        'fen': "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        'counts': {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}
+    },
+    {
+        'name': 'promotions',
+        'fen': "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        'counts': {1: 6, 2: 264, 3: 9467, 4: 422333}
+    },
+    {
+        'name': 'talkchess',
+        'fen': "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        'counts': {1: 44, 2: 1486, 3: 62379, 4: 2103487}
+    },
+    {
+        'name': 'middlegame',
+        'fen': "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        'counts': {1: 46, 2: 2079, 3: 89890, 4: 3894594}
+    }
+]
+
+# Default depth for the suite; deeper runs take minutes per position
+DEFAULT_SUITE_DEPTH = 3
+
+# Move generators that can be checked, all called as generate(game, color)
+GENERATORS = {
+    'legal': lambda game, color: game.get_all_valid_moves_for_color(color)
+}
+
+
+def perft(game, color, depth, generate):
+    """Count the leaf nodes of the move tree to the given depth"""
+    moves = generate(game, color)
+    if depth <= 1:
+        # Bulk counting: the last ply doesn't need to be played
+        return len(moves) if depth == 1 else 1
+
+    opponent = 'black' if color == 'white' else 'white'
+    nodes = 0
+    for move in moves:
+        undo = game.push_move(move)
+        try:
+            nodes += perft(game, opponent, depth - 1, generate)
+        finally:
+            game.pop_move(move, undo)
+    return nodes
+
+
+def divide(game, depth, generate):
+    """Leaf counts below each root move, for finding generator bugs"""
+    color = game.turn
+    opponent = 'black' if color == 'white' else 'white'
+    counts = {}
+    for move in generate(game, color):
+        undo = game.push_move(move)
+        try:
+            counts[move] = perft(game, opponent, depth - 1, generate)
+        finally:
+            game.pop_move(move, undo)
+    return counts
+
+
+def load_position(fen):
+    """Create a game set up from a FEN string"""
+    game = ChessGame()
+    game.load_fen(fen)
+    return game
+
+
+def run_suite(depth=DEFAULT_SUITE_DEPTH, generator='legal', positions=None):
+    """Run the standard positions up to depth and print nodes, result and speed
+
+    Returns True if every count matched.
+    """
+    generate = GENERATORS[generator]
+    all_passed = True
+    total_nodes = 0
+    total_time = 0.0
+
+    for position in STANDARD_POSITIONS:
+        if positions and position['name'] not in positions:
+            continue
+
+        print(f"{position['name']}: {position['fen']}")
+        for d in sorted(position['counts']):
+            if d > depth:
+                break
+            game = load_position(position['fen'])
+            start = time.perf_counter()
+            nodes = perft(game, game.turn, d, generate)
+            elapsed = time.perf_counter() - start
+
+            expected = position['counts'][d]
+            passed = nodes == expected
+            all_passed = all_passed and passed
+            total_nodes += nodes
+            total_time += elapsed
+
+            nps = int(nodes / elapsed) if elapsed > 0 else 0
+            print(f"  depth {d}: {nodes:>10} (expected {expected:>10}) "
+                  f"{'OK  ' if passed else 'FAIL'} {elapsed:8.2f} s {nps:>9} nps")
+
+    nps = int(total_nodes / total_time) if total_time > 0 else 0
+    print(f"Total: {total_nodes} nodes in {total_time:.2f} s ({nps} nps) - "
+          f"{'all passed' if all_passed else 'FAILURES'}")
+    return all_passed
+
+
+def run_divide(fen, depth, generator='legal'):
+    """Print the divide output for one position"""
+    game = load_position(fen)
+    start = time.perf_counter()
+    counts = divide(game, depth, GENERATORS[generator])
+    elapsed = time.perf_counter() - start
+
+    for move in sorted(counts, key=move_name):
+        print(f"{move_name(move)}: {counts[move]}")
+
+    nodes = sum(counts.values())
+    nps = int(nodes / elapsed) if elapsed > 0 else 0
+    print(f"\nMoves: {len(counts)}")
+    print(f"Nodes: {nodes} in {elapsed:.2f} s ({nps} nps)")
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Perft test and benchmark for the move generator")
+    parser.add_argument("--depth", type=int, default=DEFAULT_SUITE_DEPTH, help="Search depth")
+    parser.add_argument("--generator", default='legal', choices=sorted(GENERATORS),
+                        help="Move generator to test")
+    parser.add_argument("--position", action='append',
+                        help="Only run the named standard position (repeatable)")
+    parser.add_argument("--fen", help="Run divide on this position instead of the suite")
+    parser.add_argument("--divide", action='store_true',
+                        help="Print per-move counts (uses --fen or the start position)")
+    args = parser.parse_args()
+
+    if args.fen or args.divide:
+        run_divide(args.fen or START_FEN, args.depth, args.generator)
+        return
+
+    if not run_suite(args.depth, args.generator, args.position):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
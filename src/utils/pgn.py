@@ -0,0 +1,139 @@
+"""
+PGN Export
+Standard algebraic notation and PGN text for archived games
+"""
+
+import sys
+import time
+
+from .chess_rules import ChessGame, parse_move, square_name
+
+# Piece letters used in standard algebraic notation
+SAN_LETTERS = {'knight': 'N', 'bishop': 'B', 'rook': 'R', 'queen': 'Q', 'king': 'K'}
+
+# PGN result tags for game statuses
+PGN_RESULTS = {'white_wins': '1-0', 'black_wins': '0-1', 'stalemate': '1/2-1/2'}
+
+PGN_LINE_LENGTH = 80  # Movetext is wrapped at this width
+
+
+def move_san(game, move):
+    """Standard algebraic notation for a legal move in the game's position"""
+    (from_row, from_col), (to_row, to_col) = move[0], move[1]
+    piece = game.board[from_row][from_col]
+    color = piece['color']
+
+    if piece['type'] == 'king' and abs(to_col - from_col) == 2:
+        san = "O-O" if to_col == 6 else "O-O-O"
+    else:
+        capture = game.board[to_row][to_col] is not None or (
+            piece['type'] == 'pawn' and from_col != to_col)
+        target = square_name((to_row, to_col))
+
+        if piece['type'] == 'pawn':
+            san = (square_name((from_row, from_col))[0] + 'x' if capture else '') + target
+            if to_row == 0 or to_row == 7:
+                promotion = move[2] if len(move) > 2 and move[2] else 'queen'
+                san += '=' + SAN_LETTERS[promotion]
+        else:
+            # Name the origin file, rank or both if another piece could go there too
+            rivals = [m[0] for m in game.get_all_valid_moves_for_color(color)
+                      if tuple(m[1]) == (to_row, to_col) and tuple(m[0]) != (from_row, from_col)
+                      and game.board[m[0][0]][m[0][1]]['type'] == piece['type']]
+            origin = square_name((from_row, from_col))
+            disambiguation = ''
+            if rivals:
+                if all(col != from_col for _, col in rivals):
+                    disambiguation = origin[0]
+                elif all(row != from_row for row, _ in rivals):
+                    disambiguation = origin[1]
+                else:
+                    disambiguation = origin
+            san = SAN_LETTERS[piece['type']] + disambiguation + ('x' if capture else '') + target
+
+    # Check and checkmate suffixes
+    undo = game.push_move(move)
+    try:
+        opponent = game.turn
+        if game.is_in_check(opponent):
+            san += '#' if not game.get_all_valid_moves_for_color(opponent) else '+'
+    finally:
+        game.pop_move(move, undo)
+    return san
+
+
+def pgn_result(status):
+    """PGN result token for a game status"""
+    if status in PGN_RESULTS:
+        return PGN_RESULTS[status]
+    if status and status.startswith('draw_'):
+        return '1/2-1/2'
+    return '*'
+
+
+def game_to_pgn(record):
+    """PGN text of one archived game record
+
+    Raises ValueError if a move can't be read or isn't legal in its position.
+    """
+    result = pgn_result(record.get('result'))
+    created = record.get('created_at') or 0
+    tags = [
+        ('Event', record.get('game_name') or "Casual game"),
+        ('Site', "Multiplayer Chess"),
+        ('Date', time.strftime("%Y.%m.%d", time.localtime(created)) if created else "????.??.??"),
+        ('Round', "-"),
+        ('White', record.get('host_name') or "?"),
+        ('Black', record.get('guest_name') or "?"),
+        ('Result', result),
+        ('GameId', record['game_id'])
+    ]
+    lines = []
+    for name, value in tags:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        lines.append(f'[{name} "{value}"]')
+    lines.append("")
+
+    # Replay the coordinate moves to write them in SAN
+    game = ChessGame()
+    tokens = []
+    for ply, name in enumerate((record.get('moves') or "").split()):
+        move = parse_move(name)
+        if not (game.is_valid_move(move[0], move[1], game.turn) and
+                not game.would_move_cause_check(move[0], move[1], game.turn)):
+            raise ValueError(f"illegal move {name} at ply {ply + 1}")
+        if ply % 2 == 0:
+            tokens.append(f"{ply // 2 + 1}.")
+        tokens.append(move_san(game, move))
+        game.push_move(move)
+    tokens.append(result)
+
+    line = ""
+    for token in tokens:
+        if line and len(line) + 1 + len(token) > PGN_LINE_LENGTH:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return "\n".join(lines) + "\n\n"
+
+
+def write_pgn(records, out):
+    """Stream PGN for an iterable of archived game records; returns the game count
+
+    A record whose moves can't be replayed is skipped with a warning (on
+    stderr, since the PGN may be going to stdout), so one damaged game
+    doesn't stop the export.
+    """
+    count = 0
+    for record in records:
+        try:
+            pgn = game_to_pgn(record)
+        except (KeyError, TypeError, IndexError, ValueError) as e:
+            print(f"Skipping game {record.get('game_id')}, its moves can't be replayed: {e!r}",
+                  file=sys.stderr)
+            continue
+        out.write(pgn)
+        count += 1
+    return count
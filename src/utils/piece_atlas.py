@@ -0,0 +1,133 @@
+"""
+Piece Atlas
+Caches the procedurally drawn piece images on disk as one sprite sheet, so windows start without redrawing them
+"""
+import hashlib
+import json
+import os
+
+import pygame
+
+from .. import __version__
+from .enhanced_chess_pieces import create_enhanced_piece_images
+
+# Atlas configuration
+ATLAS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data", "cache", "pieces")
+INDEX_FILE = "index.json"
+PIECE_TYPES = ['pawn', 'rook', 'knight', 'bishop', 'queen', 'king']
+COLORS = ['white', 'black']
+
+loaded_images = {}  # square size -> piece images already loaded in this process
+
+
+def atlas_version():
+    """Cache directory name: the game version plus a digest of the piece drawing code
+
+    Changing how pieces are drawn gives a new directory, so a stale atlas is
+    never loaded.
+    """
+    with open(os.path.join(os.path.dirname(__file__), "enhanced_chess_pieces.py"), 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:10]
+    return f"{__version__}-{digest}"
+
+
+def atlas_dir():
+    """Directory of the atlas for this version"""
+    return os.path.join(ATLAS_DIR, atlas_version())
+
+
+def build_atlas(sizes):
+    """Draw every piece at each square size into one sheet
+
+    Each size is a row of 12 sprites. Returns (sheet, index), where index
+    maps "size/type/color" to the sprite's [x, y, width, height].
+    """
+    sizes = sorted(set(sizes))
+    sheet = pygame.Surface((max(sizes) * len(COLORS) * len(PIECE_TYPES), sum(sizes)), pygame.SRCALPHA)
+    index = {}
+    y = 0
+    for size in sizes:
+        images = create_enhanced_piece_images(size)
+        x = 0
+        for color in COLORS:
+            for piece_type in PIECE_TYPES:
+                sheet.blit(images[(piece_type, color)], (x, y))
+                index[f"{size}/{piece_type}/{color}"] = [x, y, size, size]
+                x += size
+        y += size
+    return sheet, index
+
+
+def save_atlas(sheet, index, sizes, directory):
+    """Write the sheet and its index
+
+    Both are written under temporary names and renamed into place, index
+    last, so another window starting at the same moment reads either the
+    old atlas or the complete new one.
+    """
+    os.makedirs(directory, exist_ok=True)
+    image_name = "pieces-" + "-".join(str(size) for size in sorted(set(sizes))) + ".png"
+    temp_image = os.path.join(directory, f"{os.getpid()}.tmp.png")
+    pygame.image.save(sheet, temp_image)
+    os.replace(temp_image, os.path.join(directory, image_name))
+
+    temp_index = os.path.join(directory, f"{os.getpid()}.tmp.json")
+    with open(temp_index, 'w') as f:
+        json.dump({'image': image_name, 'sizes': sorted(set(sizes)), 'sprites': index}, f)
+    os.replace(temp_index, os.path.join(directory, INDEX_FILE))
+
+
+def read_index(directory):
+    """The atlas index in a directory, or None if there is no usable one"""
+    try:
+        with open(os.path.join(directory, INDEX_FILE), 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) else None
+
+
+def sprites_from_sheet(sheet, index, square_size):
+    """Piece images of one size, as subsurfaces of the sheet"""
+    images = {}
+    for color in COLORS:
+        for piece_type in PIECE_TYPES:
+            images[(piece_type, color)] = sheet.subsurface(pygame.Rect(index[f"{square_size}/{piece_type}/{color}"]))
+    return images
+
+
+def load_piece_images(square_size, directory=None):
+    """Piece images of a square size, from the atlas or drawn (and cached) if it doesn't have them
+
+    Every size already in the atlas is kept when it is rebuilt for a new one.
+    A missing or damaged atlas only costs the procedural drawing. Images are
+    loaded once per process, so every game played in it shares them.
+    """
+    if square_size not in loaded_images:
+        loaded_images[square_size] = read_piece_images(square_size, directory or atlas_dir())
+    return loaded_images[square_size]
+
+
+def read_piece_images(square_size, directory):
+    """Piece images of a square size from the atlas in a directory, rebuilding it if needed"""
+    atlas = read_index(directory)
+    if atlas and square_size in atlas.get('sizes', []):
+        try:
+            sheet = pygame.image.load(os.path.join(directory, atlas['image']))
+            if pygame.display.get_surface():
+                sheet = sheet.convert_alpha()
+            return sprites_from_sheet(sheet, atlas['sprites'], square_size)
+        except (pygame.error, OSError, KeyError, TypeError, ValueError) as e:
+            print(f"Could not load the piece atlas, drawing the pieces: {e}")
+
+    sizes = {size for size in atlas.get('sizes', []) if isinstance(size, int)} if atlas else set()
+    sizes.add(square_size)
+    sheet, index = build_atlas(sizes)
+    if pygame.image.get_extended():
+        try:
+            save_atlas(sheet, index, sizes, directory)
+        except (pygame.error, OSError) as e:
+            print(f"Could not save the piece atlas: {e}")
+    if pygame.display.get_surface():
+        sheet = sheet.convert_alpha()
+    return sprites_from_sheet(sheet, index, square_size)